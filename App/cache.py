@@ -0,0 +1,288 @@
+import functools
+import math
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+
+class MemoryBackend:
+    """Per-process LRU of pickled values with a TTL per entry.
+
+    Bounded by both entry count and payload bytes. Tag versions live in a
+    separate dict so they are never evicted.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.size = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, payload)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, key):
+        _, payload = self._entries.pop(key)
+        self.size -= len(payload)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self.clock():
+                self._drop(key)
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, payload, ttl):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self.clock() + ttl, payload)
+            self.size += len(payload)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def incr(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+    def get_many(self, keys):
+        with self._lock:
+            return [self._versions.get(key) for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.size = 0
+
+    def metrics(self):
+        return {'entries': len(self._entries), 'bytes': self.size, 'evictions': self.evictions}
+
+
+class DictClient:
+    """In-process stand-in for the subset of the redis client SharedBackend uses.
+
+    Lets tests and single-process setups run the shared backend without a
+    server (CACHE_REDIS_URL = 'memory://').
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._data = {}  # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= self.clock():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (None if ex is None else self.clock() + ex, value)
+        return True
+
+    def incr(self, key):
+        with self._lock:
+            entry = self._live(key)
+            value = int(entry[1]) + 1 if entry is not None else 1
+            self._data[key] = (None, str(value).encode())
+            return value
+
+    def mget(self, keys):
+        with self._lock:
+            return [None if self._live(key) is None else self._data[key][1] for key in keys]
+
+    def scan_iter(self, match='*', count=None):
+        # redis glob patterns, limited to * ? and backslash escapes
+        pattern = re.compile(''.join(
+            '.*' if part == '*' else '.' if part == '?' else re.escape(part[-1])
+            for part in re.findall(r'\\.|.', match, re.S)
+        ), re.S)
+        with self._lock:
+            keys = [key for key in list(self._data) if pattern.fullmatch(key) and self._live(key) is not None]
+        return iter(keys)
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def info(self, section=None):
+        with self._lock:
+            return {'used_memory': sum(len(value) for _, value in self._data.values())}
+
+
+class SharedBackend:
+    """Cache shared by every worker through a redis client (or a DictClient)"""
+
+    def __init__(self, client, prefix='cst:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, payload, ttl):
+        self.client.set(self.prefix + key, payload, ex=max(1, math.ceil(ttl)))
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def get_many(self, keys):
+        return [None if value is None else int(value) for value in self.client.mget([self.prefix + key for key in keys])]
+
+    def clear(self):
+        # only this app's keys: the redis database may hold other apps' data
+        match = re.sub(r'([*?\[\]\\])', r'\\\1', self.prefix) + '*'
+        batch = []
+        for key in self.client.scan_iter(match=match, count=1000):
+            batch.append(key)
+            if len(batch) == 1000:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+    def metrics(self):
+        try:
+            used = self.client.info('memory').get('used_memory')
+        except Exception:
+            used = None
+        return {'entries': None, 'bytes': used, 'evictions': None}
+
+
+class QueryCache:
+    """Cached controller results, invalidated by tag.
+
+    Every value is stored with the versions its tags had before it was
+    computed. invalidate(tag) bumps the tag's version, so every entry
+    carrying it reads as a miss from then on, in every worker sharing the
+    backend, without the cache having to find those entries.
+    """
+
+    def __init__(self, backend, default_ttl=60):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _versions(self, tags):
+        return tuple(version or 0 for version in self.backend.get_many(['tag:' + tag for tag in tags])) if tags else ()
+
+    def get_or_compute(self, key, tags, compute, ttl=None):
+        payload = self.backend.get(key)
+        if payload is not None:
+            versions, value = pickle.loads(payload)
+            if versions == self._versions(tags):
+                self.hits += 1
+                return value
+        self.misses += 1
+        # read before computing, so an invalidation that races with compute() wins
+        versions = self._versions(tags)
+        value = compute()
+        self.backend.set(key, pickle.dumps((versions, value), pickle.HIGHEST_PROTOCOL),
+                         self.default_ttl if ttl is None else ttl)
+        return value
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr('tag:' + tag)
+        self.invalidations += len(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        metrics = {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'invalidations': self.invalidations
+        }
+        metrics.update(self.backend.metrics())
+        return metrics
+
+
+def get_cache():
+    return current_app.extensions.get('cache') if has_app_context() else None
+
+
+def cached(*tags, ttl=None):
+    """Cache a controller's result while the cache is enabled.
+
+    Tags are format strings filled from the call's arguments, e.g.
+    'student:{0}'. Results must pickle and are copies, so callers can't
+    change what later callers see; never cache ORM instances.
+    """
+    def decorator(fn):
+        name = f'{fn.__module__}.{fn.__qualname__}'
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None:
+                return fn(*args, **kwargs)
+            key = f'{name}:{args!r}:{sorted(kwargs.items())!r}'
+            entry_tags = [tag.format(*args, **kwargs) for tag in tags]
+            return cache.get_or_compute(key, entry_tags, lambda: fn(*args, **kwargs), ttl)
+
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    """Drop cached results carrying any of the tags, a no-op while the cache is disabled"""
+    cache = get_cache()
+    if cache is not None and tags:
+        cache.invalidate(*tags)
+
+
+def _redis_client(url):
+    if url == 'memory://':
+        return DictClient()
+    # redis is optional (requirements-perf.txt), only needed for CACHE_BACKEND = 'redis'
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("CACHE_BACKEND 'redis' needs the redis package (pip install -r requirements-perf.txt)")
+    return redis.Redis.from_url(url)
+
+
+def setup_cache(app):
+    """Cache controller results in CACHE_BACKEND: 'null' (off), 'memory' (per process) or 'redis' (shared)"""
+    kind = app.config['CACHE_BACKEND']
+    if kind in (None, 'null'):
+        return None
+    if kind == 'memory':
+        backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_MAX_BYTES'])
+    elif kind == 'redis':
+        backend = SharedBackend(_redis_client(app.config['CACHE_REDIS_URL']), app.config['CACHE_KEY_PREFIX'])
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND '{kind}'")
+    cache = QueryCache(backend, app.config['CACHE_DEFAULT_TTL'])
+    app.extensions['cache'] = cache
+    return cache
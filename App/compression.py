@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, see requirements-perf.txt
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, see requirements-perf.txt
+    zstandard = None
+
+
+COMPRESSIBLE_MIMETYPES = ['application/json', 'text/html', 'text/css', 'text/plain', 'text/javascript',
+                          'application/javascript']
+
+
+def _compressors(level):
+    """Available encodings in server preference order"""
+    available = []
+    if brotli is not None:
+        available.append(('br', lambda data: brotli.compress(data, quality=level['br'])))
+    if zstandard is not None:
+        available.append(('zstd', lambda data: zstandard.ZstdCompressor(level=level['zstd']).compress(data)))
+    available.append(('gzip', lambda data: gzip.compress(data, compresslevel=level['gzip'], mtime=0)))
+    return available
+
+
+def parse_accept_encoding(header):
+    """Return {encoding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def choose_encoding(header, available):
+    """Pick the client's highest q encoding, breaking ties by server preference"""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for name in available:
+        q = accepted.get(name, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressedCache:
+    """Byte-bounded LRU of compressed bodies keyed by (ETag or body digest, encoding)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def setup_compression(app):
+    """Compress responses above COMPRESS_MIN_SIZE with the best encoding the client accepts"""
+    if not app.config['COMPRESS_ENABLED']:
+        return None
+    level = {'gzip': app.config['COMPRESS_GZIP_LEVEL'], 'br': app.config['COMPRESS_BR_LEVEL'],
+             'zstd': app.config['COMPRESS_ZSTD_LEVEL']}
+    compressors = dict(_compressors(level))
+    preference = list(compressors)
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    mimetypes = set(app.config['COMPRESS_MIMETYPES'])
+    cache = CompressedCache(app.config['COMPRESS_CACHE_MAX_BYTES'])
+    app.extensions['compression_cache'] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in mimetypes):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), preference)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        etag, weak = response.get_etag()
+        # versioned responses are keyed by their ETag, anything else by content
+        version = f'etag:{etag}' if etag else hashlib.blake2b(data, digest_size=16).hexdigest()
+        key = (version, encoding)
+        body = cache.get(key)
+        if body is None:
+            body = compressors[encoding](data)
+            cache.put(key, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # the compressed representation is a different entity
+            response.set_etag(f'{etag}-{encoding}', weak=weak)
+        return response
+
+    return cache
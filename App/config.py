@@ -1,5 +1,7 @@
 import os
 
+from App.compression import COMPRESSIBLE_MIMETYPES
+
 def load_config(app, overrides):
     if os.path.exists(os.path.join('./App', 'custom_config.py')):
         app.config.from_object('App.custom_config')
@@ -15,5 +17,69 @@ def load_config(app, overrides):
     app.config["JWT_COOKIE_SECURE"] = True
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
+    app.config.setdefault('CORS_ENABLED', True)
+    # build Flask-Admin on the first /admin request instead of at startup
+    app.config.setdefault('LAZY_SUBSYSTEMS', False)
+    # 'fast' uses orjson when installed, 'default' is Flask's stdlib provider
+    app.config.setdefault('JSON_PROVIDER', 'fast')
+    # use Postgres' planner row estimate instead of COUNT(*) on big admin lists
+    app.config.setdefault('ADMIN_APPROXIMATE_COUNT', False)
+    app.config.setdefault('ADMIN_APPROXIMATE_COUNT_MIN_ROWS', 100000)
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_MIMETYPES', COMPRESSIBLE_MIMETYPES)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+    app.config.setdefault('COMPRESS_ZSTD_LEVEL', 3)
+    app.config.setdefault('COMPRESS_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    # merge concurrent log-hours requests into one commit per window, see App/group_commit.py
+    app.config.setdefault('GROUP_COMMIT_ENABLED', False)
+    app.config.setdefault('GROUP_COMMIT_WINDOW_MS', 5)
+    app.config.setdefault('GROUP_COMMIT_MAX_BATCH', 500)
+    # per-process token buckets, (tokens per second, burst) per client and per URL rule, see App/limits.py
+    app.config.setdefault('RATE_LIMIT_ENABLED', False)
+    app.config.setdefault('RATE_LIMIT_DEFAULT', (20, 60))
+    app.config.setdefault('RATE_LIMITS', {'/api/login': (0.5, 5), '/login': (0.5, 5), '/api/leaderboard': (1, 10)})
+    app.config.setdefault('RATE_LIMIT_MAX_CLIENTS', 100000)
+    # proxies in front of the app that append to X-Forwarded-For, 0 uses the socket address
+    app.config.setdefault('RATE_LIMIT_PROXY_COUNT', 0)
+    # answer 503 above these, 0 disables the check
+    app.config.setdefault('ADMISSION_MAX_IN_FLIGHT', 0)
+    app.config.setdefault('ADMISSION_MAX_POOL_WAIT_MS', 0)
+    app.config.setdefault('ADMISSION_RETRY_AFTER', 2)
+    app.config.setdefault('LIMITS_EXEMPT_PATHS', ['/health', '/static/'])
+    # /health/ready turns 503 above these, see App/health.py; 0 disables a check
+    app.config.setdefault('READINESS_DB_TTL', 2)
+    app.config.setdefault('READINESS_MAX_POOL_WAIT_MS', 200)
+    app.config.setdefault('READINESS_MAX_IN_FLIGHT', 0)
+    # let staff profile a request with the X-Profile header, see App/profiling.py
+    app.config.setdefault('PROFILING_ENABLED', False)
+    app.config.setdefault('PROFILE_DIR', 'profiles')
+    app.config.setdefault('PROFILE_LIMIT', 30)
+    # statements slower than this go to SLOW_QUERY_LOG (instance/slow_queries.jsonl when None) with their plan
+    app.config.setdefault('SLOW_QUERY_ENABLED', True)
+    app.config.setdefault('SLOW_QUERY_MS', 200)
+    app.config.setdefault('SLOW_QUERY_LOG', None)
+    app.config.setdefault('SLOW_QUERY_EXPLAIN', True)
+    # cache controller results: 'null' (off), 'memory' (per worker) or 'redis' (shared), see App/cache.py
+    app.config.setdefault('CACHE_BACKEND', 'null')
+    app.config.setdefault('CACHE_DEFAULT_TTL', 60)
+    app.config.setdefault('CACHE_MAX_ENTRIES', 10000)
+    app.config.setdefault('CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    # 'memory://' runs the shared backend on an in-process stand-in instead of a server
+    app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    app.config.setdefault('CACHE_KEY_PREFIX', 'cst:')
+    # serve the leaderboard, staff list and stats from a file every worker maps, see App/snapshot.py
+    app.config.setdefault('SNAPSHOT_ENABLED', False)
+    app.config.setdefault('SNAPSHOT_PATH', None)
+    app.config.setdefault('SNAPSHOT_INTERVAL', 5)
+    app.config.setdefault('SNAPSHOT_MAX_AGE', 30)
+    app.config.setdefault('SNAPSHOT_CHECK_INTERVAL', 0.5)
+    # False when `flask system snapshot --watch` publishes instead of a worker
+    app.config.setdefault('SNAPSHOT_PUBLISH', True)
+    # skip signature checks for tokens already verified, until their exp or this many seconds
+    app.config.setdefault('JWT_VERIFY_CACHE_ENABLED', True)
+    app.config.setdefault('JWT_VERIFY_CACHE_MAX_ENTRIES', 10000)
+    app.config.setdefault('JWT_VERIFY_CACHE_MAX_TTL', 300)
     for key in overrides:
         app.config[key] = overrides[key]
\ No newline at end of file
@@ -1,5 +1,9 @@
+from .stats import *
 from .user import *
 from .auth import *
 from .initialize import *
 from .student import *
 from .staff import *
+from .seed import *
+from .accolade import *
+from .report import *
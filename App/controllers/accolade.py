@@ -0,0 +1,141 @@
+from collections import Counter
+
+from sqlalchemy import Integer, and_, bindparam, case, delete, func, insert, literal, or_, union_all, update
+
+from App.models import Student, Accolade, MILESTONES, milestone_bit
+from App.database import db
+from App.cache import invalidate
+from .stats import apply_stats, rebuild_stats, student_deltas
+
+
+def _expected_mask():
+    """Correlated subquery: the accolade mask a student's Accolade rows imply"""
+    student = Student.__table__
+    bit = case({milestone: milestone_bit(milestone) for milestone in MILESTONES},
+               value=Accolade.milestone, else_=0)
+    return (
+        db.select(func.coalesce(func.sum(bit.distinct()), 0))
+        .where(Accolade.student_id == student.c.id)
+        .scalar_subquery()
+    )
+
+
+def check_accolade_masks():
+    """Return (student_id, stored_mask, expected_mask) for every out of sync student"""
+    student = Student.__table__
+    expected = _expected_mask()
+    rows = db.session.execute(
+        db.select(student.c.id, student.c.accolade_mask, expected)
+        .where(student.c.accolade_mask != expected)
+        .order_by(student.c.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def backfill_accolade_masks():
+    """Rewrite Student.accolade_mask from the Accolade rows, returns rows changed"""
+    student = Student.__table__
+    expected = _expected_mask()
+    result = db.session.execute(
+        update(student)
+        .where(student.c.accolade_mask != expected)
+        .values(accolade_mask=expected)
+    )
+    rebuild_stats(commit=False)
+    db.session.commit()
+    if result.rowcount:
+        invalidate('students', 'pending')
+    return result.rowcount
+
+
+def _student_chunks(chunk_size, start_after=0):
+    """Yield (first_id, last_id) ranges of at most chunk_size students, in id order"""
+    student = Student.__table__
+    last = start_after
+    while True:
+        ids = db.session.scalars(
+            db.select(student.c.id).where(student.c.id > last).order_by(student.c.id).limit(chunk_size)
+        ).all()
+        db.session.rollback()  # don't hold the read snapshot between chunks
+        if not ids:
+            return
+        yield ids[0], ids[-1]
+        last = ids[-1]
+
+
+def recompute_accolades(revoke=False, chunk_size=5000, start_after=0, progress=None):
+    """Bring Accolade rows and accolade masks in line with MILESTONES and total_hours.
+
+    Works through the students in id ranges, one short transaction per range:
+    the range's student rows are locked (on databases that support it) so a
+    concurrent add_hours waits instead of racing, missing accolades are inserted
+    with one INSERT ... SELECT, with revoke=True accolades for unknown milestones
+    or above the student's hours are deleted, and masks and stat counters are
+    updated to match. Re-running is harmless, and start_after resumes after the
+    last id a previous run reported through progress(last_id, totals).
+    """
+    student, accolade = Student.__table__, Accolade.__table__
+    milestones = union_all(*[db.select(literal(m, Integer).label('milestone')) for m in MILESTONES]).subquery('m')
+    totals = {'students': 0, 'inserted': 0, 'revoked': 0, 'masks': 0}
+
+    for first, last in _student_chunks(chunk_size, start_after):
+        in_range = student.c.id.between(first, last)
+        locked = db.session.scalars(db.select(student.c.id).where(in_range).with_for_update()).all()
+        # the range's accolades as a derived table, joined rather than correlated,
+        # so each statement reads the accolade table once whatever its indexes
+        held = db.select(accolade.c.student_id, accolade.c.milestone).where(
+            accolade.c.student_id.between(first, last)).subquery('held')
+
+        missing = (
+            db.select(student.c.id, milestones.c.milestone)
+            .select_from(
+                student.join(milestones, student.c.total_hours >= milestones.c.milestone)
+                .outerjoin(held, and_(held.c.student_id == student.c.id, held.c.milestone == milestones.c.milestone))
+            )
+            .where(in_range, held.c.student_id.is_(None))
+        )
+        inserted = db.session.execute(insert(accolade).from_select(['student_id', 'milestone'], missing)).rowcount
+
+        revoked = 0
+        if revoke:
+            hours = db.select(student.c.total_hours).where(student.c.id == accolade.c.student_id).scalar_subquery()
+            revoked = db.session.execute(
+                delete(accolade)
+                .where(accolade.c.student_id.between(first, last),
+                       or_(accolade.c.milestone.not_in(MILESTONES), accolade.c.milestone > func.coalesce(hours, 0)))
+            ).rowcount
+
+        bit = case({milestone: milestone_bit(milestone) for milestone in MILESTONES},
+                   value=accolade.c.milestone, else_=0)
+        masks = (
+            db.select(accolade.c.student_id, func.sum(bit.distinct()).label('mask'))
+            .where(accolade.c.student_id.between(first, last))
+            .group_by(accolade.c.student_id)
+            .subquery('masks')
+        )
+        expected = func.coalesce(masks.c.mask, 0)
+        changed = db.session.execute(
+            db.select(student.c.id, student.c.accolade_mask, expected)
+            .select_from(student.outerjoin(masks, masks.c.student_id == student.c.id))
+            .where(in_range, student.c.accolade_mask != expected)
+        ).all()
+        if changed:
+            db.session.execute(
+                update(student).where(student.c.id == bindparam('student_id')).values(accolade_mask=bindparam('mask')),
+                [{'student_id': student_id, 'mask': mask} for student_id, _, mask in changed]
+            )
+            deltas = Counter()
+            for _, old, new in changed:
+                deltas.update(student_deltas(old_mask=old or 0, new_mask=new))
+            apply_stats(deltas)
+        db.session.commit()
+        if changed:
+            invalidate('students', 'pending')
+
+        totals['students'] += len(locked)
+        totals['inserted'] += inserted
+        totals['revoked'] += revoked
+        totals['masks'] += len(changed)
+        if progress:
+            progress(last, totals)
+    return totals
@@ -2,6 +2,7 @@ from flask_jwt_extended import create_access_token, jwt_required, JWTManager, ge
 
 from App.models import User
 from App.database import db
+from App.token_cache import CachingJWTManager, token_cache_from_config
 
 def login(username, password, role=None):
   result = db.session.execute(db.select(User).filter_by(username=username))
@@ -16,7 +17,8 @@ def login(username, password, role=None):
 
 
 def setup_jwt(app):
-  jwt = JWTManager(app)
+  # verified tokens are remembered until they expire, see App/token_cache.py
+  jwt = CachingJWTManager(app, token_cache=token_cache_from_config(app))
 
   # Always store a string user id in the JWT identity (sub),
   # whether a User object or a raw id is passed.
@@ -2,11 +2,14 @@ from .user import create_user
 from .student import create_student
 from .staff import create_staff
 from App.database import db
+from App.cache import invalidate
 
 
 def initialize():
     db.drop_all()
     db.create_all()
+    # ids start over, so results cached for the old rows must go
+    invalidate('students', 'staff', 'pending')
 
     student1 = create_student('alice', 'alice123', 'Alice Johnson')
     student2 = create_student('bob', 'bob123', 'Bob Smith')
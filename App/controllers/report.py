@@ -0,0 +1,99 @@
+import csv
+import io
+import time
+
+from App.models import Student, mask_to_milestones
+from App.database import db
+
+
+REPORT_COLUMNS = ['id', 'username', 'name', 'total_hours', 'accolades', 'confirmation_requested']
+REPORT_FORMATS = ['csv', 'parquet']
+
+
+def iter_student_report(*criteria, chunk_size=5000):
+    """Yield the hours report in lists of at most chunk_size rows.
+
+    Rows are (id, username, name, total_hours, accolades, confirmation_requested)
+    read with a column-only select and yield_per, which streams from a
+    server-side cursor on Postgres, so memory stays flat however many students
+    there are.
+    """
+    stmt = (
+        db.select(Student.id, Student.username, Student.name, Student.total_hours,
+                  Student.accolade_mask, Student.confirmation_requested)
+        .where(*criteria)
+        .order_by(Student.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = db.session.execute(stmt)
+    try:
+        for partition in result.partitions():
+            yield [(student_id, username, name, total_hours or 0, mask_to_milestones(mask or 0), bool(requested))
+                   for student_id, username, name, total_hours, mask, requested in partition]
+    finally:
+        result.close()
+
+
+def _csv_chunks(*criteria, chunk_size=5000):
+    """Yield (csv_text, row_count) per chunk, the header comes with the first one"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    for rows in iter_student_report(*criteria, chunk_size=chunk_size):
+        writer.writerows((student_id, username, name, total_hours, ' '.join(map(str, accolades)), requested)
+                         for student_id, username, name, total_hours, accolades, requested in rows)
+        yield buffer.getvalue(), len(rows)
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue(), 0
+
+
+def iter_hours_csv(*criteria, chunk_size=5000):
+    """Yield the hours report as CSV text, one piece per chunk of rows"""
+    for text, _ in _csv_chunks(*criteria, chunk_size=chunk_size):
+        yield text
+        # under gevent's monkey patching this lets the worker serve other requests between chunks
+        time.sleep(0)
+
+
+def _parquet_schema(pyarrow):
+    return pyarrow.schema([
+        ('id', pyarrow.int64()),
+        ('username', pyarrow.string()),
+        ('name', pyarrow.string()),
+        ('total_hours', pyarrow.int64()),
+        ('accolades', pyarrow.list_(pyarrow.int32())),
+        ('confirmation_requested', pyarrow.bool_())
+    ])
+
+
+def write_hours_report(out, format='csv', chunk_size=5000):
+    """Write the hours report to the binary file object `out`, returns the number of rows.
+
+    'parquet' writes one row group per chunk and needs pyarrow.
+    """
+    if format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{format}'")
+    rows = 0
+    if format == 'csv':
+        for text, count in _csv_chunks(chunk_size=chunk_size):
+            out.write(text.encode())
+            rows += count
+        return rows
+
+    # pyarrow is optional (requirements-perf.txt) and slow to import, so only load it here
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install -r requirements-perf.txt)")
+    schema = _parquet_schema(pyarrow)
+    with pyarrow.parquet.ParquetWriter(out, schema) as writer:
+        for chunk in iter_student_report(chunk_size=chunk_size):
+            writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(zip(*chunk), schema)],
+                schema=schema
+            ))
+            rows += len(chunk)
+    return rows
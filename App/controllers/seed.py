@@ -0,0 +1,100 @@
+import random
+from collections import Counter
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from App.models import User, Student, Staff, Accolade, MILESTONES, milestone_bit
+from App.database import db
+from App.cache import invalidate
+from .stats import apply_stats, hours_bucket
+
+
+HOURS_DISTRIBUTIONS = ['exponential', 'uniform', 'none']
+
+
+def _hours_sampler(distribution, mean_hours, max_hours, rng):
+    if distribution == 'none':
+        return lambda: 0
+    if distribution == 'uniform':
+        return lambda: rng.randint(0, max_hours)
+    if distribution == 'exponential':
+        # long tail: ~15% never log anything, most log a little, a few log a lot
+        def sample():
+            if rng.random() < 0.15:
+                return 0
+            return min(int(rng.expovariate(1 / mean_hours)) + 1, max_hours)
+        return sample
+    raise ValueError(f"Unknown hours distribution '{distribution}'")
+
+
+def _insert_users(rows, subclass, extra):
+    """Insert a batch into user and its subclass table, returning the new ids"""
+    result = db.session.execute(
+        insert(User.__table__).returning(User.__table__.c.id, sort_by_parameter_order=True),
+        rows
+    )
+    ids = result.scalars().all()
+    db.session.execute(insert(subclass.__table__), [dict(id=user_id, **extra(i)) for i, user_id in enumerate(ids)])
+    return ids
+
+
+def _next_suffix(prefix):
+    """One past the largest n of the existing <prefix><n> usernames, 0 when there are none"""
+    usernames = db.session.scalars(db.select(User.username).where(User.username.startswith(prefix)))
+    suffixes = (name[len(prefix):] for name in usernames)
+    return max((int(n) for n in suffixes if n.isascii() and n.isdigit()), default=-1) + 1
+
+
+def seed_database(students=0, staff=0, hours_distribution='exponential', mean_hours=18, max_hours=400,
+                  pending_ratio=0.05, password='password', reset=False, seed=None, batch_size=10000):
+    """Bulk-insert synthetic staff, students and their accolades.
+
+    Rows are written with executemany inserts, one transaction per batch, and
+    every account shares a single precomputed password hash. Usernames are
+    staff<n> / student<n>, numbered on from the highest such username already
+    present, so they never collide with existing or hand-made accounts.
+    """
+    if reset:
+        db.drop_all()
+        db.create_all()
+
+    rng = random.Random(seed)
+    sample_hours = _hours_sampler(hours_distribution, mean_hours, max_hours, rng)
+    password_hash = generate_password_hash(password)
+    counts = {'staff': 0, 'students': 0, 'accolades': 0}
+
+    staff_start = _next_suffix('staff')
+    for start in range(0, staff, batch_size):
+        size = min(batch_size, staff - start)
+        rows = [{'username': f'staff{staff_start + start + i}', 'password': password_hash,
+                 'name': f'Staff {staff_start + start + i}', 'user_type': 'staff'} for i in range(size)]
+        _insert_users(rows, Staff, lambda i: {})
+        db.session.commit()
+        counts['staff'] += size
+
+    student_start = _next_suffix('student')
+    for start in range(0, students, batch_size):
+        size = min(batch_size, students - start)
+        hours = [sample_hours() for _ in range(size)]
+        pending = [h > 0 and rng.random() < pending_ratio for h in hours]
+        rows = [{'username': f'student{student_start + start + i}', 'password': password_hash,
+                 'name': f'Student {student_start + start + i}', 'user_type': 'student'} for i in range(size)]
+        masks = [sum(milestone_bit(m) for m in MILESTONES if h >= m) for h in hours]
+        ids = _insert_users(rows, Student,
+                            lambda i: {'total_hours': hours[i], 'confirmation_requested': pending[i],
+                                       'accolade_mask': masks[i]})
+        accolades = [{'student_id': student_id, 'milestone': milestone}
+                     for student_id, h in zip(ids, hours) for milestone in MILESTONES if h >= milestone]
+        if accolades:
+            db.session.execute(insert(Accolade.__table__), accolades)
+        deltas = Counter({'students': size, 'total_hours': sum(hours), 'pending': sum(pending)})
+        deltas.update(f'hours:{hours_bucket(h)}' for h in hours)
+        deltas.update(f'accolades:{a["milestone"]}' for a in accolades)
+        apply_stats(deltas)
+        db.session.commit()
+        counts['students'] += size
+        counts['accolades'] += len(accolades)
+
+    invalidate('students', 'staff', 'pending')
+    return counts
@@ -1,5 +1,12 @@
-from App.models import Staff, Student
+from collections import Counter
+
+from flask import current_app
+
+from App.models import Staff, Student, UserSummary, StudentSummary
+from .student import get_student_summaries, add_hours_with_stats, student_tags
+from .stats import apply_stats
 from App.database import db
+from App.cache import cached, invalidate
 
 
 def create_staff(username, password, name):
@@ -7,6 +14,7 @@ def create_staff(username, password, name):
     new_staff = Staff(username=username, password=password, name=name)
     db.session.add(new_staff)
     db.session.commit()
+    invalidate('staff')
     return new_staff
 
 
@@ -20,15 +28,16 @@ def get_staff_by_username(username):
     return Staff.query.filter_by(username=username).first()
 
 
+@cached('staff')
 def get_all_staff():
     """Get all staff members"""
-    return Staff.query.all()
+    stmt = db.select(Staff.id, Staff.username, Staff.name, Staff.user_type).order_by(Staff.id)
+    return [UserSummary.from_row(*row) for row in db.session.execute(stmt)]
 
 
 def get_all_staff_json():
     """Get all staff as JSON"""
-    staff_members = Staff.query.all()
-    return [staff.get_json() for staff in staff_members]
+    return [staff.get_json() for staff in get_all_staff()]
 
 
 def log_hours_for_student(staff_id, student_id, hours):
@@ -37,6 +46,16 @@ def log_hours_for_student(staff_id, student_id, hours):
     if not staff:
         return None, "Staff member not found"
 
+    committer = current_app.extensions.get('group_commit')
+    if committer is not None:
+        if hours <= 0:
+            return None, "Hours must be positive"
+        # returns a StudentSummary once the batch holding these hours has committed
+        student = committer.submit(int(student_id), hours)
+        if not student:
+            return None, "Student not found"
+        return student, None
+
     student = Student.query.get(student_id)
     if not student:
         return None, "Student not found"
@@ -44,11 +63,42 @@ def log_hours_for_student(staff_id, student_id, hours):
     if hours <= 0:
         return None, "Hours must be positive"
 
-    student.add_hours(hours)
+    add_hours_with_stats(student, hours)
     db.session.commit()
+    invalidate(*student_tags(student.id, student.confirmation_requested))
     return student, None
 
 
+def apply_hours_batch(increments):
+    """Apply (student_id, hours) increments in one transaction, merged per student.
+
+    Student rows are locked in id order so concurrent batches cannot deadlock.
+    Returns a StudentSummary per updated student, taken before the commit so
+    callers in other sessions never touch expired ORM state.
+    """
+    merged = Counter()
+    for student_id, hours in increments:
+        merged[student_id] += hours
+    try:
+        students = db.session.scalars(
+            db.select(Student).where(Student.id.in_(merged)).order_by(Student.id).with_for_update()
+        ).all()
+        summaries = {}
+        for student in students:
+            add_hours_with_stats(student, merged[student.id])
+            summaries[student.id] = StudentSummary.from_row(
+                student.id, student.username, student.name, student.user_type,
+                student.total_hours, student.confirmation_requested, student.accolade_mask
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate(*{tag for summary in summaries.values()
+                 for tag in student_tags(summary.id, summary.confirmation_requested)})
+    return summaries
+
+
 def confirm_student_hours(staff_id, student_id):
     """Staff confirms hours requested by student"""
     staff = get_staff(staff_id)
@@ -63,11 +113,34 @@ def confirm_student_hours(staff_id, student_id):
         return None, "No confirmation request from this student"
 
     student.confirmation_requested = False
+    apply_stats({'pending': -1})
     db.session.commit()
+    invalidate(*student_tags(student.id, pending=True))
     return student, None
 
 
-def get_pending_confirmations():
+def confirm_hours_bulk(student_ids):
+    """Confirm every pending request among student_ids in one UPDATE, returns how many were confirmed"""
+    if not student_ids:
+        return 0
+    student = Student.__table__
+    result = db.session.execute(
+        db.update(student)
+        .where(student.c.id.in_(student_ids), student.c.confirmation_requested == True)
+        .values(confirmation_requested=False)
+    )
+    apply_stats({'pending': -result.rowcount})
+    db.session.commit()
+    invalidate('pending', *(f'student:{student_id}' for student_id in student_ids))
+    return result.rowcount
+
+
+@cached('students', 'pending')
+def get_pending_students():
     """Get all students with pending confirmation requests"""
-    students = Student.query.filter_by(confirmation_requested=True).all()
-    return [student.get_json() for student in students]
+    return get_student_summaries(Student.confirmation_requested == True)
+
+
+def get_pending_confirmations():
+    """Get all students with pending confirmation requests as JSON"""
+    return [student.get_json() for student in get_pending_students()]
@@ -0,0 +1,124 @@
+from bisect import bisect_right
+from collections import Counter
+
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from App.models import Student, Stat, MILESTONES, milestone_bit
+from App.database import db
+
+
+# lower bound of each hours histogram bucket, the last one is open ended
+HOURS_BUCKETS = [0, 1, 10, 25, 50, 100, 250]
+
+
+def hours_bucket(hours):
+    """Lower bound of the histogram bucket holding `hours`"""
+    return HOURS_BUCKETS[bisect_right(HOURS_BUCKETS, hours or 0) - 1]
+
+
+def student_deltas(old_hours=0, new_hours=0, old_mask=0, new_mask=0):
+    """Counter changes for one student moving from the old to the new hours and accolade mask"""
+    deltas = Counter()
+    deltas['total_hours'] += (new_hours or 0) - (old_hours or 0)
+    deltas[f'hours:{hours_bucket(old_hours)}'] -= 1
+    deltas[f'hours:{hours_bucket(new_hours)}'] += 1
+    for milestone in MILESTONES:
+        bit = milestone_bit(milestone)
+        deltas[f'accolades:{milestone}'] += bool(new_mask & bit) - bool(old_mask & bit)
+    return deltas
+
+
+def new_student_deltas(count=1):
+    return Counter({'students': count, f'hours:{HOURS_BUCKETS[0]}': count})
+
+
+def removed_student_deltas(hours=0, mask=0, pending=False):
+    """Counter changes for deleting a student with these hours, accolade mask and pending flag"""
+    deltas = student_deltas(hours, 0, mask, 0)
+    deltas.subtract(new_student_deltas())
+    deltas['pending'] -= bool(pending)
+    return deltas
+
+
+# INSERT ... ON CONFLICT DO UPDATE, so two first writers of a counter can't both insert it
+_UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def apply_stats(deltas):
+    """Add `deltas` to the counters in the current transaction; the caller commits.
+
+    Each counter is an upsert of value = value + delta, so concurrent writers
+    never lose each other's changes, including the first write to a counter
+    that has no row yet. Keys are written in sorted order so concurrent
+    transactions lock them in the same order.
+    """
+    changes = {key: delta for key, delta in deltas.items() if delta}
+    if not changes:
+        return
+    stat = Stat.__table__
+    rows = [{'key': key, 'value': delta} for key, delta in sorted(changes.items())]
+    upsert = _UPSERTS.get(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(stat)
+        db.session.execute(
+            stmt.on_conflict_do_update(index_elements=[stat.c.key], set_={'value': stat.c.value + stmt.excluded.value}),
+            rows
+        )
+        return
+    missing = []
+    for row in rows:
+        result = db.session.execute(
+            update(stat).where(stat.c.key == row['key']).values(value=stat.c.value + row['value'])
+        )
+        if result.rowcount == 0:
+            missing.append(row)
+    if missing:
+        db.session.execute(insert(stat), missing)
+
+
+def rebuild_stats(commit=True):
+    """Recompute every counter from the student table"""
+    student = Student.__table__
+    bucket = case(
+        *[(student.c.total_hours >= lower, lower) for lower in reversed(HOURS_BUCKETS[1:])],
+        else_=HOURS_BUCKETS[0]
+    )
+    totals = db.session.execute(
+        db.select(
+            func.count(),
+            func.coalesce(func.sum(student.c.total_hours), 0),
+            func.coalesce(func.sum(case((student.c.confirmation_requested == True, 1), else_=0)), 0),
+            *[func.coalesce(func.sum(case((student.c.accolade_mask.op('&')(milestone_bit(m)) != 0, 1), else_=0)), 0)
+              for m in MILESTONES]
+        )
+    ).one()
+    students, total_hours, pending, *accolades = totals
+    values = {'students': students, 'total_hours': total_hours, 'pending': pending}
+    values.update({f'accolades:{m}': count for m, count in zip(MILESTONES, accolades)})
+    values.update({f'hours:{lower}': 0 for lower in HOURS_BUCKETS})
+    for lower, count in db.session.execute(db.select(bucket, func.count()).group_by(bucket)):
+        values[f'hours:{lower}'] = count
+
+    db.session.execute(db.delete(Stat.__table__))
+    db.session.execute(insert(Stat.__table__), [{'key': key, 'value': value} for key, value in values.items()])
+    if commit:
+        db.session.commit()
+    return get_stats()
+
+
+def get_stats():
+    """Totals for dashboards, read from the counters table in one SELECT"""
+    values = dict(db.session.execute(db.select(Stat.key, Stat.value)).all())
+    buckets = HOURS_BUCKETS + [None]
+    return {
+        'students': values.get('students', 0),
+        'total_hours': values.get('total_hours', 0),
+        'pending_confirmations': values.get('pending', 0),
+        'hours_histogram': [
+            {'min': lower, 'max': upper - 1 if upper is not None else None,
+             'students': values.get(f'hours:{lower}', 0)}
+            for lower, upper in zip(buckets, buckets[1:])
+        ],
+        'accolades': {str(m): values.get(f'accolades:{m}', 0) for m in MILESTONES}
+    }
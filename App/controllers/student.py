@@ -1,15 +1,24 @@
-from App.models import Student
+from App.models import Student, StudentSummary
 from App.database import db
+from App.cache import cached, invalidate
+from .stats import apply_stats, new_student_deltas, student_deltas
 
 
 def create_student(username, password, name):
     """Create a new student"""
     new_student = Student(username=username, password=password, name=name)
     db.session.add(new_student)
+    apply_stats(new_student_deltas())
     db.session.commit()
+    invalidate(*student_tags(new_student.id))
     return new_student
 
 
+def student_tags(student_id, pending=False):
+    """Cache tags to invalidate when a student changes, pending when the pending list changes too"""
+    return (f'student:{student_id}', 'pending') if pending else (f'student:{student_id}',)
+
+
 def get_student(student_id):
     """Get student by ID"""
     return Student.query.get(student_id)
@@ -20,15 +29,29 @@ def get_student_by_username(username):
     return Student.query.filter_by(username=username).first()
 
 
+@cached('students', 'student:{0}')
+def get_student_summary(student_id):
+    """Get a read-only StudentSummary by ID, cached"""
+    summaries = get_student_summaries(Student.id == student_id)
+    return summaries[0] if summaries else None
+
+
+def get_student_summaries(*criteria, order_by=None):
+    """Get read-only StudentSummary rows with a column-only select"""
+    stmt = db.select(Student.id, Student.username, Student.name, Student.user_type,
+                     Student.total_hours, Student.confirmation_requested, Student.accolade_mask)
+    stmt = stmt.where(*criteria).order_by(order_by if order_by is not None else Student.id)
+    return [StudentSummary.from_row(*row) for row in db.session.execute(stmt)]
+
+
 def get_all_students():
     """Get all students"""
-    return Student.query.all()
+    return get_student_summaries()
 
 
 def get_all_students_json():
     """Get all students as JSON"""
-    students = Student.query.all()
-    return [student.get_json() for student in students]
+    return [student.get_json() for student in get_all_students()]
 
 
 def add_hours_to_student(student_id, hours):
@@ -36,30 +59,45 @@ def add_hours_to_student(student_id, hours):
     student = get_student(student_id)
     if not student:
         return None
-    student.add_hours(hours)
+    add_hours_with_stats(student, hours)
     db.session.commit()
+    invalidate(*student_tags(student.id, student.confirmation_requested))
     return student
 
 
+def add_hours_with_stats(student, hours):
+    """Add hours and move the student's share of the counters, without committing"""
+    old_hours, old_mask = student.total_hours, student.accolade_mask
+    student.add_hours(hours)
+    apply_stats(student_deltas(old_hours, student.total_hours, old_mask, student.accolade_mask))
+
+
 def request_hours_confirmation(student_id):
     """Student requests confirmation of their hours"""
     student = get_student(student_id)
     if not student:
         return None
+    if not student.confirmation_requested:
+        apply_stats({'pending': 1})
     student.request_confirmation()
     db.session.commit()
+    invalidate(*student_tags(student.id, pending=True))
     return student
 
 
 def get_student_accolades(student_id):
     """Get accolades for a student"""
-    student = get_student(student_id)
+    student = get_student_summary(student_id)
     if not student:
         return None
-    return student.get_accolades()
+    return student.accolades
+
+
+def get_leaderboard_students():
+    """Get students sorted by hours (descending)"""
+    return get_student_summaries(order_by=Student.total_hours.desc())
 
 
 def get_leaderboard():
     """Get leaderboard sorted by hours (descending)"""
-    students = Student.query.order_by(Student.total_hours.desc()).all()
-    return [student.get_json() for student in students]
+    return [student.get_json() for student in get_leaderboard_students()]
@@ -1,5 +1,8 @@
-from App.models import User, Student, Staff
+from App.models import User, Student, Staff, UserSummary, StudentSummary
 from App.database import db
+from App.cache import invalidate
+from .stats import apply_stats, new_student_deltas
+from .student import student_tags
 
 def create_user(username, password, name="User", role="student"):
     """Create a user with the specified role (student or staff)"""
@@ -8,7 +11,10 @@ def create_user(username, password, name="User", role="student"):
     else:
         newuser = Student(username=username, password=password, name=name)
     db.session.add(newuser)
+    if role != "staff":
+        apply_stats(new_student_deltas())
     db.session.commit()
+    invalidate(*(('staff',) if role == "staff" else student_tags(newuser.id)))
     return newuser
 
 def get_user_by_username(username):
@@ -19,7 +25,18 @@ def get_user(id):
     return db.session.get(User, id)
 
 def get_all_users():
-    return db.session.scalars(db.select(User)).all()
+    """Get all users as read-only UserSummary/StudentSummary rows"""
+    user, student = User.__table__, Student.__table__
+    stmt = (
+        db.select(user.c.id, user.c.username, user.c.name, user.c.user_type,
+                  student.c.total_hours, student.c.confirmation_requested, student.c.accolade_mask)
+        .select_from(user.outerjoin(student, student.c.id == user.c.id))
+        .order_by(user.c.id)
+    )
+    return [
+        StudentSummary.from_row(*row) if row.user_type == 'student' else UserSummary.from_row(*row[:4])
+        for row in db.session.execute(stmt)
+    ]
 
 def get_all_users_json():
     users = get_all_users()
@@ -34,5 +51,9 @@ def update_user(id, username):
         user.username = username
         # user is already in the session; no need to re-add
         db.session.commit()
+        if user.user_type == 'staff':
+            invalidate('staff')
+        else:
+            invalidate(*student_tags(user.id, user.confirmation_requested))
         return True
     return None
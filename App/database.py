@@ -1,14 +1,37 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 
 
 db = SQLAlchemy()
 
 def get_migrate(app):
+    # alembic is only needed by the `flask db` commands, not by the server
+    from flask_migrate import Migrate
     return Migrate(app, db)
 
 def create_db():
     db.create_all()
     
 def init_db(app):
-    db.init_app(app)
\ No newline at end of file
+    db.init_app(app)
+
+def share_db(app, parent):
+    """Bind `app` to the engines `parent` already opened, rather than a second pool.
+
+    Flask-SQLAlchemy has no public way to share engines between apps, so this
+    does what init_app does with private attributes of 3.1 (_app_engines,
+    _teardown_session). requirements.txt pins 3.1.x for that reason, and
+    test_admin_shares_parent_setup in App/tests/test_startup.py fails if an
+    upgrade stops the admin app from using the parent's engines.
+    """
+    app.extensions['sqlalchemy'] = db
+    app.teardown_appcontext(db._teardown_session)
+    db._app_engines[app] = db._app_engines[parent]
+
+def reset_engines(app, close=True):
+    """Drop pooled connections so a forked worker opens its own.
+
+    Called with close=False in the child, so the parent's sockets are left alone.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
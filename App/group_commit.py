@@ -0,0 +1,77 @@
+import threading
+
+
+class _Batch:
+    def __init__(self):
+        self.increments = []  # (student_id, hours) in arrival order
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = {}
+        self.error = None
+
+
+class GroupCommitter:
+    """Coalesces hour increments from concurrent requests into one transaction.
+
+    The first request to arrive opens a batch and becomes its leader: it waits
+    up to `window` seconds (less if `max_batch` increments arrive), then
+    applies the whole batch with `flush(increments)` in its own session and
+    commits. Every other request in the batch blocks until that commit, so
+    each caller is only acknowledged once its hours are durable.
+
+    Waiting needs concurrent requests to pay off, so use it with gevent or
+    threaded workers; a sync worker would only add the window to every call.
+    """
+
+    def __init__(self, flush, window=0.005, max_batch=500):
+        self.flush = flush
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.increments = 0
+        self._batch = None
+        self._lock = threading.Lock()
+
+    def submit(self, student_id, hours):
+        """Queue an increment and wait for the commit that includes it, returns flush's result for the student"""
+        with self._lock:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+            batch.increments.append((student_id, hours))
+            if len(batch.increments) >= self.max_batch:
+                # later requests start a new batch instead of growing this one
+                self._batch = None
+                batch.full.set()
+
+        if not leader:
+            batch.done.wait()
+        else:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+                increments = list(batch.increments)
+            try:
+                batch.results = self.flush(increments)
+            except Exception as e:
+                batch.error = e
+            finally:
+                self.batches += 1
+                self.increments += len(increments)
+                batch.done.set()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results.get(student_id)
+
+
+def setup_group_commit(app, flush):
+    """Buffer log-hours increments for GROUP_COMMIT_WINDOW_MS and commit them together"""
+    if not app.config['GROUP_COMMIT_ENABLED']:
+        return None
+    committer = GroupCommitter(flush, app.config['GROUP_COMMIT_WINDOW_MS'] / 1000,
+                               app.config['GROUP_COMMIT_MAX_BATCH'])
+    app.extensions['group_commit'] = committer
+    return committer
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from App.database import db
+from App.limits import get_pool_wait_monitor
+
+
+def pool_status(engine):
+    """Checked out, idle and maximum connections of a QueuePool, just the class for other pools"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        max_overflow = pool._max_overflow
+        status.update(
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            capacity=None if max_overflow < 0 else pool.size() + max_overflow
+        )
+    return status
+
+
+class ReadinessProbe:
+    """Decides whether this worker should get traffic.
+
+    The DB round trip is cached for `db_ttl` seconds and only one caller
+    refreshes it at a time, so a load balancer polling every worker costs at
+    most one `SELECT 1` per worker per interval. Pool and in-flight figures
+    are in-memory counters.
+    """
+
+    def __init__(self, app, db_ttl=2.0, max_pool_wait=0.2, max_in_flight=0, clock=time.monotonic):
+        self.app = app
+        self.db_ttl = db_ttl
+        self.max_pool_wait = max_pool_wait
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.pool_monitor = get_pool_wait_monitor(app)
+        self._db = None  # (checked_at, ok, latency_ms, error)
+        self._refreshing = threading.Lock()
+
+    def _probe_db(self, engine):
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            return True, round((time.perf_counter() - started) * 1000, 2), None
+        except Exception as e:
+            return False, None, type(e).__name__
+
+    def check_db(self, engine, pool):
+        cached = self._db
+        if cached is not None and self.clock() - cached[0] < self.db_ttl:
+            return cached
+        if not self._refreshing.acquire(blocking=False):
+            # someone else is probing, answer with what we have; a worker that has
+            # never reached the database is not ready yet
+            return cached or (self.clock(), False, None, 'not probed yet')
+        try:
+            if pool.get('capacity') is not None and pool['checked_out'] >= pool['capacity']:
+                # a probe would queue behind the requests, the pool figures already say enough
+                result = (False, None, 'pool exhausted')
+            else:
+                result = self._probe_db(engine)
+            self._db = (self.clock(),) + result
+            return self._db
+        finally:
+            self._refreshing.release()
+
+    def check(self):
+        """Returns (ready, report)"""
+        engine = db.engine
+        pool = pool_status(engine)
+        pool['wait_ms'] = round(self.pool_monitor.average * 1000, 2)
+        _, db_ok, db_latency, db_error = self.check_db(engine, pool)
+        admission = self.app.extensions.get('admission_control')
+        in_flight = admission.in_flight if admission is not None else None
+
+        failing = []
+        if not db_ok:
+            failing.append('database')
+        if self.max_pool_wait and pool['wait_ms'] > self.max_pool_wait * 1000:
+            failing.append('pool_wait')
+        if self.max_in_flight and in_flight is not None and in_flight >= self.max_in_flight:
+            failing.append('in_flight')
+        report = {
+            'status': 'unavailable' if failing else 'ready',
+            'failing': failing,
+            'database': {'ok': db_ok, 'latency_ms': db_latency, 'error': db_error},
+            'pool': pool,
+            'in_flight': in_flight
+        }
+        return not failing, report
+
+
+def setup_health(app):
+    """Readiness checks for GET /health/ready"""
+    probe = ReadinessProbe(app, app.config['READINESS_DB_TTL'], app.config['READINESS_MAX_POOL_WAIT_MS'] / 1000,
+                           app.config['READINESS_MAX_IN_FLIGHT'])
+    app.extensions['readiness'] = probe
+    return probe
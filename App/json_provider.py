@@ -0,0 +1,80 @@
+from flask.json.provider import DefaultJSONProvider, _default
+from werkzeug.utils import import_string
+
+try:
+    import orjson
+except ImportError:  # optional accelerator, see requirements-perf.txt
+    orjson = None
+
+
+def _default_with_models(obj):
+    """Serialize models (anything with get_json) as they are reached, then Flask's defaults"""
+    get_json = getattr(obj, 'get_json', None)
+    if get_json is not None:
+        return get_json()
+    return _default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson straight to bytes.
+
+    Falls back to the stdlib encoder when orjson is not installed, or when a
+    call passes json.dumps keyword arguments orjson does not understand.
+    Dates and UUIDs are still handed to Flask's default hook so responses are
+    identical to the stock provider. Models can be passed to
+    jsonify() as they are and are serialized one at a time through their
+    get_json(), so bulk responses don't build a list of dicts first.
+    """
+
+    default = staticmethod(_default_with_models)
+
+    def _option(self, indent=False):
+        # dataclasses (the read models) are serialized natively, without a dict
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize obj to UTF-8 bytes"""
+        if orjson is None:
+            dump_args = {'indent': 2} if indent else {'separators': (',', ':')}
+            return self.dumps(obj, **dump_args).encode()
+        return orjson.dumps(obj, default=self.default, option=self._option(indent))
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's stock provider, plus serializing models through get_json()"""
+
+    default = staticmethod(_default_with_models)
+
+
+JSON_PROVIDERS = {
+    'fast': FastJSONProvider,
+    'default': StdlibJSONProvider,
+}
+
+
+def setup_json_provider(app):
+    """Install the provider named by JSON_PROVIDER ('fast', 'default' or an import path)"""
+    name = app.config['JSON_PROVIDER']
+    provider_class = JSON_PROVIDERS.get(name) or import_string(name)
+    app.json = provider_class(app)
+    return app.json
@@ -0,0 +1,221 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request, g, jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now):
+        """Spend a token, returns 0 or the seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets per (client, rule) for this process.
+
+    `default` applies to every request of a client, `rules` maps URL rules
+    such as '/api/login' to stricter (rate, burst) pairs on top of it. Only
+    the `max_clients` most recently seen buckets are kept.
+    """
+
+    def __init__(self, default, rules, max_clients=100000, clock=time.monotonic):
+        self.default = tuple(default) if default else None
+        self.rules = {rule: tuple(limit) for rule, limit in (rules or {}).items()}
+        self.max_clients = max_clients
+        self.clock = clock
+        self.limited = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _take(self, key, limit, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(limit[0], limit[1], now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+    def check(self, client, rule):
+        """Returns 0 if the request may go ahead, otherwise the seconds to wait"""
+        limit = self.rules.get(rule)
+        with self._lock:
+            now = self.clock()
+            wait = self._take((client, rule), limit, now) if limit else 0
+            if not wait and self.default:
+                wait = self._take((client, None), self.default, now)
+            if wait:
+                self.limited += 1
+            return wait
+
+
+_execute_started = threading.local()
+
+
+def _stamp_execute(orm_execute_state):
+    _execute_started.value = time.monotonic()
+
+
+class PoolWaitMonitor:
+    """Time-decayed average of how long sessions wait for a pooled connection.
+
+    Every session statement stamps the time before it asks for a connection
+    and the engine's checkout event measures from that stamp. The average
+    decays towards 0 over `decay` seconds without checkouts, so shedding
+    every request cannot keep it above the limit for ever.
+    """
+
+    def __init__(self, decay=1.0, clock=time.monotonic):
+        self.decay = decay
+        self.clock = clock
+        self._average = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now):
+        return self._average * math.exp(-(now - self._updated) / self.decay)
+
+    def record(self, seconds):
+        with self._lock:
+            now = self.clock()
+            weight = 1 - math.exp(-(now - self._updated) / self.decay) if now > self._updated else 0
+            # at least 10% per sample so bursts of checkouts at the same instant still move it
+            weight = max(weight, 0.1)
+            self._average = self._decayed(now) * (1 - weight) + seconds * weight
+            self._updated = now
+
+    @property
+    def average(self):
+        with self._lock:
+            return self._decayed(self.clock())
+
+    def install(self, engine):
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            started = getattr(_execute_started, 'value', None)
+            if started is not None:
+                _execute_started.value = None
+                self.record(time.monotonic() - started)
+
+        def on_checkin(dbapi_connection, connection_record):
+            _execute_started.value = None
+
+        if not event.contains(Session, 'do_orm_execute', _stamp_execute):
+            event.listen(Session, 'do_orm_execute', _stamp_execute)
+        event.listen(engine, 'checkout', on_checkout)
+        event.listen(engine, 'checkin', on_checkin)
+
+
+def get_pool_wait_monitor(app):
+    """The app's PoolWaitMonitor, installed on its engines on first use"""
+    monitor = app.extensions.get('pool_wait_monitor')
+    if monitor is None:
+        from App.database import db
+        monitor = app.extensions['pool_wait_monitor'] = PoolWaitMonitor()
+        with app.app_context():
+            for engine in db.engines.values():
+                monitor.install(engine)
+    return monitor
+
+
+class AdmissionControl:
+    """Sheds requests while too many are in flight or the DB pool is backed up"""
+
+    def __init__(self, max_in_flight=0, max_pool_wait=0, pool_monitor=None):
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait = max_pool_wait
+        self.pool_monitor = pool_monitor
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        """Count a request in, returns False if it should be shed"""
+        with self._lock:
+            overloaded = (self.max_in_flight and self.in_flight >= self.max_in_flight) or (
+                self.max_pool_wait and self.pool_monitor.average > self.max_pool_wait)
+            if overloaded:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def client_address(proxy_count):
+    """The client's IP, taken from X-Forwarded-For when behind `proxy_count` trusted proxies"""
+    if proxy_count:
+        # each proxy appends the address it saw, so only the last `proxy_count` entries are trustworthy
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= proxy_count:
+            return forwarded[-proxy_count]
+    return request.remote_addr
+
+
+def _refuse(status, message, retry_after):
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def setup_limits(app):
+    """Rate limit clients with token buckets and shed load with 503s when the worker is saturated"""
+    limiter = None
+    if app.config['RATE_LIMIT_ENABLED']:
+        limiter = RateLimiter(app.config['RATE_LIMIT_DEFAULT'], app.config['RATE_LIMITS'],
+                              app.config['RATE_LIMIT_MAX_CLIENTS'])
+        app.extensions['rate_limiter'] = limiter
+
+    # always counts requests in flight for the readiness check, only sheds when a limit is set
+    max_pool_wait = app.config['ADMISSION_MAX_POOL_WAIT_MS'] / 1000
+    monitor = get_pool_wait_monitor(app) if max_pool_wait else None
+    admission = AdmissionControl(app.config['ADMISSION_MAX_IN_FLIGHT'], max_pool_wait, monitor)
+    app.extensions['admission_control'] = admission
+
+    exempt = tuple(app.config['LIMITS_EXEMPT_PATHS'])
+    proxy_count = app.config['RATE_LIMIT_PROXY_COUNT']
+    retry_after = app.config['ADMISSION_RETRY_AFTER']
+
+    @app.before_request
+    def limit_request():
+        if request.path.startswith(exempt):
+            return None
+        if limiter is not None:
+            rule = request.url_rule.rule if request.url_rule is not None else None
+            wait = limiter.check(client_address(proxy_count), rule)
+            if wait:
+                return _refuse(429, 'Too many requests', wait)
+        if not admission.enter():
+            return _refuse(503, 'Service overloaded, try again shortly', retry_after)
+        g.admitted = True
+        return None
+
+    @app.teardown_request
+    def release_request(error=None):
+        if g.pop('admitted', False):
+            admission.leave()
+
+    return limiter, admission
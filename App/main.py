@@ -1,17 +1,25 @@
 import os
+import threading
 from flask import Flask, render_template
-from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from werkzeug.datastructures import  FileStorage
 
-from App.database import init_db
+from App.database import db, init_db, share_db
 from App.config import load_config
+from App.json_provider import setup_json_provider
+from App.compression import setup_compression
+from App.group_commit import setup_group_commit
+from App.limits import setup_limits
+from App.health import setup_health
+from App.profiling import setup_profiling
+from App.slow_queries import setup_slow_queries
+from App.cache import setup_cache
+from App.snapshot import setup_snapshot
 
 
 from App.controllers import (
     setup_jwt,
-    add_auth_context
+    add_auth_context,
+    apply_hours_batch
 )
 
 from App.views import views, setup_admin
@@ -22,20 +30,103 @@ def add_views(app):
     for view in views:
         app.register_blueprint(view)
 
+def add_unauthorized_handler(jwt):
+    @jwt.invalid_token_loader
+    @jwt.unauthorized_loader
+    def custom_unauthorized_response(error):
+        return render_template('401.html', error=error), 401
+
+
+class LazyAdmin:
+    """WSGI middleware that builds the Flask-Admin UI on the first /admin request.
+
+    Flask refuses new blueprints once it has served a request, so the admin UI
+    lives in its own small app sharing the parent's config, engines, extensions
+    and request hooks.
+    """
+
+    def __init__(self, app, prefix='/admin'):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.prefix = prefix
+        self._admin_app = None
+        self._lock = threading.Lock()
+
+    def get_admin_app(self):
+        if self._admin_app is None:
+            with self._lock:
+                if self._admin_app is None:
+                    self._admin_app = create_admin_app(self.app)
+        return self._admin_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == self.prefix or path.startswith(self.prefix + '/'):
+            return self.get_admin_app().wsgi_app(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+# request hooks the admin app runs too: admission and rate limits, profiling, compression, auth context
+SHARED_HOOKS = ('before_request_funcs', 'after_request_funcs', 'teardown_request_funcs', 'template_context_processors')
+
+def create_admin_app(parent):
+    """Flask-Admin app that reuses the parent's engines, extensions, JWT manager and request hooks"""
+    app = Flask(__name__, static_url_path='/static')
+    app.config.update(parent.config)
+    setup_json_provider(app)
+    # the cache, limits, slow query recorder and the rest are the parent's own objects
+    app.extensions.update(parent.extensions)
+    share_db(app, parent)
+    for name in SHARED_HOOKS:
+        funcs = getattr(app, name).setdefault(None, [])
+        funcs.extend(f for f in getattr(parent, name).get(None, ()) if f not in funcs)
+    parent.extensions['flask-jwt-extended'].init_app(app)
+    setup_admin(app)
+    return app
+
+def warm_app(app):
+    """Fill caches before forking so workers share them copy-on-write.
+
+    Compiles every template, configures the ORM mappers and runs the
+    leaderboard query once so its SQL is in the engine's compiled cache.
+    """
+    from sqlalchemy.orm import configure_mappers
+    from App.controllers import get_leaderboard
+
+    configure_mappers()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        try:
+            get_leaderboard()
+        except Exception as e:
+            # an uninitialised database should not stop the server booting
+            app.logger.warning('leaderboard warm-up skipped: %s', e)
+        finally:
+            db.session.remove()
+
 def create_app(overrides={}):
     app = Flask(__name__, static_url_path='/static')
     load_config(app, overrides)
-    CORS(app)
+    setup_json_provider(app)
+    if app.config['CORS_ENABLED']:
+        CORS(app)
+    setup_compression(app)
     add_auth_context(app)
-    photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
-    configure_uploads(app, photos)
     add_views(app)
     init_db(app)
+    setup_group_commit(app, apply_hours_batch)
+    setup_limits(app)
+    setup_health(app)
+    setup_profiling(app)
+    setup_slow_queries(app)
+    setup_cache(app)
+    setup_snapshot(app)
     jwt = setup_jwt(app)
-    setup_admin(app)
-    @jwt.invalid_token_loader
-    @jwt.unauthorized_loader
-    def custom_unauthorized_response(error):
-        return render_template('401.html', error=error), 401
+    add_unauthorized_handler(jwt)
+    if app.config['LAZY_SUBSYSTEMS']:
+        app.wsgi_app = LazyAdmin(app)
+    else:
+        setup_admin(app)
     app.app_context().push()
-    return app
\ No newline at end of file
+    return app
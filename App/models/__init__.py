@@ -1 +1,3 @@
-from .user import User, Student, Staff, Accolade
\ No newline at end of file
+from .user import User, Student, Staff, Accolade, MILESTONES, milestone_bit, mask_to_milestones
+from .read_models import UserSummary, StudentSummary
+from .stats import Stat
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import List
+
+from .user import mask_to_milestones
+
+# Read-only views of users for list endpoints. They are built from
+# column-only selects, so nothing enters the session's identity map, and they
+# serialize to exactly the same JSON as the matching model's get_json().
+# Fields are declared in alphabetical order because orjson serializes
+# dataclasses in field order while the dict payloads are key-sorted.
+
+
+@dataclass
+class UserSummary:
+    __slots__ = ('id', 'name', 'user_type', 'username')
+    id: int
+    name: str
+    user_type: str
+    username: str
+
+    @classmethod
+    def from_row(cls, id, username, name, user_type):
+        return cls(id, name, user_type, username)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'name': self.name,
+            'user_type': self.user_type
+        }
+
+
+@dataclass
+class StudentSummary:
+    __slots__ = ('accolades', 'confirmation_requested', 'id', 'name', 'total_hours', 'user_type', 'username')
+    accolades: List[int]
+    confirmation_requested: bool
+    id: int
+    name: str
+    total_hours: int
+    user_type: str
+    username: str
+
+    @classmethod
+    def from_row(cls, id, username, name, user_type, total_hours, confirmation_requested, accolade_mask):
+        return cls(mask_to_milestones(accolade_mask or 0), bool(confirmation_requested), id, name,
+                   total_hours or 0, user_type, username)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'name': self.name,
+            'user_type': self.user_type,
+            'total_hours': self.total_hours,
+            'accolades': self.accolades,
+            'confirmation_requested': self.confirmation_requested
+        }
@@ -0,0 +1,11 @@
+from App.database import db
+
+
+class Stat(db.Model):
+    """One maintained counter, kept in step with the data by App.controllers.stats"""
+    key = db.Column(db.String(40), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __init__(self, key, value=0):
+        self.key = key
+        self.value = value
@@ -1,16 +1,32 @@
 from werkzeug.security import check_password_hash, generate_password_hash
 from App.database import db
 
+# hours needed for each accolade, in ascending order
+MILESTONES = [10, 25, 50, 100]
+
+
+def milestone_bit(milestone):
+    """Bit for a milestone in Student.accolade_mask"""
+    return 1 << MILESTONES.index(milestone)
+
+
+def mask_to_milestones(mask):
+    """Milestones set in an accolade mask, ascending"""
+    return [milestone for i, milestone in enumerate(MILESTONES) if mask & (1 << i)]
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), nullable=False, unique=True)
     password = db.Column(db.String(256), nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    user_type = db.Column(db.String(20), nullable=False)
+    user_type = db.Column(db.String(20), nullable=False, index=True)
 
+    # Load subclass columns in the same SELECT (LEFT OUTER JOIN student, staff)
+    # so generic User queries never lazy-load them with one extra SELECT per row.
     __mapper_args__ = {
         'polymorphic_identity': 'user',
-        'polymorphic_on': user_type
+        'polymorphic_on': user_type,
+        'with_polymorphic': '*'
     }
 
     def __init__(self, username, password, name):
@@ -38,11 +54,19 @@ class User(db.Model):
 class Student(User):
     __tablename__ = 'student'
     id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
-    total_hours = db.Column(db.Integer, default=0)
+    # leaderboard order
+    total_hours = db.Column(db.Integer, default=0, index=True)
     confirmation_requested = db.Column(db.Boolean, default=False)
+    # one bit per MILESTONES entry, mirrors the Accolade rows so reads need no join
+    accolade_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     accolades = db.relationship('Accolade', backref='student', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # pending queue: the requests in id order without a sort
+        db.Index('ix_student_confirmation_requested_id', 'confirmation_requested', 'id'),
+    )
+
     __mapper_args__ = {
         'polymorphic_identity': 'student',
     }
@@ -51,6 +75,7 @@ class Student(User):
         super().__init__(username, password, name)
         self.total_hours = 0
         self.confirmation_requested = False
+        self.accolade_mask = 0
 
     def add_hours(self, hours):
         if hours <= 0:
@@ -60,19 +85,20 @@ class Student(User):
 
     def _check_accolades(self):
         """Check and award accolades for milestones"""
-        milestones = [10, 25, 50, 100]
-        for milestone in milestones:
-            if self.total_hours >= milestone:
+        for milestone in MILESTONES:
+            bit = milestone_bit(milestone)
+            if self.total_hours >= milestone and not self.accolade_mask & bit:
                 existing = Accolade.query.filter_by(student_id=self.id, milestone=milestone).first()
                 if not existing:
                     accolade = Accolade(student_id=self.id, milestone=milestone)
                     db.session.add(accolade)
+                self.accolade_mask |= bit
 
     def request_confirmation(self):
         self.confirmation_requested = True
 
     def get_accolades(self):
-        return [a.milestone for a in self.accolades]
+        return mask_to_milestones(self.accolade_mask or 0)
 
     def get_json(self):
         return {
@@ -110,6 +136,12 @@ class Accolade(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
     milestone = db.Column(db.Integer, nullable=False)
+    awarded_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (
+        # a student's accolades and the per-milestone check, student_id alone uses the prefix
+        db.Index('ix_accolade_student_id_milestone', 'student_id', 'milestone'),
+    )
 
     def __init__(self, student_id, milestone):
         self.student_id = student_id
@@ -119,5 +151,6 @@ class Accolade(db.Model):
         return {
             'id': self.id,
             'student_id': self.student_id,
-            'milestone': self.milestone
+            'milestone': self.milestone,
+            'awarded_at': self.awarded_at.isoformat() if self.awarded_at else None
         }
@@ -0,0 +1,138 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+
+from flask import request, g
+
+
+# (category, path fragment) checked in order against each function's file
+CATEGORIES = [
+    ('controllers', os.sep + os.path.join('App', 'controllers') + os.sep),
+    ('views', os.sep + os.path.join('App', 'views') + os.sep),
+    ('models', os.sep + os.path.join('App', 'models') + os.sep),
+    ('serialization', os.sep + 'json'),
+    ('serialization', 'orjson'),
+    ('orm', os.sep + 'sqlalchemy' + os.sep),
+    ('driver', 'sqlite3'),
+    ('driver', 'psycopg'),
+    ('templates', os.sep + 'jinja2' + os.sep),
+    ('jwt', os.sep + 'flask_jwt_extended' + os.sep),
+    ('jwt', os.sep + 'jwt' + os.sep),
+    ('framework', os.sep + 'flask' + os.sep),
+    ('framework', os.sep + 'werkzeug' + os.sep),
+]
+
+
+def categorize(filename):
+    if filename == '~':
+        # C functions have no file, category_times sorts them by name
+        return 'builtins'
+    for category, fragment in CATEGORIES:
+        if fragment in filename:
+            return category
+    return 'other'
+
+
+def category_times(stats):
+    """Self time in seconds per category, largest first"""
+    totals = {}
+    for (filename, _, name), (_, _, tottime, _, _) in stats.stats.items():
+        category = categorize(filename)
+        if category == 'builtins':
+            # attribute C calls by what they are, e.g. <method 'execute' of 'sqlite3.Cursor' objects>
+            category = next((c for c, fragment in CATEGORIES if fragment.strip(os.sep) in name), 'builtins')
+        totals[category] = totals.get(category, 0.0) + tottime
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def format_stats(stats, sort='cumulative', limit=25):
+    out = io.StringIO()
+    stats.stream = out
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def profile_route(app, method, path, runs=20, headers=None, data=None, warmup=1):
+    """Call a route through the test client `runs` times under cProfile.
+
+    Returns (pstats.Stats, status codes, wall seconds). The warm-up calls are
+    not profiled so one-off costs such as compiling SQL stay out of the figures.
+    """
+    client = app.test_client()
+    kwargs = {'method': method.upper(), 'headers': headers or {}}
+    if data is not None:
+        kwargs.update(data=data, content_type='application/json')
+    for _ in range(warmup):
+        client.open(path, **kwargs)
+    profiler = cProfile.Profile()
+    statuses = []
+    started = time.perf_counter()
+    for _ in range(runs):
+        profiler.enable()
+        response = client.open(path, **kwargs)
+        response.get_data()
+        profiler.disable()
+        statuses.append(response.status_code)
+    elapsed = time.perf_counter() - started
+    return pstats.Stats(profiler), statuses, elapsed
+
+
+def _requested_by_staff():
+    from flask_jwt_extended import verify_jwt_in_request, current_user
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    return current_user is not None and current_user.user_type == 'staff'
+
+
+def setup_profiling(app):
+    """Profile requests that staff mark with `X-Profile: store` or `X-Profile: text`.
+
+    'store' writes a .prof file under PROFILE_DIR and names it in the
+    X-Profile-File response header, 'text' replaces the response body with
+    the hottest functions.
+    """
+    if not app.config['PROFILING_ENABLED']:
+        return None
+    directory = app.config['PROFILE_DIR']
+    limit = app.config['PROFILE_LIMIT']
+
+    @app.before_request
+    def start_profiler():
+        mode = request.headers.get('X-Profile')
+        if mode not in ('store', 'text') or not _requested_by_staff():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already running in this thread
+            return
+        g.profiler = profiler, mode, time.perf_counter()
+
+    @app.after_request
+    def stop_profiler(response):
+        running = g.pop('profiler', None)
+        if running is None:
+            return response
+        profiler, mode, started = running
+        profiler.disable()
+        response.headers['Server-Timing'] = f'app;dur={(time.perf_counter() - started) * 1000:.1f}'
+        stats = pstats.Stats(profiler)
+        if mode == 'text':
+            lines = [f'{category:<14} {seconds * 1000:9.2f} ms' for category, seconds in category_times(stats)]
+            response.set_data('\n'.join(lines) + '\n\n' + format_stats(stats, limit=limit))
+            response.mimetype = 'text/plain'
+            return response
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+        filename = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}-{slug}-{os.getpid()}.prof'
+        stats.dump_stats(os.path.join(directory, filename))
+        response.headers['X-Profile-File'] = filename
+        return response
+
+    return directory
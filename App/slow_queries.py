@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*" + _PLACEHOLDER + r"(?:\s*,\s*" + _PLACEHOLDER + r")*\s*\)")
+_VALUES_LISTS = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+_APP_DIR = os.sep + 'App' + os.sep
+_CONTROLLERS_DIR = os.sep + os.path.join('App', 'controllers') + os.sep
+
+
+def normalize_sql(statement):
+    """SQL with literals and placeholder lists collapsed, so one query shape gives one string"""
+    sql = _STRINGS.sub('?', statement)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _PLACEHOLDER_LISTS.sub('(...)', sql)
+    sql = _VALUES_LISTS.sub(r'\1', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest()
+
+
+def parameters_shape(parameters, executemany):
+    """Types instead of values, e.g. {'id': 'int'} or '500 x [int, str]'"""
+    def shape(params):
+        if isinstance(params, dict):
+            return {key: type(value).__name__ for key, value in params.items()}
+        if isinstance(params, (list, tuple)):
+            return [type(value).__name__ for value in params]
+        return type(params).__name__
+
+    if executemany:
+        rows = list(parameters) if parameters is not None else []
+        return f"{len(rows)} x {json.dumps(shape(rows[0])) if rows else '[]'}"
+    return shape(parameters) if parameters else None
+
+
+def find_callers():
+    """(innermost App function, innermost controller function) on the current stack"""
+    caller = controller = None
+    frame = sys._getframe(2)
+    while frame is not None and controller is None:
+        filename = frame.f_code.co_filename
+        if _APP_DIR in filename and not filename.endswith('slow_queries.py'):
+            name = f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+            caller = caller or name
+            if _CONTROLLERS_DIR in filename:
+                controller = name
+        frame = frame.f_back
+    return caller, controller
+
+
+def explain(cursor, dialect, statement, parameters):
+    """The plan of `statement` as a list of lines, run on the statement's own DBAPI connection"""
+    if dialect == 'sqlite':
+        prefix, savepoint = 'EXPLAIN QUERY PLAN ', False
+    elif dialect == 'postgresql':
+        # a failed EXPLAIN would abort the caller's transaction without the savepoint
+        prefix, savepoint = 'EXPLAIN ', True
+    else:
+        prefix, savepoint = 'EXPLAIN ', False
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if savepoint:
+            explain_cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            explain_cursor.execute(prefix + statement, parameters or ())
+            rows = explain_cursor.fetchall()
+        except Exception:
+            if savepoint:
+                explain_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            raise
+        if savepoint:
+            explain_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+    finally:
+        explain_cursor.close()
+    return [str(row[-1]) for row in rows]
+
+
+def is_full_scan(plan):
+    """True if the plan reads a whole table instead of an index"""
+    for line in plan or ():
+        # Postgres nests plan nodes under '->'
+        line = line.strip().lstrip('->').strip()
+        if line.startswith('Seq Scan') or (line.startswith('SCAN ') and ' USING ' not in line):
+            return True
+    return False
+
+
+class SlowQueryRecorder:
+    """Appends statements slower than `threshold` seconds to a JSON-lines log.
+
+    Each record holds the normalized SQL and its fingerprint, the parameter
+    types, the calling App function and controller, and the route. The
+    first time a worker sees a fingerprint it also runs EXPLAIN (EXPLAIN
+    QUERY PLAN on SQLite) and stores the plan with that record.
+    """
+
+    def __init__(self, path, threshold, explain=True, logger=None):
+        self.path = path
+        self.threshold = threshold
+        self.explain = explain
+        self.logger = logger
+        self.recorded = 0
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def install(self, engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('slow_query_started', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def check_duration(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['slow_query_started'].pop()
+            if elapsed >= self.threshold:
+                self.record(conn, cursor, statement, parameters, executemany, elapsed)
+
+        @event.listens_for(engine, 'handle_error')
+        def drop_timer(context):
+            # after_cursor_execute never runs for a failed statement
+            if context.connection is not None and context.connection.info.get('slow_query_started'):
+                context.connection.info['slow_query_started'].pop()
+
+    def record(self, conn, cursor, statement, parameters, executemany, elapsed):
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        caller, controller = find_callers()
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'fingerprint': key,
+            'ms': round(elapsed * 1000, 2),
+            'sql': normalized,
+            'params': parameters_shape(parameters, executemany),
+            'caller': caller,
+            'controller': controller,
+            'route': f'{request.method} {request.url_rule.rule}'
+                     if has_request_context() and request.url_rule is not None else None
+        }
+        with self._lock:
+            first = key not in self._explained
+            self._explained.add(key)
+        if first and self.explain and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                entry['plan'] = explain(cursor, conn.dialect.name, statement,
+                                        parameters[0] if executemany else parameters)
+            except Exception as e:
+                entry['plan_error'] = f'{type(e).__name__}: {e}'
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with open(self.path, 'a') as log:
+                log.write(line + '\n')
+            self.recorded += 1
+        if self.logger is not None:
+            self.logger.warning('slow query %s %.1f ms in %s: %s', key, entry['ms'], caller, normalized[:200])
+
+
+def read_slow_queries(path):
+    with open(path) as log:
+        for line in log:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def summarize_slow_queries(entries):
+    """Group slow-query records by fingerprint, the slowest total first"""
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'count': 0, 'total_ms': 0.0,
+                'max_ms': 0.0, 'callers': {}, 'routes': {}, 'plan': None, 'full_scan': False
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['ms']
+        group['max_ms'] = max(group['max_ms'], entry['ms'])
+        caller = entry.get('controller') or entry.get('caller') or '(unknown)'
+        group['callers'][caller] = group['callers'].get(caller, 0) + 1
+        if entry.get('route'):
+            group['routes'][entry['route']] = group['routes'].get(entry['route'], 0) + 1
+        if entry.get('plan'):
+            # every worker explains once, keep the newest plan
+            group['plan'] = entry['plan']
+            group['full_scan'] = is_full_scan(entry['plan'])
+    for group in groups.values():
+        group['mean_ms'] = group['total_ms'] / group['count']
+    return sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
+
+
+def setup_slow_queries(app):
+    """Log statements slower than SLOW_QUERY_MS to SLOW_QUERY_LOG, with their EXPLAIN plan"""
+    if not app.config['SLOW_QUERY_ENABLED']:
+        return None
+    from App.database import db
+    path = app.config['SLOW_QUERY_LOG'] or os.path.join(app.instance_path, 'slow_queries.jsonl')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    recorder = SlowQueryRecorder(path, app.config['SLOW_QUERY_MS'] / 1000, app.config['SLOW_QUERY_EXPLAIN'],
+                                 app.logger)
+    with app.app_context():
+        for engine in db.engines.values():
+            recorder.install(engine)
+    app.extensions['slow_queries'] = recorder
+    return recorder
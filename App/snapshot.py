@@ -0,0 +1,271 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # no flock on Windows, every worker publishes there
+    fcntl = None
+
+
+MAGIC = b'CSTSNAP1'
+_HEADER = struct.Struct('<8sQdI')   # magic, version, published at, section count
+_SECTION = struct.Struct('<16sQQ')  # name, offset, length
+_ALIGN = 8
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def encode_snapshot(sections, version, published_at=None):
+    """One buffer holding a header, a section table and the named byte sections, 8-byte aligned"""
+    offset = _aligned(_HEADER.size + _SECTION.size * len(sections))
+    table, body = [], []
+    for name, data in sections.items():
+        table.append(_SECTION.pack(name.encode(), offset, len(data)))
+        padding = _aligned(len(data)) - len(data)
+        body.append(data + b'\0' * padding)
+        offset += len(data) + padding
+    header = _HEADER.pack(MAGIC, version, time.time() if published_at is None else published_at, len(sections))
+    head = header + b''.join(table)
+    return head + b'\0' * (_aligned(len(head)) - len(head)) + b''.join(body)
+
+
+class Snapshot:
+    """A published snapshot, read in place from a read-only mapping.
+
+    Sections are memoryviews into the mapping, so reading one copies
+    nothing, and every worker mapping the file shares the same pages.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        magic, self.version, self.published_at, count = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError('not a snapshot file')
+        view = memoryview(buffer)
+        self.sections = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(buffer, _HEADER.size + i * _SECTION.size)
+            self.sections[name.rstrip(b'\0').decode()] = view[offset:offset + length]
+
+    def section(self, name):
+        return self.sections.get(name)
+
+
+def build_sections(app):
+    """The leaderboard, staff list and stats, encoded as their JSON responses"""
+    from App.controllers import get_leaderboard_students, get_all_staff, get_stats
+
+    provider = app.json
+    dumps = getattr(provider, 'dumps_bytes', None) or (lambda obj: provider.dumps(obj).encode())
+    return {
+        'leaderboard': dumps(get_leaderboard_students()) + b'\n',
+        'staff': dumps(get_all_staff()) + b'\n',
+        'stats': dumps(get_stats()) + b'\n'
+    }
+
+
+def write_snapshot(path, sections, version):
+    """Write to a temporary file beside `path` and rename it over `path`.
+
+    Readers either have the old file mapped or map the new one, never a
+    partly written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(encode_snapshot(sections, version))
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _digest(sections):
+    digest = hashlib.blake2b(digest_size=16)
+    for name, data in sections.items():
+        digest.update(name.encode() + b'\0' + bytes(data))
+    return digest.digest()
+
+
+def read_snapshot(path):
+    """The snapshot at path read into memory, None if there is none"""
+    try:
+        with open(path, 'rb') as f:
+            return Snapshot(f.read())
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def read_version(path):
+    try:
+        with open(path, 'rb') as f:
+            magic, version, _, _ = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+class SnapshotReader:
+    """Maps the newest snapshot at `path`, checking for a new file at most every check_interval seconds.
+
+    A snapshot whose file has not been written or touched for max_age
+    seconds counts as missing, so callers fall back to the database when
+    the publisher stops.
+    """
+
+    def __init__(self, path, max_age=30, check_interval=0.5, clock=time.monotonic):
+        self.path = path
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.clock = clock
+        self.maps = 0
+        self._snapshot = None
+        self._inode = None
+        self._touched = 0.0
+        self._checked = None
+
+    def current(self):
+        now = self.clock()
+        if self._checked is None or now - self._checked >= self.check_interval:
+            self._checked = now
+            self._refresh()
+        if self._snapshot is None or (self.max_age and time.time() - self._touched > self.max_age):
+            return None
+        return self._snapshot
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._snapshot, self._inode = None, None
+            return
+        self._touched = stat.st_mtime
+        inode = (stat.st_dev, stat.st_ino)
+        if inode == self._inode:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                snapshot = Snapshot(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError, struct.error):
+            return
+        # the old mapping goes once the last response holding a view of it is done
+        self._snapshot, self._inode = snapshot, inode
+        self.maps += 1
+
+
+class SnapshotPublisher:
+    """Rebuilds the snapshot every `interval` seconds in the one process holding the lock file.
+
+    Every worker runs a publisher thread but only the holder of
+    `<path>.lock` publishes; when it exits the lock is released and another
+    worker takes over. An unchanged snapshot is not rewritten, only touched
+    so readers know the publisher is alive.
+    """
+
+    def __init__(self, app, path, interval=5, logger=None):
+        self.app = app
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.interval = interval
+        self.logger = logger
+        self.version = 0
+        self.published = 0
+        self._digest = None
+        self._pid = None
+
+    def publish(self):
+        """Build the sections and swap them in if they changed, returns the version on disk"""
+        from App.database import db
+
+        with self.app.app_context():
+            try:
+                sections = build_sections(self.app)
+            finally:
+                db.session.remove()
+        digest = _digest(sections)
+        if self._digest is None:
+            # a publisher taking over doesn't bump the version of an identical snapshot
+            current = read_snapshot(self.path)
+            if current is not None:
+                self._digest, self.version = _digest(current.sections), current.version
+        if digest == self._digest and os.path.exists(self.path):
+            os.utime(self.path)
+            return self.version
+        self.version = max(self.version, read_version(self.path)) + 1
+        write_snapshot(self.path, sections, self.version)
+        self._digest = digest
+        self.published += 1
+        return self.version
+
+    def start(self):
+        """Start the publisher thread, once per process so it survives gunicorn's fork"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._run, name='snapshot-publisher', daemon=True).start()
+
+    def _try_lock(self, lock):
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _run(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        # held open for the life of the process, closing it would drop the lock
+        lock = open(self.lock_path, 'a+')
+        held = False
+        while True:
+            held = held or self._try_lock(lock)
+            if held:
+                try:
+                    self.publish()
+                except Exception:
+                    if self.logger is not None:
+                        self.logger.exception('snapshot publish failed')
+            time.sleep(self.interval)
+
+
+def snapshot_response(name):
+    """The section as a JSON response, None when snapshots are off or the snapshot is missing or stale"""
+    reader = current_app.extensions.get('snapshot')
+    snapshot = reader.current() if reader is not None else None
+    body = snapshot.section(name) if snapshot is not None else None
+    if body is None:
+        return None
+    # WSGI servers take bytes chunks, so this is one copy out of the mapping, no query or encoding
+    response = current_app.response_class(bytes(body), mimetype='application/json')
+    response.set_etag(f'snapshot-{snapshot.version}-{name}')
+    return response
+
+
+def setup_snapshot(app):
+    """Serve hot reads from a snapshot file shared by every worker, see SNAPSHOT_* in App/config.py"""
+    if not app.config['SNAPSHOT_ENABLED']:
+        return None
+    path = app.config['SNAPSHOT_PATH'] or os.path.join(app.instance_path, 'snapshot.bin')
+    reader = SnapshotReader(path, app.config['SNAPSHOT_MAX_AGE'], app.config['SNAPSHOT_CHECK_INTERVAL'])
+    publisher = SnapshotPublisher(app, path, app.config['SNAPSHOT_INTERVAL'], app.logger)
+    app.extensions['snapshot'] = reader
+    app.extensions['snapshot_publisher'] = publisher
+
+    if app.config['SNAPSHOT_PUBLISH']:
+        @app.before_request
+        def start_publisher():
+            publisher.start()
+
+    return reader
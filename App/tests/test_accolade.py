@@ -0,0 +1,100 @@
+import os, tempfile, pytest, logging, unittest
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Student, Accolade, mask_to_milestones, milestone_bit
+from App.controllers import (
+    create_student,
+    add_hours_to_student,
+    check_accolade_masks,
+    backfill_accolade_masks,
+    recompute_accolades,
+    get_stats,
+    rebuild_stats
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class AccoladeUnitTests(unittest.TestCase):
+
+    def test_mask_round_trip(self):
+        """Milestones map to distinct bits and back"""
+        mask = milestone_bit(10) | milestone_bit(50)
+        assert mask_to_milestones(mask) == [10, 50]
+        assert mask_to_milestones(0) == []
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class AccoladeIntegrationTests(unittest.TestCase):
+
+    def test_add_hours_keeps_mask_in_sync(self):
+        """Awarding accolades sets the mask and writes Accolade rows"""
+        student = create_student("maskstudent1", "password", "Mask Student 1")
+        add_hours_to_student(student.id, 30)
+        student = db.session.get(Student, student.id)
+        assert student.get_accolades() == [10, 25]
+        rows = Accolade.query.filter_by(student_id=student.id).all()
+        assert sorted(a.milestone for a in rows) == [10, 25]
+        assert all(a.awarded_at is not None for a in rows)
+
+        add_hours_to_student(student.id, 5)
+        assert Accolade.query.filter_by(student_id=student.id).count() == 2
+
+    def test_check_and_backfill(self):
+        """The checker finds drifted masks and the backfill repairs them"""
+        student = create_student("maskstudent2", "password", "Mask Student 2")
+        add_hours_to_student(student.id, 12)
+        db.session.execute(db.update(Student.__table__)
+                           .where(Student.__table__.c.id == student.id)
+                           .values(accolade_mask=0))
+        db.session.commit()
+
+        mismatches = check_accolade_masks()
+        assert (student.id, 0, milestone_bit(10)) in mismatches
+
+        assert backfill_accolade_masks() >= 1
+        assert check_accolade_masks() == []
+        assert db.session.get(Student, student.id).get_accolades() == [10]
+
+    def test_recompute(self):
+        """Recompute fills in missing accolades chunk by chunk, and revokes invalid ones on request"""
+        students = [create_student(f"recompute{i}", "password", f"Recompute {i}") for i in range(3)]
+        student = Student.__table__
+        # hours written behind the model's back, plus an accolade the hours don't justify
+        db.session.execute(db.update(student).where(student.c.id == students[0].id).values(total_hours=60))
+        db.session.execute(db.update(student).where(student.c.id == students[1].id).values(total_hours=11))
+        db.session.add(Accolade(students[2].id, 25))
+        db.session.add(Accolade(students[2].id, 7))
+        db.session.commit()
+        rebuild_stats()
+
+        chunks = []
+        totals = recompute_accolades(chunk_size=2, start_after=students[0].id - 1,
+                                     progress=lambda last_id, totals: chunks.append(last_id))
+        assert chunks == [students[1].id, students[2].id]
+        assert totals == {'students': 3, 'inserted': 4, 'revoked': 0, 'masks': 3}
+        assert db.session.get(Student, students[0].id).get_accolades() == [10, 25, 50]
+        assert db.session.get(Student, students[2].id).get_accolades() == [25]
+
+        totals = recompute_accolades(revoke=True, start_after=students[0].id - 1)
+        assert totals == {'students': 3, 'inserted': 0, 'revoked': 2, 'masks': 1}
+        assert Accolade.query.filter_by(student_id=students[2].id).count() == 0
+        assert check_accolade_masks() == []
+        maintained = get_stats()
+        assert rebuild_stats() == maintained
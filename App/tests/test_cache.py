@@ -0,0 +1,182 @@
+import os, tempfile, pytest, logging, unittest
+import json
+
+from App.main import create_app, LazyAdmin
+from App.database import db, create_db
+from App.cache import MemoryBackend, DictClient, SharedBackend, QueryCache, cached
+from App.controllers import (
+    create_staff,
+    create_student,
+    add_hours_to_student,
+    request_hours_confirmation,
+    confirm_hours_bulk,
+    get_student_summary,
+    get_student_accolades,
+    get_all_staff,
+    get_pending_students
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+'''
+   Unit Tests
+'''
+class CacheUnitTests(unittest.TestCase):
+
+    def test_memory_lru_and_ttl(self):
+        clock = FakeClock()
+        backend = MemoryBackend(max_entries=2, max_bytes=1000, clock=clock)
+        backend.set('a', b'1', 10)
+        backend.set('b', b'2', 10)
+        assert backend.get('a') == b'1'
+        backend.set('c', b'3', 10)
+        # 'b' was the least recently used
+        assert backend.get('b') is None and backend.get('a') == b'1'
+        clock.now = 11
+        assert backend.get('a') is None
+        assert backend.metrics()['evictions'] == 2
+
+    def test_memory_byte_bound(self):
+        backend = MemoryBackend(max_entries=100, max_bytes=10)
+        backend.set('a', b'x' * 6, 10)
+        backend.set('b', b'x' * 6, 10)
+        assert backend.get('a') is None and backend.metrics()['bytes'] == 6
+        backend.set('big', b'x' * 11, 10)
+        assert backend.get('big') is None
+
+    def test_tag_invalidation(self):
+        for backend in (MemoryBackend(), SharedBackend(DictClient())):
+            cache = QueryCache(backend)
+            calls = []
+            compute = lambda: calls.append(1) or len(calls)
+            assert cache.get_or_compute('k', ['student:1'], compute) == 1
+            assert cache.get_or_compute('k', ['student:1'], compute) == 1
+            cache.invalidate('student:2')
+            assert cache.get_or_compute('k', ['student:1'], compute) == 1
+            cache.invalidate('student:1')
+            assert cache.get_or_compute('k', ['student:1'], compute) == 2
+            metrics = cache.metrics()
+            assert (metrics['hits'], metrics['misses'], metrics['invalidations']) == (2, 2, 2)
+            assert metrics['hit_ratio'] == 0.5
+
+    def test_dict_client_expiry(self):
+        clock = FakeClock()
+        client = DictClient(clock)
+        client.set('k', b'v', ex=5)
+        assert client.mget(['k', 'missing']) == [b'v', None]
+        clock.now = 5
+        assert client.get('k') is None
+        assert client.incr('n') == 1 and client.incr('n') == 2
+
+    def test_shared_clear_keeps_other_keys(self):
+        client = DictClient()
+        client.set('other:k', b'v')
+        client.set('cst[x]:k', b'v')
+        backend = SharedBackend(client, prefix='cst:')
+        for n in range(2500):
+            backend.set(f'k{n}', b'v', 60)
+        backend.incr('tag:students')
+        backend.clear()
+        assert backend.get('k1') is None and backend.get_many(['tag:students']) == [None]
+        assert client.get('other:k') == b'v' and client.get('cst[x]:k') == b'v'
+
+        SharedBackend(client, prefix='cst[x]:').clear()
+        assert client.get('cst[x]:k') is None and client.get('other:k') == b'v'
+
+    def test_cached_without_cache(self):
+        calls = []
+
+        @cached('thing:{0}')
+        def thing(n):
+            calls.append(n)
+            return n
+
+        # outside an app with a cache the function is called every time
+        assert thing(1) == 1 and thing(1) == 1 and calls == [1, 1]
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class CacheIntegrationTests(unittest.TestCase):
+
+    def test_invalidated_by_writes(self):
+        for backend, url in (('memory', None), ('redis', 'memory://')):
+            app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                              'CACHE_BACKEND': backend, 'CACHE_REDIS_URL': url})
+            cache = app.extensions['cache']
+            student = create_student(f"cache{backend}", "pass", "Cache Student")
+
+            assert get_student_summary(student.id).total_hours == 0
+            assert get_student_summary(student.id).total_hours == 0
+            assert cache.hits == 1
+            add_hours_to_student(student.id, 10)
+            assert get_student_summary(student.id).total_hours == 10
+            assert get_student_accolades(student.id) == [10]
+
+            assert student.id not in [s.id for s in get_pending_students()]
+            request_hours_confirmation(student.id)
+            assert student.id in [s.id for s in get_pending_students()]
+            confirm_hours_bulk([student.id])
+            assert student.id not in [s.id for s in get_pending_students()]
+
+            staff = create_staff(f"cachestaff{backend}", "staffpass", "Cache Staff")
+            assert staff.id in [s.id for s in get_all_staff()]
+
+    def test_metrics_route(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'CACHE_BACKEND': 'memory'})
+        client = app.test_client()
+        create_staff("metricsstaff", "staffpass", "Metrics Staff")
+        student = create_student("metricsstudent", "pass", "Metrics Student")
+        response = client.post('/api/login', data=json.dumps({'username': 'metricsstaff', 'password': 'staffpass'}),
+                               content_type='application/json')
+        headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+
+        for _ in range(3):
+            response = client.get(f'/api/students/{student.id}', headers=headers)
+            assert response.json['username'] == 'metricsstudent'
+        metrics = client.get('/api/stats/cache', headers=headers).json
+        assert metrics['enabled'] and metrics['backend'] == 'MemoryBackend'
+        assert metrics['hits'] == 2 and metrics['misses'] == 1
+        assert metrics['entries'] == 1 and metrics['bytes'] > 0
+
+    def test_lazy_admin_invalidates(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'CACHE_BACKEND': 'memory', 'LAZY_SUBSYSTEMS': True})
+        assert isinstance(app.wsgi_app, LazyAdmin)
+        client = app.test_client()
+        create_staff("adminstaff", "staffpass", "Admin Staff")
+        student = create_student("adminstudent", "pass", "Admin Student")
+        request_hours_confirmation(student.id)
+        response = client.post('/api/login', data=json.dumps({'username': 'adminstaff', 'password': 'staffpass'}),
+                               content_type='application/json')
+        headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+
+        pending = client.get('/api/staff/pending-confirmations', headers=headers).json
+        assert student.id in [s['id'] for s in pending]
+        response = client.post('/admin/students/action/', headers=headers,
+                               data={'action': 'confirm_hours', 'rowid': [str(student.id)]})
+        assert response.status_code == 302
+        pending = client.get('/api/staff/pending-confirmations', headers=headers).json
+        assert student.id not in [s['id'] for s in pending]
@@ -0,0 +1,66 @@
+import os, tempfile, pytest, logging, unittest
+import gzip, json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.compression import choose_encoding
+from App.controllers import seed_database
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class CompressionUnitTests(unittest.TestCase):
+
+    def test_choose_encoding(self):
+        assert choose_encoding('gzip, deflate', ['br', 'gzip']) == 'gzip'
+        assert choose_encoding('gzip, br', ['br', 'gzip']) == 'br'
+        assert choose_encoding('br;q=0.5, gzip;q=0.8', ['br', 'gzip']) == 'gzip'
+        assert choose_encoding('gzip;q=0, identity', ['gzip']) is None
+        assert choose_encoding('*', ['zstd', 'gzip']) == 'zstd'
+        assert choose_encoding(None, ['gzip']) is None
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class CompressionIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        seed_database(students=40, staff=2, reset=True, seed=3)
+
+    def test_large_json_is_gzipped_once(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        client = app.test_client()
+        cache = app.extensions['compression_cache']
+
+        plain = client.get('/api/users')
+        assert 'Content-Encoding' not in plain.headers
+        assert 'Accept-Encoding' in plain.headers['Vary']
+
+        first = client.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(first.data)) == plain.json
+        assert int(first.headers['Content-Length']) < len(plain.data)
+
+        hits = cache.hits
+        client.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+        assert cache.hits == hits + 1
+
+    def test_small_responses_not_compressed(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'COMPRESS_MIN_SIZE': 10 ** 9})
+        client = app.test_client()
+        response = client.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,133 @@
+import os, tempfile, pytest, logging, unittest
+import json
+import threading
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Student
+from App.group_commit import GroupCommitter
+from App.controllers import (
+    create_student,
+    create_staff,
+    log_hours_for_student,
+    get_stats,
+    rebuild_stats
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def run_concurrently(calls):
+    """Start every call on its own thread at once, return their results in order"""
+    results = [None] * len(calls)
+    start = threading.Barrier(len(calls))
+
+    def run(i, call):
+        start.wait()
+        results[i] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+'''
+   Unit Tests
+'''
+class GroupCommitterUnitTests(unittest.TestCase):
+
+    def test_concurrent_increments_share_one_flush(self):
+        flushed = []
+
+        def flush(increments):
+            flushed.append(sorted(increments))
+            return {student_id: sum(h for s, h in increments if s == student_id) for student_id, _ in increments}
+
+        committer = GroupCommitter(flush, window=0.2)
+        results = run_concurrently([lambda i=i: committer.submit(i % 2, 1) for i in range(6)])
+        assert flushed == [[(0, 1), (0, 1), (0, 1), (1, 1), (1, 1), (1, 1)]]
+        assert results == [3] * 6
+        assert committer.batches == 1 and committer.increments == 6
+
+    def test_full_batch_flushes_early(self):
+        committer = GroupCommitter(lambda increments: {s: len(increments) for s, _ in increments},
+                                   window=10, max_batch=2)
+        assert run_concurrently([lambda: committer.submit(1, 1), lambda: committer.submit(1, 1)]) == [2, 2]
+
+    def test_flush_error_reaches_every_caller(self):
+        def flush(increments):
+            raise RuntimeError("disk full")
+
+        committer = GroupCommitter(flush, window=0.2)
+
+        def call():
+            try:
+                committer.submit(1, 1)
+            except RuntimeError as e:
+                return str(e)
+
+        assert run_concurrently([call, call, call]) == ["disk full"] * 3
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class GroupCommitIntegrationTests(unittest.TestCase):
+
+    def test_log_hours_group_commit(self):
+        staff = create_staff("groupstaff", "password", "Group Staff")
+        students = [create_student(f"groupstudent{i}", "password", f"Group Student {i}") for i in range(2)]
+        rebuild_stats()
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'GROUP_COMMIT_ENABLED': True, 'GROUP_COMMIT_WINDOW_MS': 200})
+        committer = app.extensions['group_commit']
+
+        def log(student_id, hours):
+            def call():
+                with app.app_context():
+                    student, error = log_hours_for_student(staff.id, student_id, hours)
+                    db.session.remove()
+                    return error or student.get_json()['total_hours']
+            return call
+
+        results = run_concurrently([log(students[0].id, 4), log(students[0].id, 8), log(students[1].id, 3),
+                                    log(-1, 1), log(students[1].id, 0)])
+        assert results == [12, 12, 3, "Student not found", "Hours must be positive"]
+        assert committer.batches == 1
+
+        db.session.expire_all()
+        assert db.session.get(Student, students[0].id).get_accolades() == [10]
+        maintained = get_stats()
+        assert rebuild_stats() == maintained
+
+    def test_log_hours_route_rejects_bad_input(self):
+        create_staff("groupvalidator", "password", "Group Validator")
+        student = create_student("groupvalidated", "password", "Group Validated")
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'GROUP_COMMIT_ENABLED': True, 'GROUP_COMMIT_WINDOW_MS': 1})
+        client = app.test_client()
+        response = client.post('/api/login', data=json.dumps({'username': 'groupvalidator', 'password': 'password'}),
+                               content_type='application/json')
+        headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+
+        for body in ({'student_id': 'abc', 'hours': 2}, {'student_id': student.id, 'hours': 1.5},
+                     {'student_id': student.id, 'hours': True}, {'student_id': [1], 'hours': 2}, [1, 2]):
+            response = client.post('/api/staff/log-hours', data=json.dumps(body), headers=headers,
+                                   content_type='application/json')
+            assert response.status_code == 400
+        response = client.post('/api/staff/log-hours', data=json.dumps({'student_id': str(student.id), 'hours': '2'}),
+                               headers=headers, content_type='application/json')
+        assert response.status_code == 200 and response.json['student']['total_hours'] == 2
@@ -0,0 +1,85 @@
+import os, tempfile, pytest, logging, unittest
+
+from App.main import create_app
+from App.database import db, create_db
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class HealthIntegrationTests(unittest.TestCase):
+
+    def test_liveness(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        client = app.test_client()
+        assert client.get('/health').json == {'status': 'healthy'}
+        assert client.get('/health/live').json == {'status': 'healthy'}
+
+    def test_ready(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        response = app.test_client().get('/health/ready')
+        assert response.status_code == 200
+        report = response.json
+        assert report['status'] == 'ready' and report['failing'] == []
+        assert report['database']['ok'] is True
+        assert report['pool']['pool'] == 'QueuePool'
+        assert report['pool']['checked_out'] == 0
+        assert report['in_flight'] == 0
+
+    def test_database_result_is_cached(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        probe = app.extensions['readiness']
+        calls = []
+        probe._probe_db = lambda engine: calls.append(engine) or (True, 1.0, None)
+        client = app.test_client()
+        for _ in range(3):
+            assert client.get('/health/ready').status_code == 200
+        assert len(calls) == 1
+        probe.db_ttl = 0
+        client.get('/health/ready')
+        assert len(calls) == 2
+
+    def test_not_ready_before_first_probe(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        probe = app.extensions['readiness']
+        client = app.test_client()
+        # another request holds the probe lock and no probe has finished yet
+        probe._refreshing.acquire()
+        try:
+            response = client.get('/health/ready')
+            assert response.status_code == 503
+            assert response.json['database'] == {'ok': False, 'latency_ms': None, 'error': 'not probed yet'}
+        finally:
+            probe._refreshing.release()
+        assert client.get('/health/ready').status_code == 200
+
+    def test_database_unreachable(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:////nonexistent/dir/test.db'})
+        client = app.test_client()
+        response = client.get('/health/ready')
+        assert response.status_code == 503
+        assert response.json['failing'] == ['database']
+        assert response.json['database']['error'] == 'OperationalError'
+        assert client.get('/health').status_code == 200
+
+    def test_saturated_worker_not_ready(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'READINESS_MAX_IN_FLIGHT': 1})
+        client = app.test_client()
+        assert client.get('/health/ready').status_code == 200
+        app.extensions['admission_control'].enter()
+        response = client.get('/health/ready')
+        assert response.status_code == 503
+        assert response.json['failing'] == ['in_flight'] and response.json['in_flight'] == 1
@@ -0,0 +1,45 @@
+import os, tempfile, pytest, logging, unittest
+import datetime, json
+from unittest import mock
+
+from App.main import create_app
+from App import json_provider
+from App.json_provider import FastJSONProvider, StdlibJSONProvider
+from App.models import User
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class JSONProviderUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        self.payload = {'b': [1, 2.5, None, True], 'a': 'café', 'when': datetime.datetime(2024, 1, 2, 3, 4, 5)}
+
+    def test_fast_provider_installed_by_default(self):
+        assert isinstance(self.app.json, FastJSONProvider)
+
+    def test_matches_stdlib_output(self):
+        """Both providers produce the same document"""
+        fast = FastJSONProvider(self.app).response(self.payload).get_data()
+        stdlib = StdlibJSONProvider(self.app).response(self.payload).get_data()
+        assert json.loads(fast) == json.loads(stdlib)
+        assert json.loads(fast)['when'] == 'Tue, 02 Jan 2024 03:04:05 GMT'
+
+    def test_fallback_without_orjson(self):
+        """Without the accelerator the provider still serializes through the stdlib"""
+        with mock.patch.object(json_provider, 'orjson', None):
+            provider = FastJSONProvider(self.app)
+            body = provider.response(self.payload).get_data()
+            assert json.loads(body)['a'] == 'café'
+            assert provider.loads(provider.dumps([1, 2])) == [1, 2]
+
+    def test_models_serialized_through_get_json(self):
+        user = User("jsonuser", "password", "JSON User")
+        user.user_type = 'user'
+        body = FastJSONProvider(self.app).response([user]).get_data()
+        assert json.loads(body) == [user.get_json()]
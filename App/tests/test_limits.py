@@ -0,0 +1,124 @@
+import os, tempfile, pytest, logging, unittest
+import json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.limits import RateLimiter, AdmissionControl, PoolWaitMonitor, client_address
+from App.controllers import create_student
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+'''
+   Unit Tests
+'''
+class LimitsUnitTests(unittest.TestCase):
+
+    def test_token_bucket_burst_and_refill(self):
+        clock = FakeClock()
+        limiter = RateLimiter(None, {'/api/login': (0.5, 2)}, clock=clock)
+        assert limiter.check('1.2.3.4', '/api/login') == 0
+        assert limiter.check('1.2.3.4', '/api/login') == 0
+        assert limiter.check('1.2.3.4', '/api/login') == 2
+        # other clients and unlisted routes have their own allowance
+        assert limiter.check('5.6.7.8', '/api/login') == 0
+        assert limiter.check('1.2.3.4', '/api/students') == 0
+        clock.now += 2
+        assert limiter.check('1.2.3.4', '/api/login') == 0
+        assert limiter.limited == 1
+
+    def test_default_limit_covers_every_route(self):
+        limiter = RateLimiter((1, 2), {}, clock=FakeClock())
+        assert limiter.check('client', '/a') == 0
+        assert limiter.check('client', '/b') == 0
+        assert limiter.check('client', '/c') == 1
+
+    def test_buckets_are_bounded(self):
+        limiter = RateLimiter((1, 1), {}, max_clients=2, clock=FakeClock())
+        for client in ['a', 'b', 'c']:
+            limiter.check(client, '/')
+        assert list(limiter._buckets) == [('b', None), ('c', None)]
+
+    def test_admission_in_flight(self):
+        admission = AdmissionControl(max_in_flight=2)
+        assert admission.enter() and admission.enter()
+        assert not admission.enter()
+        admission.leave()
+        assert admission.enter()
+        assert admission.shed == 1 and admission.in_flight == 2
+
+    def test_pool_wait_decays(self):
+        clock = FakeClock()
+        monitor = PoolWaitMonitor(decay=1.0, clock=clock)
+        admission = AdmissionControl(max_pool_wait=0.05, pool_monitor=monitor)
+        for _ in range(20):
+            clock.now += 0.01
+            monitor.record(0.5)
+        assert monitor.average > 0.05
+        assert not admission.enter()
+        clock.now += 5
+        assert monitor.average < 0.05
+        assert admission.enter()
+
+    def test_client_address(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        headers = {'X-Forwarded-For': '6.6.6.6, 10.0.0.1'}
+        with app.test_request_context('/', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.2'}):
+            assert client_address(0) == '10.0.0.2'
+            assert client_address(1) == '10.0.0.1'
+            assert client_address(2) == '6.6.6.6'
+            assert client_address(3) == '10.0.0.2'
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class LimitsIntegrationTests(unittest.TestCase):
+
+    def test_login_rate_limited(self):
+        create_student("limitstudent", "pass", "Limit Student")
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'RATE_LIMIT_ENABLED': True, 'RATE_LIMITS': {'/api/login': (0.01, 2)}})
+        client = app.test_client()
+        body = json.dumps({'username': 'limitstudent', 'password': 'pass'})
+        statuses = [client.post('/api/login', data=body, content_type='application/json').status_code
+                    for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        response = client.post('/api/login', data=body, content_type='application/json')
+        assert response.json == {'error': 'Too many requests'}
+        assert 90 <= int(response.headers['Retry-After']) <= 100
+        assert client.get('/health').status_code == 200
+
+    def test_overload_sheds_with_503(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'ADMISSION_MAX_IN_FLIGHT': 1})
+        client = app.test_client()
+        admission = app.extensions['admission_control']
+        assert client.get('/api/leaderboard').status_code == 401
+        assert admission.in_flight == 0
+
+        admission.enter()
+        response = client.get('/api/leaderboard')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+        assert client.get('/health').status_code == 200
+        admission.leave()
+        assert client.get('/api/leaderboard').status_code == 401
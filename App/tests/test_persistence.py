@@ -0,0 +1,124 @@
+import os, tempfile, pytest, logging, unittest
+
+from unittest import mock
+
+import persistence
+from persistence import open_tracker, JOURNAL_FILE, SNAPSHOT_FILE
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class PersistenceUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = self.dir.name
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def state(self, system):
+        return ([(s.id, s.username, s.total_hours, s.accolades, s.confirmation_requested) for s in system.students],
+                [(s.id, s.username) for s in system.staff_members],
+                [s.id for s in system.get_pending_students()],
+                system.get_leaderboard())
+
+    def populate(self, system):
+        staff = system.get_user_by_username("smith")
+        carol = system.add_student("Carol", "carol", "pass3")
+        staff.log_hours(carol, 30)
+        staff.log_hours(system.get_user_by_username("bob123"), 12)
+        carol.request_confirmation()
+        system.get_user_by_username("alice123").request_confirmation()
+        staff.confirm_hours(carol)
+
+    def test_sample_data_only_once(self):
+        system = open_tracker(self.path)
+        system.add_student("Carol", "carol", "pass3")
+        system.close()
+        system = open_tracker(self.path)
+        assert [s.username for s in system.students] == ["alice123", "bob123", "carol"]
+        system.close()
+
+    def test_journal_replay(self):
+        system = open_tracker(self.path)
+        self.populate(system)
+        expected = self.state(system)
+        system.close()
+        system = open_tracker(self.path)
+        assert self.state(system) == expected
+        assert system.add_student("Dave", "dave", "pass4").id == 5
+        system.close()
+
+    def test_snapshot_and_tail(self):
+        system = open_tracker(self.path, snapshot_every=4)
+        self.populate(system)
+        expected = self.state(system)
+        assert system.journal.generation > 0
+        system.close()
+        system = open_tracker(self.path, snapshot_every=4)
+        assert self.state(system) == expected
+        system.close()
+
+    def test_torn_record_dropped(self):
+        system = open_tracker(self.path)
+        self.populate(system)
+        expected = self.state(system)
+        system.close()
+        with open(os.path.join(self.path, JOURNAL_FILE), 'ab') as f:
+            f.write(b'\x03\x01')  # half of an add-hours record
+        system = open_tracker(self.path)
+        assert self.state(system) == expected
+        system.get_user_by_username("smith").log_hours(system.get_student(1), 1)
+        system.close()
+        system = open_tracker(self.path)
+        assert system.get_student(1).total_hours == 1
+        system.close()
+
+    def test_bad_hours_change_nothing(self):
+        system = open_tracker(self.path)
+        staff = system.get_user_by_username("smith")
+        alice = system.get_user_by_username("alice123")
+        for hours in (1.5, True, 0, -2, "3", 2 ** 31):
+            with pytest.raises(ValueError):
+                staff.log_hours(alice, hours)
+        assert alice.total_hours == 0 and system.get_leaderboard()[0]["hours"] == 0
+        staff.log_hours(alice, 3)
+        system.close()
+        system = open_tracker(self.path)
+        assert system.get_student(alice.id).total_hours == 3
+        system.close()
+
+    def test_failed_snapshot_keeps_journal(self):
+        system = open_tracker(self.path, snapshot_every=0)
+        staff = system.get_user_by_username("smith")
+        alice = system.get_user_by_username("alice123")
+        with mock.patch.object(persistence, 'write_snapshot', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                system.journal.snapshot()
+        assert system.journal.generation == 0
+        staff.log_hours(alice, 4)
+        system.close()
+        system = open_tracker(self.path)
+        assert system.get_student(alice.id).total_hours == 4
+        system.close()
+
+    def test_no_plaintext_passwords_on_disk(self):
+        system = open_tracker(self.path, snapshot_every=0)
+        system.add_student("Carol", "carol", "carolsecret")
+        system.journal.snapshot()
+        system.add_student("Dave", "dave", "davesecret")
+        system.close()
+        for name in (SNAPSHOT_FILE, JOURNAL_FILE):
+            with open(os.path.join(self.path, name), 'rb') as f:
+                data = f.read()
+            assert b"secret" not in data and b"pass1" not in data
+        system = open_tracker(self.path)
+        assert system.authenticate_user("carol", "carolsecret").name == "Carol"
+        assert system.authenticate_user("dave", "davesecret").name == "Dave"
+        assert system.authenticate_user("dave", "wrong") is None
+        system.close()
@@ -0,0 +1,91 @@
+import os, tempfile, pytest, logging, unittest
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import User, Student, Staff
+from App.controllers import (
+    create_student,
+    create_staff,
+    add_hours_to_student,
+    get_user,
+    get_user_by_username,
+    get_all_users_json,
+    login
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+@contextmanager
+def count_statements():
+    """Count the SQL statements run on the engine inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    for i in range(5):
+        student = create_student(f"polystudent{i}", "password", f"Poly Student {i}")
+        add_hours_to_student(student.id, 12 * i + 1)
+        create_staff(f"polystaff{i}", "password", f"Poly Staff {i}")
+    yield app.test_client()
+    db.drop_all()
+
+
+class PolymorphicLoadingIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        # start every test with an empty identity map
+        db.session.remove()
+
+    def test_mixed_user_listing_is_one_statement(self):
+        with count_statements() as statements:
+            users = db.session.scalars(db.select(User)).all()
+            payload = [user.get_json() for user in users]
+        assert len(statements) == 1
+        assert {type(u) for u in users} == {Student, Staff}
+        assert any(p.get('total_hours') for p in payload)
+
+    def test_user_lookups_are_one_statement(self):
+        student_id = get_user_by_username("polystudent3").id
+        db.session.remove()
+        with count_statements() as statements:
+            user = get_user(student_id)
+            user.get_json()
+        assert len(statements) == 1
+
+        db.session.remove()
+        with count_statements() as statements:
+            get_user_by_username("polystaff2").get_json()
+        assert len(statements) == 1
+
+    def test_user_list_json_is_one_statement(self):
+        with count_statements() as statements:
+            users = get_all_users_json()
+        assert len(statements) == 1
+        assert len([u for u in users if u['user_type'] == 'student']) >= 5
+
+    def test_login_is_one_statement(self):
+        with count_statements() as statements:
+            assert login("polystaff1", "password") is not None
+        assert len(statements) == 1
@@ -0,0 +1,84 @@
+import os, tempfile, pytest, logging, unittest
+import json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.profiling import profile_route, category_times, categorize
+from App.controllers import create_student, create_staff
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class ProfilingUnitTests(unittest.TestCase):
+
+    def test_categorize(self):
+        assert categorize(os.path.join(os.sep, 'srv', 'App', 'controllers', 'student.py')) == 'controllers'
+        assert categorize(os.path.join(os.sep, 'site-packages', 'sqlalchemy', 'orm', 'query.py')) == 'orm'
+        assert categorize(os.path.join(os.sep, 'lib', 'json', 'encoder.py')) == 'serialization'
+        assert categorize('~') == 'builtins'
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class ProfilingIntegrationTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_staff("profilestaff", "staffpass", "Profile Staff")
+        create_student("profilestudent", "pass", "Profile Student")
+
+    def login(self, client, username, password):
+        response = client.post('/api/login', data=json.dumps({'username': username, 'password': password}),
+                               content_type='application/json')
+        return {'Authorization': f"Bearer {response.json['access_token']}"}
+
+    def test_profile_route(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        headers = self.login(app.test_client(), "profilestaff", "staffpass")
+        stats, statuses, elapsed = profile_route(app, 'get', '/api/students', runs=3, headers=headers)
+        assert statuses == [200, 200, 200]
+        categories = dict(category_times(stats))
+        assert {'controllers', 'orm', 'serialization'} <= set(categories)
+        assert any(name == 'get_students_route' for _, _, name in stats.stats)
+
+    def test_staff_request_profile(self):
+        directory = tempfile.mkdtemp()
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'PROFILING_ENABLED': True, 'PROFILE_DIR': directory})
+        client = app.test_client()
+        staff = self.login(client, "profilestaff", "staffpass")
+
+        response = client.get('/api/leaderboard', headers={**staff, 'X-Profile': 'text'})
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert 'get_leaderboard_route' in response.get_data(as_text=True)
+
+        response = client.get('/api/leaderboard', headers={**staff, 'X-Profile': 'store'})
+        assert response.json[0]['username'] == 'profilestudent'
+        assert os.listdir(directory) == [response.headers['X-Profile-File']]
+        assert 'Server-Timing' in response.headers
+
+    def test_students_cannot_profile(self):
+        directory = tempfile.mkdtemp()
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'PROFILING_ENABLED': True, 'PROFILE_DIR': directory})
+        client = app.test_client()
+        student = self.login(client, "profilestudent", "pass")
+        response = client.get('/api/leaderboard', headers={**student, 'X-Profile': 'store'})
+        assert response.status_code == 200 and response.mimetype == 'application/json'
+        assert 'X-Profile-File' not in response.headers
+        assert os.listdir(directory) == []
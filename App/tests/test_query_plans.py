@@ -0,0 +1,117 @@
+import os, tempfile, pytest, logging, unittest
+import re
+
+from sqlalchemy import event, text
+
+from App.main import create_app
+from App.database import db
+from App.models import Student, User
+from App.slow_queries import explain
+from App.controllers import (
+    seed_database,
+    get_leaderboard_students,
+    get_pending_confirmations,
+    get_student_by_username,
+    add_hours_to_student,
+    get_student_accolades,
+    confirm_hours_bulk,
+    recompute_accolades
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+# a whole-table read of one of the app's tables, "SCAN student USING INDEX ..." is an ordered index walk
+FULL_SCAN = re.compile(r'^SCAN (user|student|staff|accolade)\b(?!.* USING )')
+
+
+def query_plans(fn):
+    """Run fn, rolled back afterwards, and return (sql, EXPLAIN QUERY PLAN lines) per statement"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+        db.session.rollback()
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        return [(statement, explain(cursor, 'sqlite', statement, parameters))
+                for statement, parameters in statements
+                if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT INTO ACCOLADE (STUDENT_ID, MILESTONE) SELECT'))]
+    finally:
+        connection.close()
+
+
+def plan_problems(plans, allow_scans=()):
+    """Full table scans and sorts in the plans, except scans of allow_scans"""
+    problems = []
+    for statement, plan in plans:
+        for line in plan:
+            line = line.strip()
+            scan = FULL_SCAN.match(line)
+            if (scan and scan.group(1) not in allow_scans) or line.startswith('USE TEMP B-TREE FOR ORDER BY'):
+                problems.append(f'{line}: {statement[:120]}')
+    return problems
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def seeded_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    # enough rows that the planner prefers an index over scanning, with real statistics
+    seed_database(students=5000, staff=20, reset=True, seed=7, batch_size=5000)
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    yield app.test_client()
+    db.drop_all()
+
+
+class QueryPlanIntegrationTests(unittest.TestCase):
+
+    def assert_indexed(self, fn, allow_scans=()):
+        plans = query_plans(fn)
+        assert plans, 'no statements captured'
+        assert plan_problems(plans, allow_scans) == []
+        return plans
+
+    def test_leaderboard_reads_in_index_order(self):
+        plans = self.assert_indexed(get_leaderboard_students)
+        assert any('ix_student_total_hours' in line for _, plan in plans for line in plan)
+
+    def test_pending_confirmations(self):
+        plans = self.assert_indexed(get_pending_confirmations)
+        assert any('ix_student_confirmation_requested_id' in line for _, plan in plans for line in plan)
+
+    def test_student_by_username(self):
+        self.assert_indexed(lambda: get_student_by_username('student42'))
+
+    def test_add_hours_checks_accolades(self):
+        student_id = db.session.scalar(db.select(Student.id).where(Student.total_hours == 0).limit(1))
+        plans = self.assert_indexed(lambda: add_hours_to_student(student_id, 60))
+        assert any('ix_accolade_student_id_milestone' in line for _, plan in plans for line in plan)
+
+    def test_student_accolade_rows(self):
+        student = db.session.scalar(db.select(Student).where(Student.total_hours >= 10).limit(1))
+        self.assert_indexed(lambda: [a.milestone for a in student.accolades])
+        self.assert_indexed(lambda: get_student_accolades(student.id))
+
+    def test_confirm_hours_bulk(self):
+        pending = db.session.scalars(
+            db.select(Student.id).where(Student.confirmation_requested == True).limit(20)).all()
+        self.assert_indexed(lambda: confirm_hours_bulk(pending))
+
+    def test_users_by_type(self):
+        # the admin "User type" filter
+        self.assert_indexed(lambda: User.query.filter_by(user_type='staff').all())
+
+    def test_recompute_accolades(self):
+        self.assert_indexed(lambda: recompute_accolades(chunk_size=1000))
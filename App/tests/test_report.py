@@ -0,0 +1,89 @@
+import os, tempfile, pytest, logging, unittest
+import csv
+import io
+import json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Student
+from App.controllers import (
+    create_student,
+    create_staff,
+    add_hours_to_student,
+    request_hours_confirmation,
+    iter_hours_csv,
+    write_hours_report,
+    REPORT_COLUMNS
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class ReportIntegrationTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_staff("reportstaff", "staffpass", "Report Staff")
+        cls.students = [create_student(f"reportstudent{i}", "pass", f"Report Student {i}") for i in range(5)]
+        add_hours_to_student(cls.students[0].id, 30)
+        add_hours_to_student(cls.students[1].id, 12)
+        request_hours_confirmation(cls.students[1].id)
+
+    def test_csv_chunks(self):
+        pieces = list(iter_hours_csv(chunk_size=2))
+        assert len(pieces) == 3
+        rows = list(csv.reader(io.StringIO(''.join(pieces))))
+        assert rows[0] == REPORT_COLUMNS
+        assert rows[1] == [str(self.students[0].id), 'reportstudent0', 'Report Student 0', '30', '10 25', 'False']
+        assert rows[2][3:] == ['12', '10', 'True']
+        assert len(rows) == 6
+
+    def test_csv_criteria(self):
+        rows = list(csv.reader(io.StringIO(''.join(iter_hours_csv(Student.id == self.students[1].id)))))
+        assert [row[1] for row in rows[1:]] == ['reportstudent1']
+        assert list(iter_hours_csv(Student.id == -1)) == [','.join(REPORT_COLUMNS) + '\r\n']
+
+    def test_write_csv(self):
+        out = io.BytesIO()
+        assert write_hours_report(out, 'csv', chunk_size=2) == 5
+        assert out.getvalue().decode() == ''.join(iter_hours_csv())
+
+    def test_write_parquet(self):
+        parquet = pytest.importorskip('pyarrow.parquet')
+        out = io.BytesIO()
+        assert write_hours_report(out, 'parquet', chunk_size=2) == 5
+        table = parquet.read_table(io.BytesIO(out.getvalue()))
+        assert table.column_names == REPORT_COLUMNS
+        assert table.column('accolades').to_pylist()[:2] == [[10, 25], [10]]
+        assert parquet.ParquetFile(io.BytesIO(out.getvalue())).num_row_groups == 3
+
+    def test_report_endpoint(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        client = app.test_client()
+
+        def headers(username, password):
+            response = client.post('/api/login', data=json.dumps({'username': username, 'password': password}),
+                                   content_type='application/json')
+            return {'Authorization': f"Bearer {response.json['access_token']}"}
+
+        response = client.get('/api/reports/hours.csv', headers=headers("reportstaff", "staffpass"))
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert response.get_data(as_text=True) == ''.join(iter_hours_csv())
+
+        response = client.get('/api/reports/hours.csv', headers=headers("reportstudent0", "pass"))
+        assert response.status_code == 403
@@ -0,0 +1,54 @@
+import os, tempfile, pytest, logging, unittest
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Student, Staff, Accolade, MILESTONES
+from App.controllers import seed_database, login, initialize, create_student
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class SeedIntegrationTests(unittest.TestCase):
+
+    def test_seed_creates_users_and_matching_accolades(self):
+        """Seeded students get exactly the accolades their hours earn"""
+        counts = seed_database(students=250, staff=3, password='seedpass', reset=True, seed=7, batch_size=100)
+        assert counts['students'] == 250
+        assert counts['staff'] == 3
+        assert Student.query.count() == 250
+        assert Staff.query.count() == 3
+        assert Accolade.query.count() == counts['accolades']
+
+        for student in Student.query.all():
+            earned = sorted(student.get_accolades())
+            assert earned == [m for m in MILESTONES if student.total_hours >= m]
+
+    def test_seed_appends_with_shared_password(self):
+        """Seeding again continues the username sequence and accounts can log in"""
+        seed_database(students=5, staff=1, password='seedpass', reset=True, seed=1)
+        seed_database(students=5, staff=1, password='seedpass', seed=2)
+        assert Student.query.filter_by(username='student9').first() is not None
+        assert Staff.query.filter_by(username='staff1').first() is not None
+        assert login('student9', 'seedpass') is not None
+
+    def test_seed_after_initialize(self):
+        """Numbering continues after the highest existing suffix, not the row count"""
+        initialize()
+        create_student('student7', 'pass', 'Hand Made')
+        counts = seed_database(students=5, staff=2, password='seedpass', seed=3)
+        assert counts == {'staff': 2, 'students': 5, 'accolades': counts['accolades']}
+        assert sorted(s.username for s in Staff.query.all()) == ['staff1', 'staff2', 'staff3', 'staff4']
+        assert Student.query.filter_by(username='student12').first() is not None
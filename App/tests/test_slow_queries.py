@@ -0,0 +1,100 @@
+import os, tempfile, pytest, logging, unittest
+import json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.slow_queries import (
+    normalize_sql,
+    fingerprint,
+    parameters_shape,
+    is_full_scan,
+    read_slow_queries,
+    summarize_slow_queries
+)
+from App.controllers import create_staff, create_student, get_pending_confirmations
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class SlowQueryUnitTests(unittest.TestCase):
+
+    def test_normalize_sql(self):
+        assert normalize_sql("SELECT * FROM student\n WHERE id IN (?, ?, ?) AND name = 'bob' LIMIT 10") == \
+            "SELECT * FROM student WHERE id IN (...) AND name = ? LIMIT ?"
+        assert normalize_sql("INSERT INTO t (a, b) VALUES (%(a)s, %(b)s), (%(a)s, %(b)s)") == \
+            normalize_sql("INSERT INTO t (a, b) VALUES (%(a)s, %(b)s)")
+        assert fingerprint(normalize_sql("SELECT anon_1 FROM t WHERE x = 1")) == \
+            fingerprint(normalize_sql("SELECT anon_1 FROM t WHERE x = 22"))
+
+    def test_parameters_shape(self):
+        assert parameters_shape({'id': 1, 'name': 'bob'}, False) == {'id': 'int', 'name': 'str'}
+        assert parameters_shape((1, None), False) == ['int', 'NoneType']
+        assert parameters_shape([(1, 'a'), (2, 'b')], True) == '2 x ["int", "str"]'
+        assert parameters_shape((), False) is None
+
+    def test_full_scan(self):
+        assert is_full_scan(['SCAN student', 'SEARCH user USING INTEGER PRIMARY KEY (rowid=?)'])
+        assert not is_full_scan(['SCAN student USING INDEX ix_student_total_hours'])
+        assert is_full_scan(['Sort  (cost=1.0..2.0 rows=1 width=4)', '  ->  Seq Scan on student'])
+        assert not is_full_scan(None)
+
+    def test_summarize(self):
+        entries = [
+            {'fingerprint': 'a', 'sql': 'SELECT 1', 'ms': 300, 'controller': 'c.one', 'route': 'GET /x',
+             'plan': ['SCAN student']},
+            {'fingerprint': 'b', 'sql': 'SELECT 2', 'ms': 250, 'caller': 'm.two', 'route': None},
+            {'fingerprint': 'a', 'sql': 'SELECT 1', 'ms': 100, 'controller': 'c.one', 'route': 'GET /x'}
+        ]
+        groups = summarize_slow_queries(entries)
+        assert [group['fingerprint'] for group in groups] == ['a', 'b']
+        assert groups[0]['count'] == 2 and groups[0]['mean_ms'] == 200 and groups[0]['max_ms'] == 300
+        assert groups[0]['callers'] == {'c.one': 2} and groups[0]['routes'] == {'GET /x': 2}
+        assert groups[0]['full_scan'] and not groups[1]['full_scan']
+        assert groups[1]['callers'] == {'m.two': 1}
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class SlowQueryIntegrationTests(unittest.TestCase):
+
+    def test_records_with_plan_once(self):
+        create_staff("slowstaff", "staffpass", "Slow Staff")
+        create_student("slowstudent", "pass", "Slow Student")
+        path = os.path.join(tempfile.mkdtemp(), 'slow.jsonl')
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'SLOW_QUERY_MS': 0, 'SLOW_QUERY_LOG': path})
+        get_pending_confirmations()
+        get_pending_confirmations()
+
+        entries = [entry for entry in read_slow_queries(path)
+                   if entry['controller'] == 'App.controllers.student.get_student_summaries']
+        assert len(entries) == 2
+        assert entries[0]['fingerprint'] == entries[1]['fingerprint']
+        assert 'WHERE student.confirmation_requested = ?' in entries[0]['sql']
+        # the filter is a literal, so nothing is bound
+        assert entries[0]['params'] is None
+        assert entries[0]['route'] is None
+        assert entries[0]['plan'] and 'plan' not in entries[1]
+
+        client = app.test_client()
+        response = client.post('/api/login', data=json.dumps({'username': 'slowstaff', 'password': 'staffpass'}),
+                               content_type='application/json')
+        client.get('/api/staff/pending-confirmations',
+                   headers={'Authorization': f"Bearer {response.json['access_token']}"})
+        routes = {entry['route'] for entry in read_slow_queries(path)}
+        assert 'POST /api/login' in routes and 'GET /api/staff/pending-confirmations' in routes
+        assert app.extensions['slow_queries'].recorded == len(list(read_slow_queries(path)))
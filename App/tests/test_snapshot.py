@@ -0,0 +1,101 @@
+import os, tempfile, pytest, logging, unittest
+import json
+import time
+
+from App.main import create_app
+from App.database import db, create_db
+from App.snapshot import Snapshot, SnapshotReader, SnapshotPublisher, encode_snapshot, write_snapshot, read_version
+from App.controllers import create_staff, create_student, add_hours_to_student, get_stats
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class SnapshotUnitTests(unittest.TestCase):
+
+    def test_encode_and_read(self):
+        board = b'[{"id":3},{"id":9}]\n'
+        snapshot = Snapshot(encode_snapshot({'leaderboard': board, 'odd': b'xyz', 'empty': b''}, 7))
+        assert snapshot.version == 7
+        assert bytes(snapshot.section('leaderboard')) == board
+        assert bytes(snapshot.section('odd')) == b'xyz'
+        assert bytes(snapshot.section('empty')) == b''
+        assert snapshot.section('missing') is None
+
+    def test_reader_swaps_and_expires(self):
+        path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+        reader = SnapshotReader(path, max_age=30, check_interval=0)
+        assert reader.current() is None
+        write_snapshot(path, {'stats': b'{"v":1}'}, 1)
+        old = reader.current()
+        view = old.section('stats')
+        write_snapshot(path, {'stats': b'{"v":2}'}, 2)
+        assert bytes(reader.current().section('stats')) == b'{"v":2}'
+        # views of the replaced snapshot stay readable
+        assert bytes(view) == b'{"v":1}'
+        assert read_version(path) == 2 and reader.maps == 2
+        stale = time.time() - 60
+        os.utime(path, (stale, stale))
+        assert reader.current() is None
+
+    def test_one_publisher_holds_the_lock(self):
+        path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+        first, second = SnapshotPublisher(None, path), SnapshotPublisher(None, path)
+        with open(first.lock_path, 'a+') as a, open(second.lock_path, 'a+') as b:
+            assert first._try_lock(a)
+            assert not second._try_lock(b)
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class SnapshotIntegrationTests(unittest.TestCase):
+
+    def test_routes_read_the_snapshot(self):
+        create_staff("snapstaff", "staffpass", "Snapshot Staff")
+        first = create_student("snapfirst", "pass", "Snapshot First")
+        second = create_student("snapsecond", "pass", "Snapshot Second")
+        add_hours_to_student(second.id, 30)
+
+        plain = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'}).test_client()
+        response = plain.post('/api/login', data=json.dumps({'username': 'snapstaff', 'password': 'staffpass'}),
+                              content_type='application/json')
+        headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+        expected = {route: plain.get(route, headers=headers).json
+                    for route in ('/api/leaderboard', '/api/staff', '/api/stats')}
+
+        path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'SNAPSHOT_ENABLED': True,
+                          'SNAPSHOT_PATH': path, 'SNAPSHOT_PUBLISH': False, 'SNAPSHOT_CHECK_INTERVAL': 0})
+        client = app.test_client()
+        publisher = app.extensions['snapshot_publisher']
+        assert publisher.publish() == 1
+        for route, body in expected.items():
+            response = client.get(route, headers=headers)
+            assert response.status_code == 200 and response.json == body
+            assert response.headers['ETag'].startswith('"snapshot-1-')
+
+        # unchanged data keeps the version, a write publishes a new one
+        assert publisher.publish() == 1
+        add_hours_to_student(first.id, 50)
+        assert publisher.publish() == 2
+        board = client.get('/api/leaderboard', headers=headers).json
+        assert board[0]['username'] == 'snapfirst' and board[0]['total_hours'] == 50
+        assert client.get('/api/stats', headers=headers).json == get_stats()
+
+        # a student's own record never lags behind the snapshot
+        add_hours_to_student(first.id, 5)
+        response = client.get(f'/api/students/{first.id}', headers=headers)
+        assert response.json['total_hours'] == 55 and 'ETag' not in response.headers
@@ -9,6 +9,9 @@ from App.controllers import (
     create_student,
     create_staff,
     add_hours_to_student,
+    request_hours_confirmation,
+    confirm_hours_bulk,
+    get_pending_confirmations,
     login
 )
 
@@ -229,3 +232,15 @@ class StaffAPIIntegrationTests(unittest.TestCase):
         data = response.json
         assert 10 in data['accolades']
         assert 25 in data['accolades']
+
+    def test_confirm_hours_bulk(self):
+        """Test confirming several pending requests in one statement"""
+        students = [create_student(f"bulkstudent{i}", "password", f"Bulk Student {i}") for i in range(3)]
+        for student in students[:2]:
+            request_hours_confirmation(student.id)
+
+        confirmed = confirm_hours_bulk([s.id for s in students])
+
+        assert confirmed == 2
+        pending = [s['username'] for s in get_pending_confirmations()]
+        assert not any(name.startswith('bulkstudent') for name in pending)
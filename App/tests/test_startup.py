@@ -0,0 +1,82 @@
+import os, sys, subprocess, pytest, logging, unittest
+import json
+
+from App.main import create_app, LazyAdmin
+from App.database import db, create_db
+from App.controllers import create_staff
+
+
+LOGGER = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+'''
+   Unit Tests
+'''
+class StartupUnitTests(unittest.TestCase):
+
+    def test_serve_skips_test_and_admin_imports(self):
+        """The production entry point must not import pytest, alembic or flask_admin"""
+        env = dict(os.environ, FLASK_SQLALCHEMY_DATABASE_URI='sqlite://')
+        probe = (
+            "import sys, serve\n"
+            "print(','.join(m for m in ('pytest', 'flask_admin', 'flask_migrate', 'flask_uploads') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ''
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class StartupIntegrationTests(unittest.TestCase):
+
+    def test_admin_built_on_first_use(self):
+        """The admin UI is only created when /admin is first requested"""
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'LAZY_SUBSYSTEMS': True})
+        assert isinstance(app.wsgi_app, LazyAdmin)
+        assert app.wsgi_app._admin_app is None
+
+        client = app.test_client()
+        assert client.get('/health').status_code == 200
+        assert app.wsgi_app._admin_app is None
+
+        response = client.get('/admin/')
+        admin_app = app.wsgi_app._admin_app
+        assert admin_app is not None
+        assert response.status_code == 401
+
+        create_staff("startupstaff", "staffpass", "Startup Staff")
+        response = client.post('/api/login', data=json.dumps({'username': 'startupstaff', 'password': 'staffpass'}),
+                               content_type='application/json')
+        response = client.get('/admin/', headers={'Authorization': f"Bearer {response.json['access_token']}"})
+        assert response.status_code == 200
+
+    def test_admin_shares_parent_setup(self):
+        """The lazily built admin app opens no second pool and runs the parent's request hooks"""
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'LAZY_SUBSYSTEMS': True,
+                          'ADMISSION_MAX_IN_FLIGHT': 1, 'CACHE_BACKEND': 'memory'})
+        admin_app = app.wsgi_app.get_admin_app()
+        with admin_app.app_context():
+            admin_engines = dict(db.engines)
+        with app.app_context():
+            assert admin_engines == dict(db.engines)
+        for name in ('cache', 'admission_control', 'slow_queries', 'flask-jwt-extended'):
+            assert admin_app.extensions[name] is app.extensions[name]
+
+        # with every admission slot taken the admin UI is shed like any other route
+        admission = app.extensions['admission_control']
+        admission.in_flight = 1
+        assert app.test_client().get('/admin/').status_code == 503
+        assert admission.shed == 1
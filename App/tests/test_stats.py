@@ -0,0 +1,154 @@
+import os, tempfile, pytest, logging, unittest
+import json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Stat, Student
+from App.views.admin import StudentAdminView
+from App.controllers import (
+    create_student,
+    create_staff,
+    create_user,
+    add_hours_to_student,
+    log_hours_for_student,
+    request_hours_confirmation,
+    confirm_student_hours,
+    confirm_hours_bulk,
+    seed_database,
+    backfill_accolade_masks,
+    hours_bucket,
+    student_deltas,
+    removed_student_deltas,
+    apply_stats,
+    get_stats,
+    rebuild_stats
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class StatsUnitTests(unittest.TestCase):
+
+    def test_hours_bucket(self):
+        assert hours_bucket(0) == 0
+        assert hours_bucket(None) == 0
+        assert hours_bucket(9) == 1
+        assert hours_bucket(10) == 10
+        assert hours_bucket(1000) == 250
+
+    def test_student_deltas(self):
+        deltas = student_deltas(8, 30, 0, 0b11)
+        assert deltas['total_hours'] == 22
+        assert deltas['hours:1'] == -1 and deltas['hours:25'] == 1
+        assert deltas['accolades:10'] == 1 and deltas['accolades:25'] == 1
+        assert deltas['accolades:50'] == 0
+
+    def test_removed_student_deltas(self):
+        deltas = removed_student_deltas(30, 0b11, True)
+        assert deltas['students'] == -1 and deltas['total_hours'] == -30
+        assert deltas['hours:25'] == -1 and deltas['hours:0'] == 0
+        assert deltas['accolades:10'] == -1 and deltas['pending'] == -1
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class StatsIntegrationTests(unittest.TestCase):
+
+    def assert_counters_match(self):
+        maintained = get_stats()
+        assert rebuild_stats() == maintained
+
+    def test_counters_follow_writes(self):
+        staff = create_staff("statsstaff", "staffpass", "Stats Staff")
+        alice = create_student("statsalice", "pass", "Alice")
+        bob = create_user("statsbob", "pass", "Bob")
+        before = get_stats()
+
+        add_hours_to_student(alice.id, 12)
+        log_hours_for_student(staff.id, alice.id, 20)
+        log_hours_for_student(staff.id, bob.id, 5)
+        request_hours_confirmation(alice.id)
+        request_hours_confirmation(alice.id)
+        request_hours_confirmation(bob.id)
+        confirm_student_hours(staff.id, alice.id)
+
+        after = get_stats()
+        assert after['total_hours'] - before['total_hours'] == 37
+        assert after['pending_confirmations'] - before['pending_confirmations'] == 1
+        assert after['accolades']['25'] - before['accolades']['25'] == 1
+        self.assert_counters_match()
+
+        confirm_hours_bulk([bob.id])
+        seed_database(students=50, staff=2, seed=1, batch_size=20)
+        self.assert_counters_match()
+        backfill_accolade_masks()
+        self.assert_counters_match()
+
+    def test_stats_endpoint(self):
+        create_staff("statsviewer", "viewerpass", "Viewer")
+        create_student("statsstudent", "studentpass", "Student")
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        client = app.test_client()
+
+        def headers(username, password):
+            response = client.post('/api/login', data=json.dumps({'username': username, 'password': password}),
+                                   content_type='application/json')
+            return {'Authorization': f"Bearer {response.json['access_token']}"}
+
+        response = client.get('/api/stats', headers=headers("statsviewer", "viewerpass"))
+        assert response.status_code == 200
+        assert response.json == get_stats()
+        assert [b['min'] for b in response.json['hours_histogram']] == [0, 1, 10, 25, 50, 100, 250]
+
+        response = client.get('/api/stats', headers=headers("statsstudent", "studentpass"))
+        assert response.status_code == 403
+
+    def test_apply_stats_upserts(self):
+        key = 'test:upsert'
+        apply_stats({key: 2})
+        apply_stats({key: 3})
+        db.session.commit()
+        assert db.session.get(Stat, key).value == 5
+        db.session.delete(db.session.get(Stat, key))
+        db.session.commit()
+
+    def test_admin_writes_follow_counters(self):
+        create_staff("statsadmin", "adminpass", "Admin")
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        client = app.test_client()
+        response = client.post('/api/login', data=json.dumps({'username': 'statsadmin', 'password': 'adminpass'}),
+                               content_type='application/json')
+        headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+        student = create_student("statsadminstudent", "pass", "Admin Student")
+        add_hours_to_student(student.id, 30)
+        before = get_stats()
+
+        # this wtforms can't build the admin edit form, so the edit drives the view hook directly
+        view = StudentAdminView(Student, db.session, endpoint='statsstudents')
+        student = db.session.get(Student, student.id)
+        student.confirmation_requested = True
+        view.on_model_change(None, student, False)
+        db.session.commit()
+        assert get_stats()['pending_confirmations'] - before['pending_confirmations'] == 1
+        self.assert_counters_match()
+
+        response = client.post('/admin/user/delete/', headers=headers, data={'id': student.id})
+        assert response.status_code == 302
+        after = get_stats()
+        assert before['students'] - after['students'] == 1
+        assert after['pending_confirmations'] == before['pending_confirmations']
+        self.assert_counters_match()
@@ -0,0 +1,74 @@
+import os, tempfile, pytest, logging, unittest
+
+from system import CommunityServiceTracker, _SortedKeys
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+'''
+   Unit Tests
+'''
+class SortedKeysUnitTests(unittest.TestCase):
+
+    def test_add_remove_across_chunks(self):
+        keys = _SortedKeys()
+        keys.LOAD = 4
+        for n in range(50, 0, -1):
+            keys.add((n % 7, n))
+        for n in range(1, 50, 3):
+            keys.remove((n % 7, n))
+        expected = sorted((n % 7, n) for n in range(1, 51) if (n - 1) % 3)
+        assert keys.first() == expected
+        assert keys.first(5) == expected[:5]
+
+    def test_remove_missing_key(self):
+        keys = _SortedKeys([(0, 1), (0, 3)])
+        for missing in ((0, 2), (0, 4)):
+            with pytest.raises(KeyError):
+                keys.remove(missing)
+        assert keys.first() == [(0, 1), (0, 3)]
+        with pytest.raises(KeyError):
+            _SortedKeys().remove((0, 1))
+
+
+class TrackerUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.system = CommunityServiceTracker()
+        self.staff = self.system.get_user_by_username("smith")
+
+    def test_authenticate(self):
+        assert self.system.authenticate_user("alice123", "pass1").name == "Alice"
+        assert self.system.authenticate_user("alice123", "wrong") is None
+        assert self.system.authenticate_user("nobody", "pass1") is None
+
+    def test_duplicate_username(self):
+        with pytest.raises(ValueError):
+            self.system.add_student("Alice Again", "alice123", "pass")
+
+    def test_leaderboard_follows_hours(self):
+        alice = self.system.get_user_by_username("alice123")
+        bob = self.system.get_user_by_username("bob123")
+        self.staff.log_hours(bob, 5)
+        assert self.system.view_leaderboard() == [bob, alice]
+        self.staff.log_hours(alice, 5)
+        # ties keep the order students were added in
+        assert self.system.get_leaderboard() == [{"name": "Alice", "hours": 5}, {"name": "Bob", "hours": 5}]
+        self.staff.log_hours(bob, 1)
+        assert self.system.view_leaderboard(1) == [bob]
+
+    def test_pending_students(self):
+        alice = self.system.get_user_by_username("alice123")
+        bob = self.system.get_user_by_username("bob123")
+        bob.request_confirmation()
+        alice.request_confirmation()
+        assert self.system.get_pending_students() == [bob, alice]
+        assert self.staff.confirm_hours(bob)
+        assert self.system.get_pending_students() == [alice]
+
+    def test_lookup_by_username_and_type(self):
+        assert self.system.get_student_by_name("alice123").name == "Alice"
+        assert self.system.get_student_by_name("smith") is None
+        assert self.system.get_staff_by_name("smith") is self.staff
+        assert self.system.get_staff_by_name("alice123") is None
@@ -0,0 +1,95 @@
+import os, tempfile, pytest, logging, unittest
+import json
+
+from App.main import create_app
+from App.database import db, create_db
+from App.token_cache import VerifiedTokenCache
+from App.controllers import create_student
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+'''
+   Unit Tests
+'''
+class TokenCacheUnitTests(unittest.TestCase):
+
+    def test_honours_exp_and_max_ttl(self):
+        clock = FakeClock()
+        cache = VerifiedTokenCache(max_entries=10, max_ttl=300, clock=clock)
+        cache.put('short', {'sub': '1', 'exp': 1010})
+        cache.put('long', {'sub': '2', 'exp': 5000})
+        assert cache.get('short') == {'sub': '1', 'exp': 1010}
+        clock.now = 1010
+        assert cache.get('short') is None
+        assert cache.get('long') is not None
+        clock.now = 1300
+        assert cache.get('long') is None
+        assert cache.metrics()['entries'] == 0
+
+    def test_bounded_lru(self):
+        cache = VerifiedTokenCache(max_entries=2, clock=FakeClock())
+        cache.put('a', {'sub': 'a'})
+        cache.put('b', {'sub': 'b'})
+        cache.get('a')
+        cache.put('c', {'sub': 'c'})
+        assert cache.get('b') is None and cache.get('a') is not None
+        assert cache.metrics()['evictions'] == 1
+
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class TokenCacheIntegrationTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_student("tokenstudent", "pass", "Token Student")
+
+    def test_repeat_requests_skip_verification(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+        cache = app.extensions['jwt_token_cache']
+        client = app.test_client()
+        response = client.post('/api/login', data=json.dumps({'username': 'tokenstudent', 'password': 'pass'}),
+                               content_type='application/json')
+        token = response.json['access_token']
+
+        for _ in range(3):
+            response = client.get('/api/students/me', headers={'Authorization': f'Bearer {token}'})
+            assert response.status_code == 200 and response.json['username'] == 'tokenstudent'
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        # a token with a changed signature is a different key and fails verification
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        response = client.get('/api/students/me', headers={'Authorization': f'Bearer {tampered}'})
+        assert response.status_code in (401, 422)
+        assert cache.metrics()['entries'] == 1
+
+    def test_disabled(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                          'JWT_VERIFY_CACHE_ENABLED': False})
+        assert 'jwt_token_cache' not in app.extensions
+        client = app.test_client()
+        response = client.post('/api/login', data=json.dumps({'username': 'tokenstudent', 'password': 'pass'}),
+                               content_type='application/json')
+        response = client.get('/api/students/me', headers={'Authorization': f"Bearer {response.json['access_token']}"})
+        assert response.status_code == 200
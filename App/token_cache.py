@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import JWTManager
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of decoded claims for tokens whose signature has been verified.
+
+    Keyed by a hash of the raw token, so tokens are not kept in memory. An
+    entry lasts until the token's `exp` or `max_ttl` seconds, whichever
+    comes first; after that the token goes through full verification
+    again, which rejects it once it has expired.
+    """
+
+    def __init__(self, max_entries=10000, max_ttl=300, clock=time.time):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # digest -> (expires_at, claims)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        return hashlib.blake2b(token.encode() if isinstance(token, str) else token, digest_size=16).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token, claims):
+        expires_at = self.clock() + self.max_ttl
+        if 'exp' in claims:
+            expires_at = min(expires_at, claims['exp'])
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions
+        }
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips signature verification for tokens it has already verified.
+
+    Only the decode is cached: the blocklist, user lookup and claims
+    verification callbacks still run on every request. Cookie tokens
+    checked against a CSRF value, and decodes that allow expired tokens,
+    always go through the full path.
+    """
+
+    def __init__(self, app=None, token_cache=None, **kwargs):
+        self.token_cache = token_cache
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = self.token_cache
+        if cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        claims = cache.get(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            cache.put(encoded_token, claims)
+        # the caller keeps the claims on flask.g, a copy keeps the cached entry intact
+        return dict(claims)
+
+
+def token_cache_from_config(app):
+    """A VerifiedTokenCache sized by JWT_VERIFY_CACHE_*, None when it is disabled"""
+    if not app.config['JWT_VERIFY_CACHE_ENABLED']:
+        return None
+    cache = VerifiedTokenCache(app.config['JWT_VERIFY_CACHE_MAX_ENTRIES'], app.config['JWT_VERIFY_CACHE_MAX_TTL'])
+    app.extensions['jwt_token_cache'] = cache
+    return cache
@@ -0,0 +1,12 @@
+from flask import current_app
+
+
+def get_photos(app=None):
+    """Return the photos UploadSet, configuring Flask-Reuploaded on first use"""
+    from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
+
+    app = app or current_app._get_current_object()
+    photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
+    if photos.name not in getattr(app, 'upload_set_config', {}):
+        configure_uploads(app, photos)
+    return photos
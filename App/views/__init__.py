@@ -5,8 +5,14 @@ from .index import index_views
 from .auth import auth_views
 from .student import student_views
 from .staff import staff_views
-from .admin import setup_admin
+from .report import report_views
 
 
-views = [user_views, index_views, auth_views, student_views, staff_views] 
-# blueprints must be added to this list
\ No newline at end of file
+views = [user_views, index_views, auth_views, student_views, staff_views, report_views]
+# blueprints must be added to this list
+
+
+def setup_admin(app):
+    # flask_admin (and wtforms with it) is only imported once the admin UI is built
+    from .admin import setup_admin as _setup_admin
+    return _setup_admin(app)
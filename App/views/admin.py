@@ -1,21 +1,155 @@
+from flask_admin.actions import action
 from flask_admin.contrib.sqla import ModelView
+from flask_admin.contrib.sqla.filters import FilterEqual, BooleanEqualFilter
 from flask_jwt_extended import jwt_required, current_user, unset_jwt_cookies, set_access_cookies
 from flask_admin import Admin
-from flask import flash, redirect, url_for, request
+from flask import Response, abort, current_app, flash, redirect, url_for, request, stream_with_context
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import selectinload
+from App.cache import invalidate
 from App.database import db
-from App.models import User
+from App.models import User, Student, Staff
+from App.controllers import (
+    confirm_hours_bulk,
+    iter_hours_csv,
+    apply_stats,
+    removed_student_deltas,
+    student_tags
+)
+
+
+class EstimatedCountQuery:
+    """Stands in for the list view's COUNT(*) query with a planner estimate.
+
+    Search and filters call query methods on it, which hand back the real
+    query, so the estimate is only ever used for the unfiltered list.
+    """
+
+    def __init__(self, query, estimate):
+        self.query = query
+        self.estimate = estimate
+
+    def scalar(self):
+        return self.estimate
+
+    def __getattr__(self, name):
+        return getattr(self.query, name)
+
 
 class AdminView(ModelView):
+    page_size = 50
+    can_set_page_size = True
+    # only sort and filter on indexed columns, anything else scans the table
+    column_sortable_list = ('id', 'username', 'user_type')
+    column_default_sort = 'id'
+    column_filters = [FilterEqual(User.username, 'Username'), FilterEqual(User.user_type, 'User type')]
+    column_exclude_list = ('password',)
+    column_searchable_list = None
+    # accounts are made with create_student / create_staff, which hash the password and count the
+    # student; Student() and Staff() also need constructor arguments the create form can't pass
+    can_create = False
+    # the form would store a new password unhashed
+    form_excluded_columns = ('password',)
 
     @jwt_required()
     def is_accessible(self):
-        return current_user is not None
+        return current_user is not None and current_user.user_type == 'staff'
 
     def inaccessible_callback(self, name, **kwargs):
+        if current_user is not None:
+            # logged in, but not staff
+            abort(403)
         # redirect to login page if user doesn't have access
         flash("Login to access admin")
         return redirect(url_for('index_page', next=request.url))
 
+    def is_action_allowed(self, name):
+        return current_user is not None and current_user.user_type == 'staff' and super().is_action_allowed(name)
+
+    def estimate_count(self):
+        """Postgres planner row estimate, or None to fall back to an exact COUNT(*)"""
+        if not current_app.config['ADMIN_APPROXIMATE_COUNT'] or self.session.get_bind().dialect.name != 'postgresql':
+            return None
+        table = f'"{self.model.__table__.name}"'
+        estimate = self.session.execute(
+            text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)'), {'table': table}
+        ).scalar()
+        # tables that were never analyzed report -1, small tables are cheap to count exactly
+        if estimate is None or estimate < current_app.config['ADMIN_APPROXIMATE_COUNT_MIN_ROWS']:
+            return None
+        return estimate
+
+    def get_count_query(self):
+        query = super().get_count_query()
+        estimate = self.estimate_count()
+        return query if estimate is None else EstimatedCountQuery(query, estimate)
+
+    # The User view lists students too, so the stat counters and cached reads
+    # are kept in step here for whichever view writes a student.
+    def on_model_change(self, form, model, is_created):
+        if not isinstance(model, Student):
+            return
+        history = inspect(model).attrs.confirmation_requested.history
+        if history.has_changes():
+            old = bool(history.deleted and history.deleted[0])
+            new = bool(history.added and history.added[0])
+            apply_stats({'pending': new - old})
+
+    def on_model_delete(self, model):
+        if isinstance(model, Student):
+            apply_stats(removed_student_deltas(model.total_hours, model.accolade_mask, model.confirmation_requested))
+
+    def after_model_change(self, form, model, is_created):
+        self._invalidate(model)
+
+    def after_model_delete(self, model):
+        self._invalidate(model)
+
+    def _invalidate(self, model):
+        if isinstance(model, Student):
+            invalidate('students', *student_tags(model.id, pending=True))
+        elif isinstance(model, Staff):
+            invalidate('staff')
+
+
+class StudentAdminView(AdminView):
+    column_list = ('id', 'username', 'name', 'total_hours', 'confirmation_requested', 'accolades')
+    column_sortable_list = ('id', 'username', 'total_hours')
+    # hours and accolades change through logged hours, which awards accolades and keeps the mask in step
+    form_excluded_columns = AdminView.form_excluded_columns + ('total_hours', 'accolade_mask', 'accolades')
+    column_filters = [FilterEqual(Student.username, 'Username'),
+                      BooleanEqualFilter(Student.confirmation_requested, 'Confirmation requested')]
+    column_formatters = {
+        'accolades': lambda view, context, model, name: ', '.join(
+            f"{a.milestone}h ({a.awarded_at:%Y-%m-%d})" if a.awarded_at else f"{a.milestone}h"
+            for a in sorted(model.accolades, key=lambda a: a.milestone)
+        )
+    }
+
+    def get_query(self):
+        # one extra SELECT per page for all accolades instead of one per row
+        return super().get_query().options(selectinload(Student.accolades))
+
+    @action('confirm_hours', 'Confirm hours', 'Confirm hours for the selected students?')
+    def action_confirm_hours(self, ids):
+        confirmed = confirm_hours_bulk([int(i) for i in ids])
+        flash(f'Confirmed hours for {confirmed} students')
+
+    @action('export', 'Export CSV')
+    def action_export(self, ids):
+        rows = iter_hours_csv(Student.id.in_([int(i) for i in ids]))
+        return Response(stream_with_context(rows), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=students.csv'})
+
+
+class StaffAdminView(AdminView):
+    column_list = ('id', 'username', 'name')
+    column_sortable_list = ('id', 'username')
+    column_filters = [FilterEqual(Staff.username, 'Username')]
+
+
 def setup_admin(app):
     admin = Admin(app, name='FlaskMVC', template_mode='bootstrap3')
-    admin.add_view(AdminView(User, db.session))
\ No newline at end of file
+    admin.add_view(AdminView(User, db.session))
+    admin.add_view(StudentAdminView(Student, db.session, endpoint='students', name='Students'))
+    admin.add_view(StaffAdminView(Staff, db.session, endpoint='staff_members', name='Staff'))
@@ -1,4 +1,4 @@
-from flask import Blueprint, redirect, render_template, request, send_from_directory, jsonify
+from flask import Blueprint, redirect, render_template, request, send_from_directory, jsonify, current_app
 from App.controllers import create_user, initialize
 
 index_views = Blueprint('index_views', __name__, template_folder='../templates')
@@ -13,5 +13,13 @@ def init():
     return jsonify(message='db initialized!')
 
 @index_views.route('/health', methods=['GET'])
+@index_views.route('/health/live', methods=['GET'])
 def health_check():
-    return jsonify({'status':'healthy'})
\ No newline at end of file
+    """Liveness: the process is up and serving, touches nothing else"""
+    return jsonify({'status':'healthy'})
+
+@index_views.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: 503 while the database is unreachable or this worker is saturated"""
+    ready, report = current_app.extensions['readiness'].check()
+    return jsonify(report), 200 if ready else 503
@@ -0,0 +1,20 @@
+from flask import Blueprint, Response, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, current_user
+
+from App.controllers import iter_hours_csv
+
+report_views = Blueprint('report_views', __name__)
+
+
+@report_views.route('/api/reports/hours.csv', methods=['GET'])
+@jwt_required()
+def hours_report_route():
+    """Stream every student's hours, accolades and confirmation state as CSV"""
+    if current_user.user_type != 'staff':
+        return jsonify({'error': 'Only staff can export reports'}), 403
+
+    return Response(
+        stream_with_context(iter_hours_csv()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=hours.csv'}
+    )
@@ -1,16 +1,30 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, current_user
 
+from App.cache import get_cache
+from App.snapshot import snapshot_response
 from App.controllers import (
     log_hours_for_student,
     confirm_student_hours,
-    get_pending_confirmations,
-    get_all_staff_json
+    get_pending_students,
+    get_all_staff,
+    get_stats
 )
 
 staff_views = Blueprint('staff_views', __name__)
 
 
+def whole_number(value):
+    """`value` as an int if it is a whole number or a string holding one, else None"""
+    # JSON true would otherwise count as 1 and 1.5 would be cut to 1
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
 @staff_views.route('/api/staff', methods=['GET'])
 @jwt_required()
 def get_staff_route():
@@ -18,7 +32,11 @@ def get_staff_route():
     if current_user.user_type != 'staff':
         return jsonify({'error': 'Unauthorized'}), 403
 
-    staff = get_all_staff_json()
+    response = snapshot_response('staff')
+    if response is not None:
+        return response, 200
+
+    staff = get_all_staff()
     return jsonify(staff), 200
 
 
@@ -39,17 +57,19 @@ def log_hours_route():
     if current_user.user_type != 'staff':
         return jsonify({'error': 'Only staff can log hours'}), 403
 
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
     student_id = data.get('student_id')
     hours = data.get('hours')
 
     if not student_id or not hours:
         return jsonify({'error': 'student_id and hours are required'}), 400
 
-    try:
-        hours = int(hours)
-    except ValueError:
-        return jsonify({'error': 'Hours must be a number'}), 400
+    student_id = whole_number(student_id)
+    hours = whole_number(hours)
+    if student_id is None or hours is None:
+        return jsonify({'error': 'student_id and hours must be whole numbers'}), 400
 
     student, error = log_hours_for_student(current_user.id, student_id, hours)
     if error:
@@ -91,5 +111,32 @@ def get_pending_confirmations_route():
     if current_user.user_type != 'staff':
         return jsonify({'error': 'Only staff can view pending confirmations'}), 403
 
-    students = get_pending_confirmations()
+    students = get_pending_students()
     return jsonify(students), 200
+
+
+@staff_views.route('/api/stats', methods=['GET'])
+@jwt_required()
+def get_stats_route():
+    """Totals for staff dashboards, read from the maintained counters"""
+    if current_user.user_type != 'staff':
+        return jsonify({'error': 'Only staff can view statistics'}), 403
+
+    response = snapshot_response('stats')
+    if response is not None:
+        return response, 200
+
+    return jsonify(get_stats()), 200
+
+
+@staff_views.route('/api/stats/cache', methods=['GET'])
+@jwt_required()
+def get_cache_stats_route():
+    """Query cache hit ratio, evictions and memory use for this worker"""
+    if current_user.user_type != 'staff':
+        return jsonify({'error': 'Only staff can view statistics'}), 403
+
+    cache = get_cache()
+    if cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **cache.metrics()}), 200
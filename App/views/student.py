@@ -1,12 +1,13 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 
+from App.snapshot import snapshot_response
 from App.controllers import (
-    get_student,
+    get_student_summary,
     request_hours_confirmation,
     get_student_accolades,
-    get_leaderboard,
-    get_all_students_json
+    get_leaderboard_students,
+    get_all_students
 )
 
 student_views = Blueprint('student_views', __name__)
@@ -19,7 +20,8 @@ def get_students_route():
     if current_user.user_type != 'staff':
         return jsonify({'error': 'Unauthorized'}), 403
 
-    students = get_all_students_json()
+    # models are serialized one by one by the JSON provider
+    students = get_all_students()
     return jsonify(students), 200
 
 
@@ -30,7 +32,7 @@ def get_student_route(student_id):
     if current_user.user_type == 'student' and current_user.id != student_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
-    student = get_student(student_id)
+    student = get_student_summary(student_id)
     if not student:
         return jsonify({'error': 'Student not found'}), 404
 
@@ -82,5 +84,9 @@ def get_accolades_route(student_id):
 @jwt_required()
 def get_leaderboard_route():
     """Get leaderboard (all users can view)"""
-    leaderboard = get_leaderboard()
+    response = snapshot_response('leaderboard')
+    if response is not None:
+        return response, 200
+
+    leaderboard = get_leaderboard_students()
     return jsonify(leaderboard), 200
@@ -28,7 +28,7 @@ def create_user_action():
 
 @user_views.route('/api/users', methods=['GET'])
 def get_users_action():
-    users = get_all_users_json()
+    users = get_all_users()
     return jsonify(users)
 
 @user_views.route('/api/users', methods=['POST'])
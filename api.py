@@ -1,9 +1,12 @@
 import os
+from collections import namedtuple
+from datetime import timedelta
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt, jwt_required
 from App import db
 from App.models import User  # Your SQLAlchemy User model
-from system import CommunityServiceTracker
+from persistence import open_tracker
 from werkzeug.security import generate_password_hash, check_password_hash
 
 # ------------------ FLASK APP SETUP ------------------
@@ -14,11 +17,21 @@ CORS(app)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///instance/database.db'  # adjust path if needed
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Signed tokens: the claims carry id, username and role, so checking a token
+# is a signature check and never a database query. The key has no default,
+# a known key would let anyone forge a staff token.
+app.config['JWT_SECRET_KEY'] = os.environ.get("JWT_SECRET_KEY")
+if not app.config['JWT_SECRET_KEY']:
+    raise RuntimeError("JWT_SECRET_KEY must be set to sign api.py tokens")
+app.config['JWT_TOKEN_LOCATION'] = ["headers"]
+app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=int(os.environ.get("JWT_EXPIRES_HOURS", "12")))
+jwt = JWTManager(app)
+
 # Initialize db with app
 db.init_app(app)
 
 # Initialize your system
-system = CommunityServiceTracker()
+system = open_tracker(os.environ.get("TRACKER_DATA", "tracker_data"))
 
 
 # ------------------ HELPER FUNCTIONS ------------------
@@ -35,11 +48,52 @@ def create_bob_if_missing():
         db.session.commit()
 
 
-def get_user_by_token(token):
-    """Return user object based on token (username simulation)."""
-    if not token:
-        return None
-    return User.query.filter_by(username=token).first()
+Identity = namedtuple("Identity", ["id", "username", "role", "password"])
+
+
+class UserDirectory:
+    """Username-indexed view of the User table, joined to the tracker by username.
+
+    Logins read the row with one indexed SELECT every time, so a changed
+    password or a deleted user takes effect at once; nothing holding a
+    password hash is cached. Requests carrying a token never come here,
+    the signed claims already hold the id, username and role. Tracker
+    users are looked up through its username index, so each call does a
+    constant amount of work.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def by_username(self, username):
+        row = db.session.execute(
+            db.select(User.id, User.username, User.user_type, User.password).filter_by(username=username)
+        ).first()
+        return Identity(*row) if row is not None else None
+
+    def tracker_student(self, username):
+        return self.tracker.get_student_by_name(username)
+
+    def tracker_staff(self, username):
+        return self.tracker.get_staff_by_name(username)
+
+
+directory = UserDirectory(system)
+
+# "user" is what create_bob_if_missing() stores, "student" what the main app stores
+STUDENT_ROLES = ("student", "user")
+
+
+@jwt.unauthorized_loader
+@jwt.invalid_token_loader
+def unauthorized(reason):
+    return jsonify({"error": "Unauthorized"}), 401
+
+
+@jwt.expired_token_loader
+@jwt.revoked_token_loader
+def token_expired(_jwt_header, _jwt_data):
+    return jsonify({"error": "Unauthorized"}), 401
 
 
 # ------------------ ROUTES ------------------
@@ -49,28 +103,27 @@ def login():
     username = data.get("username")
     password = data.get("password")
 
-    user = User.query.filter_by(username=username).first()
+    user = directory.by_username(username)
     if user and check_password_hash(user.password, password):
-        token = username  # simple token for demo
+        token = create_access_token(identity=str(user.id),
+                                    additional_claims={"username": user.username, "role": user.role})
         return jsonify({"access_token": token})
     return jsonify({"error": "Invalid credentials"}), 401
 
 
 @app.route("/api/identify", methods=["GET"])
+@jwt_required()
 def identify():
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    user = get_user_by_token(token)
-    if user:
-        return jsonify({"username": user.username, "role": user.user_type})
-    return jsonify({"error": "Unauthorized"}), 401
+    claims = get_jwt()
+    return jsonify({"username": claims["username"], "role": claims["role"]})
 
 
 @app.route("/api/students/me/request-confirmation", methods=["POST"])
+@jwt_required()
 def request_confirmation():
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    student = get_user_by_token(token)
-    if student and student.user_type == "user":
-        s = system.get_student_by_name(student.username)
+    claims = get_jwt()
+    if claims["role"] in STUDENT_ROLES:
+        s = directory.tracker_student(claims["username"])
         if s:
             s.request_confirmation()
             return jsonify({"message": "Hours confirmation requested"})
@@ -78,28 +131,33 @@ def request_confirmation():
 
 
 @app.route("/api/staff/log-hours", methods=["POST"])
+@jwt_required()
 def log_hours():
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    staff = get_user_by_token(token)
-    if not staff or staff.user_type != "staff":
+    claims = get_jwt()
+    staff_obj = directory.tracker_staff(claims["username"]) if claims["role"] == "staff" else None
+    if not staff_obj:
         return jsonify({"error": "Unauthorized"}), 401
 
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     student_id = data.get("student_id")
     hours = data.get("hours")
+    # checked before the tracker sees them, bool is an int too
+    if type(student_id) is not int or type(hours) is not int or hours <= 0:
+        return jsonify({"error": "student_id and hours must be positive whole numbers"}), 400
     student = system.get_student(student_id)
     if not student:
         return jsonify({"error": "Student not found"}), 404
 
-    staff_obj = system.get_staff_by_name(staff.username)
-    staff_obj.log_hours(student, hours)
+    try:
+        staff_obj.log_hours(student, hours)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify({"message": f"Logged {hours} hours for {student.name}"})
 
 
 @app.route("/api/leaderboard", methods=["GET"])
 def leaderboard():
-    board = [{"name": s.name, "hours": s.hours} for s in sorted(system.students, key=lambda x: x.hours, reverse=True)]
-    return jsonify(board)
+    return jsonify(system.get_leaderboard())
 
 
 # ------------------ MAIN -------------
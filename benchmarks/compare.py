@@ -0,0 +1,46 @@
+"""
+Compare two benchmarks/load.py result files.
+
+    python -m benchmarks.compare benchmarks/results/abc123-....json benchmarks/results/def456-....json
+
+Positive throughput deltas and negative latency deltas are improvements.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ['throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms']
+
+
+def delta(before, after):
+    if not before:
+        return 'n/a'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    if before['dataset'] != after['dataset']:
+        print(f"warning: datasets differ ({before['dataset']} vs {after['dataset']})")
+    print(f"{before['commit']} -> {after['commit']}")
+    print(f"{'scenario':<12} " + ' '.join(f'{m:>30}' for m in METRICS))
+    for name, old in before['scenarios'].items():
+        new = after['scenarios'].get(name)
+        if new is None:
+            continue
+        cells = [f"{old[m]:>10} -> {new[m]:>10} {delta(old[m], new[m]):>6}" for m in METRICS]
+        print(f"{name:<12} " + ' '.join(f'{c:>30}' for c in cells))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
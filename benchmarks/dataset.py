@@ -0,0 +1,42 @@
+"""
+Seeded synthetic datasets for the benchmarks.
+
+A thin wrapper around App.controllers.seed_database (the `flask seed`
+command) that always resets the schema and uses a fixed password, so the same
+--seed always produces the same data and the load generator can log in.
+
+    python -m benchmarks.dataset --students 100000 --staff 50 --database-uri sqlite:///bench.db
+"""
+import argparse
+import sys
+import time
+
+BENCH_PASSWORD = 'benchpass'
+
+
+def seed(app, students, staff, seed=42):
+    """Drop and recreate the schema of `app`'s database and fill it"""
+    from App.controllers import seed_database
+
+    with app.app_context():
+        return seed_database(students, staff, password=BENCH_PASSWORD, reset=True, seed=seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--staff', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-uri', default='sqlite:///bench.db')
+    args = parser.parse_args(argv)
+
+    from App.main import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_uri})
+    started = time.perf_counter()
+    counts = seed(app, args.students, args.staff, args.seed)
+    print(f"seeded {counts} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Time and peak memory of the student hours export.
+
+Seeds an in-memory SQLite database, then writes the roster to /dev/null
+(a) by loading every student summary first, as scraping /api/students did,
+(b) as streamed CSV and (c) as Parquet when pyarrow is installed. Peak
+memory is measured with tracemalloc in a separate run.
+
+    python -m benchmarks.export
+    python -m benchmarks.export --students 500000 --chunk-size 10000
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+
+def measure(fn):
+    """Wall time of one run, then peak traced memory of a second one"""
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    from App.main import create_app
+    from App.controllers import seed_database, get_all_students, write_hours_report, REPORT_COLUMNS
+
+    create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    seed_database(students=args.students, staff=1, reset=True, seed=42)
+
+    def load_then_write():
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(REPORT_COLUMNS)
+        for s in get_all_students():
+            writer.writerow([s.id, s.username, s.name, s.total_hours,
+                             ' '.join(map(str, s.accolades)), s.confirmation_requested])
+        with open(os.devnull, 'w') as f:
+            f.write(out.getvalue())
+
+    def streamed(report_format):
+        def run():
+            with open(os.devnull, 'wb') as f:
+                write_hours_report(f, report_format, args.chunk_size)
+        return run
+
+    cases = [('load all, then CSV', load_then_write), ('streamed CSV', streamed('csv'))]
+    try:
+        import pyarrow  # noqa: F401
+        cases.append(('streamed Parquet', streamed('parquet')))
+    except ImportError:
+        print('pyarrow not installed, skipping Parquet')
+
+    print(f'{args.students} students, chunks of {args.chunk_size}')
+    print(f"{'export':<22} {'seconds':>8} {'peak MB':>8}")
+    for name, fn in cases:
+        elapsed, peak = measure(fn)
+        print(f'{name:<22} {elapsed:>8.2f} {peak:>8.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Throughput, latency and commit rate of concurrent log-hours calls.
+
+Seeds a SQLite file database, then runs `--threads` threads calling
+log_hours_for_student for `--duration` seconds, each in its own app context
+as a threaded worker would. Most calls go to a few hot students (the skew an
+event day produces). Runs once with a commit per call and once per group
+commit window.
+
+    python -m benchmarks.group_commit
+    python -m benchmarks.group_commit --threads 32 --windows 2,5,10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def run(app, staff_id, student_ids, args):
+    from sqlalchemy import event
+    from App.database import db
+    from App.controllers import log_hours_for_student
+
+    commits = [0]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    hot = student_ids[:args.hot]
+
+    def on_commit(session):
+        commits[0] += 1
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        deadline = time.perf_counter() + args.duration
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                student_id = rng.choice(hot) if rng.random() < args.hot_share else rng.choice(student_ids)
+                started = time.perf_counter()
+                _, error = log_hours_for_student(staff_id, student_id, 1)
+                local.append(time.perf_counter() - started)
+                if error:
+                    with lock:
+                        errors[0] += 1
+                db.session.remove()
+        with lock:
+            latencies.extend(local)
+
+    event.listen(db.session, 'after_commit', on_commit)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    event.remove(db.session, 'after_commit', on_commit)
+    return len(latencies) / elapsed, commits[0] / elapsed, latencies, errors[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--hot', type=int, default=20, help='number of hot students')
+    parser.add_argument('--hot-share', type=float, default=0.8, help='share of calls that go to a hot student')
+    parser.add_argument('--windows', default='5', help='comma separated group commit windows in ms')
+    args = parser.parse_args(argv)
+
+    from App.main import create_app
+    from App.database import db
+    from App.models import Staff, Student
+    from App.controllers import seed_database
+
+    directory = tempfile.mkdtemp()
+    uri = 'sqlite:///' + os.path.join(directory, 'group_commit.db')
+    create_app({'SQLALCHEMY_DATABASE_URI': uri})
+    seed_database(students=args.students, staff=1, reset=True, seed=42)
+    staff_id = db.session.scalar(db.select(Staff.id))
+    student_ids = db.session.scalars(db.select(Student.id).order_by(Student.id)).all()
+    db.session.remove()
+
+    cases = [('commit per call', {'GROUP_COMMIT_ENABLED': False})]
+    for window in args.windows.split(','):
+        cases.append((f'group commit {window} ms', {'GROUP_COMMIT_ENABLED': True,
+                                                    'GROUP_COMMIT_WINDOW_MS': float(window)}))
+
+    print(f'{args.students} students, {args.threads} threads, {args.hot_share:.0%} of calls to {args.hot} students')
+    print(f"{'mode':<22} {'calls/s':>9} {'commits/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, overrides in cases:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': uri, **overrides})
+        throughput, commit_rate, latencies, errors = run(app, staff_id, student_ids, args)
+        print(f'{name:<22} {throughput:>9.0f} {commit_rate:>10.0f} '
+              f'{percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 99) * 1000:>8.2f} {errors:>7}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: serializing 10k Student.get_json() payloads.
+
+Compares Flask's stdlib provider with the orjson-backed FastJSONProvider,
+both on a prebuilt list of dicts and on the models passed to jsonify()
+directly (how the bulk routes call it).
+
+    python -m benchmarks.json_serialization
+    python -m benchmarks.json_serialization --students 100000 --repeat 5
+"""
+import argparse
+import statistics
+import sys
+import time
+
+
+def load_students(count):
+    from App.database import db
+    from App.models import Student
+    from App.controllers import seed_database
+
+    seed_database(students=count, staff=0, reset=True, seed=42)
+    return db.session.scalars(db.select(Student)).all()
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    from App.main import create_app
+    from App.json_provider import FastJSONProvider, StdlibJSONProvider, orjson
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    students = load_students(args.students)
+    stdlib, fast = StdlibJSONProvider(app), FastJSONProvider(app)
+
+    cases = [
+        ('stdlib, get_json() list', lambda: len(stdlib.response([s.get_json() for s in students]).get_data())),
+        ('stdlib, models', lambda: len(stdlib.response(students).get_data())),
+        ('fast, get_json() list', lambda: len(fast.response([s.get_json() for s in students]).get_data())),
+        ('fast, models', lambda: len(fast.response(students).get_data())),
+    ]
+    print(f"{args.students} students, orjson {'installed' if orjson else 'NOT installed (fast = stdlib fallback)'}")
+    baseline = None
+    for name, fn in cases:
+        ms, size = timed(fn, args.repeat)
+        baseline = baseline or ms
+        print(f"{name:<26} {ms:>9.2f} ms  {baseline / ms:>5.2f}x  {size} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
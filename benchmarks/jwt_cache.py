@@ -0,0 +1,67 @@
+"""
+Auth overhead per request with and without the verified-token cache.
+
+Logs one student in, then times, with the token sent on every call:
+
+    decode   flask_jwt_extended.decode_token, the signature check and claims parsing
+    request  GET /api/students/me through the test client, the whole request
+
+    python -m benchmarks.jwt_cache
+    python -m benchmarks.jwt_cache --runs 20000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def per_call_us(fn, runs):
+    for _ in range(min(runs, 100)):
+        fn()
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) / runs * 1e6
+
+
+def measure(uri, enabled, runs):
+    from flask_jwt_extended import decode_token
+    from App.main import create_app
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'JWT_VERIFY_CACHE_ENABLED': enabled})
+    client = app.test_client()
+    response = client.post('/api/login', data=json.dumps({'username': 'student0', 'password': 'benchpass'}),
+                           content_type='application/json')
+    headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+    token = response.json['access_token']
+
+    return {
+        'decode': per_call_us(lambda: decode_token(token), runs),
+        'request': per_call_us(lambda: client.get('/api/students/me', headers=headers), max(runs // 5, 1))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    from App.main import create_app
+    from App.controllers import seed_database
+
+    uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'jwt_cache.db')
+    create_app({'SQLALCHEMY_DATABASE_URI': uri})
+    seed_database(students=1, staff=0, password='benchpass', reset=True, seed=42)
+
+    without = measure(uri, False, args.runs)
+    with_cache = measure(uri, True, args.runs)
+    print(f"{'us per call':<12} {'no cache':>10} {'cache':>10} {'saved':>10}")
+    for name in ('decode', 'request'):
+        print(f'{name:<12} {without[name]:>10.1f} {with_cache[name]:>10.1f} {without[name] - with_cache[name]:>10.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+HTTP load benchmark against the real endpoints.
+
+Seeds a dataset (see benchmarks/dataset.py), starts the production server
+(gunicorn -c gunicorn_config.py serve:app) and drives each scenario with a
+closed-loop load generator: --concurrency threads, each with its own keep-alive
+connection, sending requests back to back for --duration seconds.
+Throughput and p50/p95/p99 latency per scenario are written to JSON so runs
+can be compared across commits with benchmarks/compare.py.
+
+    python -m benchmarks.load --students 1000
+    python -m benchmarks.load --students 100000 --duration 20 --concurrency 16
+    python -m benchmarks.load --url http://127.0.0.1:8080 --no-seed --scenarios leaderboard,students
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+
+from benchmarks.dataset import BENCH_PASSWORD, seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+class Scenario:
+
+    def __init__(self, name, method, path, body=None, role=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.role = role
+
+    def request(self, rng, ctx):
+        path = self.path(rng, ctx) if callable(self.path) else self.path
+        body = self.body(rng, ctx) if callable(self.body) else self.body
+        headers = {'Content-Type': 'application/json'}
+        if self.role:
+            headers['Authorization'] = f"Bearer {ctx['tokens'][self.role]}"
+        return self.method, path, json.dumps(body) if body is not None else None, headers
+
+
+def random_student(rng, ctx):
+    return ctx['first_student_id'] + rng.randrange(ctx['students'])
+
+
+SCENARIOS = [
+    Scenario('login', 'POST', '/api/login',
+             body=lambda rng, ctx: {'username': f"student{rng.randrange(ctx['students'])}",
+                                    'password': BENCH_PASSWORD}),
+    Scenario('leaderboard', 'GET', '/api/leaderboard', role='student'),
+    Scenario('students', 'GET', '/api/students', role='staff'),
+    Scenario('users', 'GET', '/api/users'),
+    Scenario('student', 'GET', lambda rng, ctx: f'/api/students/{random_student(rng, ctx)}', role='staff'),
+    Scenario('log_hours', 'POST', '/api/staff/log-hours', role='staff',
+             body=lambda rng, ctx: {'student_id': random_student(rng, ctx), 'hours': 1}),
+    Scenario('pending', 'GET', '/api/staff/pending-confirmations', role='staff'),
+]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def call(conn, method, path, body, headers):
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def login(base_url, username):
+    url = urllib.parse.urlparse(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+    conn.request('POST', '/api/login', body=json.dumps({'username': username, 'password': BENCH_PASSWORD}),
+                 headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    data = json.loads(response.read())
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f'could not log in as {username}: {data}')
+    return data['access_token']
+
+
+def run_scenario(base_url, scenario, ctx, duration, concurrency, seed_value):
+    url = urllib.parse.urlparse(base_url)
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        rng = random.Random(seed_value * 1000 + n)
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            method, path, body, headers = scenario.request(rng, ctx)
+            started = time.perf_counter()
+            try:
+                status = call(conn, method, path, body, headers)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+                status = None
+            local.append(time.perf_counter() - started)
+            if status is None or status >= 400:
+                failed += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'max_ms': ms(latencies[-1]) if latencies else 0.0,
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(database_uri, workers, worker_class):
+    port = free_port()
+    env = dict(os.environ,
+               GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_WORKERS=str(workers),
+               GUNICORN_WORKER_CLASS=worker_class,
+               GUNICORN_LOGLEVEL='warning',
+               GUNICORN_MAX_REQUESTS='0',
+               FLASK_SQLALCHEMY_DATABASE_URI=database_uri)
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', 'serve:app'],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            call(conn, 'GET', '/health', None, {})
+            conn.close()
+            return proc, base_url
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError('server exited during startup')
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError('server did not start')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--staff', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-uri', default='sqlite:///bench.db')
+    parser.add_argument('--no-seed', action='store_true', help='reuse the data already in the database')
+    parser.add_argument('--url', default=None, help='benchmark an already running server')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--worker-class', default='gevent')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', default=','.join(s.name for s in SCENARIOS))
+    parser.add_argument('--output', default=None, help='JSON file (default benchmarks/results/<commit>-<time>.json)')
+    args = parser.parse_args(argv)
+
+    if not args.no_seed:
+        from App.main import create_app
+        started = time.perf_counter()
+        counts = seed(create_app({'SQLALCHEMY_DATABASE_URI': args.database_uri}),
+                      args.students, args.staff, args.seed)
+        print(f"seeded {counts} in {time.perf_counter() - started:.2f}s")
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        proc, base_url = start_server(args.database_uri, args.workers, args.worker_class)
+    try:
+        ctx = {
+            'students': args.students,
+            'first_student_id': args.staff + 1,
+            'tokens': {'staff': login(base_url, 'staff0'), 'student': login(base_url, 'student0')},
+        }
+        wanted = args.scenarios.split(',')
+        results = {}
+        for scenario in SCENARIOS:
+            if scenario.name not in wanted:
+                continue
+            result = run_scenario(base_url, scenario, ctx, args.duration, args.concurrency, args.seed)
+            results[scenario.name] = result
+            print(f"{scenario.name:<12} {result['throughput_rps']:>9} req/s  p50 {result['p50_ms']:>9} ms  "
+                  f"p95 {result['p95_ms']:>9} ms  p99 {result['p99_ms']:>9} ms  errors {result['errors']}")
+    finally:
+        if proc is not None:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+
+    commit = git_commit()
+    now = datetime.now(timezone.utc)
+    report = {
+        'commit': commit,
+        'timestamp': now.isoformat(),
+        'dataset': {'students': args.students, 'staff': args.staff, 'seed': args.seed},
+        'config': {'duration_s': args.duration, 'concurrency': args.concurrency, 'workers': args.workers,
+                   'worker_class': args.worker_class, 'database': args.database_uri.split(':', 1)[0],
+                   'url': args.url},
+        'scenarios': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{commit}-{now.strftime('%Y%m%dT%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'results written to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
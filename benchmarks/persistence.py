@@ -0,0 +1,142 @@
+"""
+Restart time and write throughput: journaled tracker vs the SQLite-backed app.
+
+Builds the same number of students in a persistent CommunityServiceTracker
+(persistence.py) and in a SQLite database seeded through `flask seed`, then
+measures
+  - writes: random log-hours operations, each one durable on return
+    (journal record flushed, or one committed transaction per request);
+    --fsync also syncs every journal record to disk
+  - restart: a fresh Python process that loads the state and reads the
+    top 10 of the leaderboard, for the tracker both straight after a
+    snapshot and with --tail journal records to replay
+
+    python -m benchmarks.persistence
+    python -m benchmarks.persistence --students 1000000 --writes 20000 --tail 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TRACKER_RESTART = '''
+import sys, time
+started = time.perf_counter()
+from persistence import open_tracker
+system = open_tracker(sys.argv[1], sample_data=False)
+system.view_leaderboard(10)
+print(time.perf_counter() - started)
+'''
+
+SQLITE_RESTART = '''
+import sys, time
+started = time.perf_counter()
+from App.main import create_app
+from App.database import db
+from App.models import Student
+app = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1]})
+db.session.execute(db.select(Student.id, Student.name, Student.total_hours)
+                   .order_by(Student.total_hours.desc()).limit(10)).all()
+print(time.perf_counter() - started)
+'''
+
+
+def restart(script, target, runs):
+    """Best wall time of `runs` fresh processes, and the in-process load time of that run"""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', script, target], check=True, capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        if best is None or wall < best[0]:
+            best = (wall, float(out.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def writes(label, ops, fn):
+    started = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<32} {ops / elapsed:>10.0f} ops/s {elapsed / ops * 1e6:>10.1f} us/op')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--writes', type=int, default=5000)
+    parser.add_argument('--fsync-writes', type=int, default=500)
+    parser.add_argument('--tail', type=int, default=10000, help='journal records left to replay on restart')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from werkzeug.security import generate_password_hash
+    from persistence import open_tracker
+    from benchmarks.dataset import BENCH_PASSWORD, seed
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='tracker-bench-')
+    try:
+        data = os.path.join(workdir, 'tracker')
+        system = open_tracker(data, sample_data=False, snapshot_every=0)
+        staff = system.add_staff('Staff', 'staff', BENCH_PASSWORD)
+        # one hash shared by every student, as `flask seed` does
+        password_hash = generate_password_hash(BENCH_PASSWORD)
+        started = time.perf_counter()
+        for n in range(args.students):
+            system.add_student(f'Student {n}', f'student{n}', password_hash, hashed=True)
+        print(f'tracker: journaled {args.students} students in {time.perf_counter() - started:.2f}s')
+        ids = [s.id for s in system.students]
+
+        def log_hours():
+            staff.log_hours(system.get_student(rng.choice(ids)), rng.randint(1, 5))
+
+        writes('tracker log_hours', args.writes, log_hours)
+        system.journal.fsync = True
+        writes('tracker log_hours (fsync)', args.fsync_writes, log_hours)
+        system.journal.fsync = False
+        started = time.perf_counter()
+        system.journal.snapshot()
+        print(f'tracker: snapshot written in {time.perf_counter() - started:.2f}s, '
+              f'{os.path.getsize(os.path.join(data, "snapshot.bin")) / 1024 / 1024:.1f} MB')
+        system.close()
+
+        wall, load = restart(TRACKER_RESTART, data, args.runs)
+        print(f'{"tracker restart (snapshot)":<32} {wall * 1000:>10.0f} ms wall {load * 1000:>10.0f} ms load')
+        system = open_tracker(data, sample_data=False, snapshot_every=0)
+        staff = system.get_user_by_username('staff')
+        for _ in range(args.tail):
+            log_hours()
+        system.close()
+        wall, load = restart(TRACKER_RESTART, data, args.runs)
+        print(f'{f"tracker restart (+{args.tail} tail)":<32} {wall * 1000:>10.0f} ms wall {load * 1000:>10.0f} ms load')
+
+        from App.main import create_app
+        from App.controllers import add_hours_to_student
+
+        uri = f'sqlite:///{os.path.join(workdir, "bench.db")}'
+        app = create_app({'SQLALCHEMY_DATABASE_URI': uri})
+        started = time.perf_counter()
+        seed(app, args.students, 1, args.seed)
+        print(f'sqlite: seeded {args.students} students in {time.perf_counter() - started:.2f}s')
+        from App.database import db
+        from App.models import Student
+        with app.app_context():
+            ids = db.session.scalars(db.select(Student.id)).all()
+            writes('sqlite add_hours_to_student', args.writes,
+                   lambda: add_hours_to_student(rng.choice(ids), rng.randint(1, 5)))
+            db.session.remove()
+        wall, load = restart(SQLITE_RESTART, uri, args.runs)
+        print(f'{"sqlite app restart":<32} {wall * 1000:>10.0f} ms wall {load * 1000:>10.0f} ms load')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
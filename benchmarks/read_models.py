@@ -0,0 +1,75 @@
+"""
+Time and memory of full ORM entities vs column-only read models for list endpoints.
+
+Seeds an in-memory SQLite database, then for each list path loads the rows
+(a) as polymorphic ORM entities and (b) as UserSummary/StudentSummary rows,
+and serializes them with the app's JSON provider. Peak memory is measured
+with tracemalloc in a separate run.
+
+    python -m benchmarks.read_models
+    python -m benchmarks.read_models --students 100000 --staff 1000
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+
+def measure(fn):
+    """Time one run, then trace a second one for peak memory (tracemalloc slows code down)"""
+    from App.database import db
+
+    db.session.remove()
+    gc.collect()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return elapsed * 1000, peak / 1024 / 1024, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--staff', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    from flask import json
+    from App.main import create_app
+    from App.database import db
+    from App.models import User, Student, Staff
+    from App.controllers import seed_database, get_all_users, get_all_students, get_all_staff
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    seed_database(students=args.students, staff=args.staff, reset=True, seed=42)
+    print(f'{args.students} students, {args.staff} staff')
+
+    def entities(model):
+        return lambda: len(json.dumps([u.get_json() for u in db.session.scalars(db.select(model)).all()]))
+
+    def summaries(controller):
+        return lambda: len(json.dumps(controller()))
+
+    cases = [
+        ('users', entities(User), summaries(get_all_users)),
+        ('students', entities(Student), summaries(get_all_students)),
+        ('staff', entities(Staff), summaries(get_all_staff)),
+    ]
+    print(f"{'path':<10} {'ORM ms':>9} {'ORM MB':>8} {'rows ms':>9} {'rows MB':>8} {'speedup':>8}")
+    for name, orm, rows in cases:
+        orm_ms, orm_mb, orm_size = measure(orm)
+        rows_ms, rows_mb, rows_size = measure(rows)
+        assert orm_size == rows_size, f'{name}: payloads differ'
+        print(f"{name:<10} {orm_ms:>9.0f} {orm_mb:>8.1f} {rows_ms:>9.0f} {rows_mb:>8.1f} {orm_ms / rows_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Memory held by forked workers for the leaderboard, staff list and stats, and
+the time to produce the leaderboard body (Linux only).
+
+Seeds a SQLite file database and publishes the snapshot once, then for each
+worker count forks that many children the way gunicorn forks workers:
+
+    per worker  each child queries and encodes its own copy of the data
+    snapshot    each child maps the shared snapshot and reads every byte
+
+Each child reports the growth of its private memory (Private_Clean +
+Private_Dirty in /proc/self/smaps_rollup). Mapped snapshot pages are shared
+through the page cache, so only the per-worker copies grow with the count.
+
+    python -m benchmarks.snapshot
+    python -m benchmarks.snapshot --students 200000 --workers 1,4,8
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+
+def private_kb():
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                usage[parts[0].rstrip(':')] = int(parts[1])
+    return usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0)
+
+
+def child(app, mode, path, write):
+    from App.database import reset_engines
+    from App.snapshot import SnapshotReader, build_sections
+
+    reset_engines(app, close=False)
+    before = private_kb()
+    if mode == 'per worker':
+        with app.app_context():
+            held = build_sections(app)
+    else:
+        held = SnapshotReader(path, max_age=0).current()
+        # fault every page in, as serving the sections would
+        for body in held.sections.values():
+            hashlib.blake2b(body).digest()
+    os.write(write, f'{private_kb() - before}\n'.encode())
+    os._exit(0)
+
+
+def fork_workers(app, mode, path, count):
+    read, write = os.pipe()
+    pids = []
+    for _ in range(count):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            child(app, mode, path, write)
+        pids.append(pid)
+    os.close(write)
+    with os.fdopen(read) as results:
+        growth = [int(line) for line in results]
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return sum(growth)
+
+
+def time_per_call(fn, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) / runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--staff', type=int, default=50)
+    parser.add_argument('--workers', default='1,2,4,8', help='comma separated worker counts')
+    parser.add_argument('--runs', type=int, default=20, help='leaderboard bodies to time per mode')
+    args = parser.parse_args(argv)
+
+    from App.main import create_app
+    from App.database import db
+    from App.controllers import seed_database, get_leaderboard_students
+    from App.snapshot import SnapshotReader
+
+    directory = tempfile.mkdtemp()
+    uri = 'sqlite:///' + os.path.join(directory, 'snapshot.db')
+    path = os.path.join(directory, 'snapshot.bin')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'SNAPSHOT_ENABLED': True, 'SNAPSHOT_PATH': path,
+                      'SNAPSHOT_PUBLISH': False})
+    seed_database(students=args.students, staff=args.staff, reset=True, seed=42)
+    app.extensions['snapshot_publisher'].publish()
+    db.session.remove()
+    size = os.path.getsize(path)
+
+    reader = SnapshotReader(path, max_age=0)
+    query = time_per_call(lambda: app.json.dumps_bytes(get_leaderboard_students()), args.runs)
+    mapped = time_per_call(lambda: bytes(reader.current().section('leaderboard')), args.runs)
+    db.session.remove()
+
+    print(f'{args.students} students, snapshot {size / 1024 / 1024:.1f} MB')
+    print(f'leaderboard body: query + encode {query * 1000:.1f} ms, from snapshot {mapped * 1000:.2f} ms')
+    print(f"{'workers':>8} {'per worker MB':>14} {'snapshot MB':>12}")
+    for count in [int(n) for n in args.workers.split(',')]:
+        copies = fork_workers(app, 'per worker', path, count)
+        shared = fork_workers(app, 'snapshot', path, count)
+        print(f'{count:>8} {copies / 1024:>14.1f} {shared / 1024:>12.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Startup and import-time benchmark for the WSGI entry points.
+
+Each entry point is imported in a fresh interpreter under ``python -X importtime``
+so the numbers include everything a gunicorn worker pays before serving.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --max-ms 800 --json startup.json
+
+With ``--max-ms`` the script exits non-zero when the median import time of the
+production entry point (serve.py) exceeds the budget, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ['serve', 'wsgi']
+
+# modules that must never be imported by the production worker
+FORBIDDEN = ['pytest', 'flask_admin', 'flask_uploads', 'wtforms', 'flask_migrate', 'alembic']
+
+PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - t\n"
+    "print('LOADED', ','.join(m for m in {forbidden!r} if m in sys.modules))\n"
+    "print('ELAPSED', elapsed)\n"
+)
+
+
+def run_once(module):
+    env = dict(os.environ)
+    # an in-memory database keeps the benchmark from touching real data
+    env.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module, forbidden=FORBIDDEN)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    imports = parse_importtime(proc.stderr)
+    loaded, elapsed = [], 0.0
+    for line in proc.stdout.splitlines():
+        if line.startswith('LOADED'):
+            loaded = [m for m in line.split(' ', 1)[1].split(',') if m] if ' ' in line else []
+        elif line.startswith('ELAPSED'):
+            elapsed = float(line.split()[1])
+    return elapsed, imports, loaded
+
+
+def parse_importtime(stderr):
+    """Return {top-level package: self microseconds} from -X importtime output"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    return totals
+
+
+def bench(module, runs):
+    timings, imports, loaded = [], {}, []
+    for _ in range(runs):
+        elapsed, imports, loaded = run_once(module)
+        timings.append(elapsed * 1000)
+    top = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        'module': module,
+        'runs': runs,
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'forbidden_loaded': loaded,
+        'top_imports_ms': {name: round(us / 1000, 2) for name, us in top},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if serve.py median import exceeds this')
+    parser.add_argument('--json', dest='json_path', default=None, help='write results to this file')
+    args = parser.parse_args(argv)
+
+    results = [bench(module, args.runs) for module in ENTRY_POINTS]
+    for result in results:
+        print(f"{result['module']}: median {result['median_ms']} ms "
+              f"(min {result['min_ms']}, max {result['max_ms']}) over {result['runs']} runs")
+        for name, ms in result['top_imports_ms'].items():
+            print(f"    {name:<30} {ms:>8} ms")
+        if result['forbidden_loaded']:
+            print(f"    loaded: {', '.join(result['forbidden_loaded'])}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    serve = results[0]
+    failed = False
+    if serve['forbidden_loaded']:
+        print(f"FAIL: serve.py imported {', '.join(serve['forbidden_loaded'])}")
+        failed = True
+    if args.max_ms is not None and serve['median_ms'] > args.max_ms:
+        print(f"FAIL: serve.py import took {serve['median_ms']} ms, budget is {args.max_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Lookups, logins and leaderboard reads on the standalone CommunityServiceTracker.
+
+Builds a tracker with N students, then times id and username lookups,
+authenticate_user, random log_hours updates and top-10 / full leaderboard
+reads against a naive sorted() over every student.
+
+    python -m benchmarks.tracker
+    python -m benchmarks.tracker --students 100000 --ops 50000
+"""
+import argparse
+import random
+import sys
+import time
+
+
+def timed(label, ops, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<28} {elapsed * 1000:>10.1f} ms {elapsed / ops * 1e6:>10.2f} us/op')
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000000)
+    parser.add_argument('--ops', type=int, default=100000)
+    parser.add_argument('--reads', type=int, default=100, help='leaderboard reads per case')
+    parser.add_argument('--logins', type=int, default=20, help='authenticate_user calls, each one checks a password hash')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from werkzeug.security import generate_password_hash
+    from system import CommunityServiceTracker
+
+    rng = random.Random(args.seed)
+    system = CommunityServiceTracker(sample_data=False)
+    staff = system.add_staff('Staff', 'staff', 'staffpass')
+    # one hash shared by every student, as `flask seed` does
+    password_hash = generate_password_hash('pass')
+
+    def build():
+        for n in range(args.students):
+            system.add_student(f'Student {n}', f'student{n}', password_hash, hashed=True)
+
+    timed(f'build {args.students} students', args.students, build)
+    ids = [s.id for s in system.students]
+    picks = [rng.choice(ids) for _ in range(args.ops)]
+    names = [f'student{rng.randrange(args.students)}' for _ in range(args.ops)]
+
+    timed('get_student', args.ops, lambda: [system.get_student(i) for i in picks])
+    timed('get_user_by_username', args.ops, lambda: [system.get_user_by_username(u) for u in names])
+    timed('authenticate_user', args.logins, lambda: [system.authenticate_user(u, 'pass') for u in names[:args.logins]])
+    timed('log_hours', args.ops,
+          lambda: [staff.log_hours(system.get_student(i), rng.randint(1, 5)) for i in picks])
+
+    def naive(limit=None):
+        board = sorted(system.students, key=lambda s: s.total_hours, reverse=True)
+        return board if limit is None else board[:limit]
+
+    reads = args.reads
+    top = timed('top 10 (indexed)', reads, lambda: [system.view_leaderboard(10) for _ in range(reads)])
+    top_naive = timed('top 10 (sorted)', reads, lambda: [naive(10) for _ in range(reads)])
+    full = timed('full board (indexed)', reads, lambda: [system.view_leaderboard() for _ in range(reads)])
+    full_naive = timed('full board (sorted)', reads, lambda: [naive() for _ in range(reads)])
+    print(f'top 10 speedup {top_naive / top:.0f}x, full board speedup {full_naive / full:.1f}x')
+
+    assert [s.total_hours for s in system.view_leaderboard()] == [s.total_hours for s in naive()]
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Measure memory per gunicorn worker with and without preload_app (Linux only).
+
+Starts gunicorn with gunicorn_config.py, sends a few requests so every worker
+has served traffic, then reads /proc/<pid>/smaps_rollup for each worker:
+
+    RSS      resident pages, counting pages shared with the master
+    PSS      RSS with shared pages split between the processes sharing them
+    Private  pages only this worker holds (what each extra worker really costs)
+
+    python benchmarks/worker_rss.py --workers 4
+    python benchmarks/worker_rss.py --workers 4 --requests 500 --json rss.json
+    python benchmarks/worker_rss.py --worker-class sync
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def children(pid):
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # the command name may contain spaces, the ppid follows its closing paren
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            pids.append(int(entry))
+    return pids
+
+
+def memory_kb(pid):
+    usage = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                usage[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': usage.get('Rss', 0),
+        'pss': usage.get('Pss', 0),
+        'private': usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0),
+    }
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not answer on {url}')
+
+
+def measure(preload, workers, requests, database_uri, worker_class):
+    port = free_port()
+    env = dict(os.environ,
+               GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_WORKERS=str(workers),
+               GUNICORN_WORKER_CLASS=worker_class,
+               GUNICORN_PRELOAD='true' if preload else 'false',
+               GUNICORN_LOGLEVEL='warning',
+               FLASK_SQLALCHEMY_DATABASE_URI=database_uri)
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', 'serve:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(f'http://127.0.0.1:{port}/health')
+        for _ in range(requests):
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+        time.sleep(1)
+        worker_pids = children(proc.pid)
+        per_worker = [memory_kb(pid) for pid in worker_pids]
+        master = memory_kb(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+    def avg(key):
+        return round(sum(w[key] for w in per_worker) / max(len(per_worker), 1) / 1024, 1)
+
+    return {
+        'preload': preload,
+        'workers': len(per_worker),
+        'master_rss_mb': round(master['rss'] / 1024, 1),
+        'worker_rss_mb': avg('rss'),
+        'worker_pss_mb': avg('pss'),
+        'worker_private_mb': avg('private'),
+        'total_pss_mb': round((master['pss'] + sum(w['pss'] for w in per_worker)) / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--database-uri', default='sqlite:///rss-bench.db')
+    parser.add_argument('--worker-class', default='gevent')
+    parser.add_argument('--json', dest='json_path', default=None)
+    args = parser.parse_args(argv)
+
+    results = [measure(preload, args.workers, args.requests, args.database_uri, args.worker_class) for preload in (False, True)]
+    print(f"{'preload':<8} {'workers':>7} {'master RSS':>11} {'worker RSS':>11} {'worker PSS':>11} "
+          f"{'private':>8} {'total PSS':>10}")
+    for r in results:
+        print(f"{str(r['preload']):<8} {r['workers']:>7} {r['master_rss_mb']:>9} MB {r['worker_rss_mb']:>8} MB "
+              f"{r['worker_pss_mb']:>8} MB {r['worker_private_mb']:>5} MB {r['total_pss_mb']:>7} MB")
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,19 +1,75 @@
 # gunicorn_config.py
+#
+# Production profile, used as:  gunicorn -c gunicorn_config.py serve:app
+#
+# The app is preloaded in the master so imported code, compiled templates and
+# the ORM's compiled SQL are shared with the workers copy-on-write. Every
+# setting can be overridden from the environment (see README "Gunicorn Profile").
 import multiprocessing
+import os
 
 # The socket to bind.
-# "0.0.0.0" to bind to all interfaces. 8000 is the port number.
-bind = "0.0.0.0:8080"
+# "0.0.0.0" to bind to all interfaces. 8080 is the default port number.
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8080')}")
+
+# Use the 'gevent' worker type for async performance.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
 
 # The number of worker processes for handling requests.
-workers = 4
+# WEB_CONCURRENCY (set by render/heroku) or GUNICORN_WORKERS wins, otherwise
+# 2 x CPUs + 1, capped so small boxes with many reported CPUs don't run out of memory.
+def _worker_count():
+    configured = os.environ.get('GUNICORN_WORKERS') or os.environ.get('WEB_CONCURRENCY')
+    if configured:
+        return max(1, int(configured))
+    max_workers = int(os.environ.get('GUNICORN_MAX_WORKERS', '8'))
+    return max(1, min(multiprocessing.cpu_count() * 2 + 1, max_workers))
 
-# Use the 'gevent' worker type for async performance.
-worker_class = 'gevent'
+workers = _worker_count()
+
+# Concurrent greenlets per gevent worker.
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# Load the app once in the master and fork, instead of importing it per worker.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() != 'false'
+
+# Recycle workers to cap memory growth; jitter stops them restarting together.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
 
 # Log level
-loglevel = 'info'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
 
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
-errorlog = '-'  # '-' means log to stderr
\ No newline at end of file
+errorlog = '-'  # '-' means log to stderr
+
+if worker_class == 'gevent' and preload_app:
+    # The app is imported in the master before any worker patches the stdlib,
+    # so patch here or sockets/ssl created during import stay blocking.
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def when_ready(server):
+    """Warm caches in the master, then close its connections before forking."""
+    if not preload_app:
+        return
+    from App.main import warm_app
+    from App.database import reset_engines
+    app = server.app.wsgi()
+    warm_app(app)
+    reset_engines(app)
+    server.log.info('App warmed up, forking %s workers', workers)
+
+
+def post_fork(server, worker):
+    """Give each worker fresh DB connection pools instead of the master's."""
+    if not preload_app:
+        return
+    from App.database import reset_engines
+    reset_engines(server.app.wsgi(), close=False)
@@ -1,4 +1,6 @@
-from system import CommunityServiceTracker
+import os
+
+from persistence import open_tracker
 
 def student_menu(system, student):
     while True:
@@ -50,7 +52,7 @@ def staff_menu(system, staff):
                 print("Please enter valid numbers.")
 
         elif choice == "2":
-            pending_students = [s for s in system.students if s.confirmation_requested]
+            pending_students = system.get_pending_students()
             if not pending_students:
                 print("No pending confirmations.")
             else:
@@ -72,7 +74,7 @@ def staff_menu(system, staff):
 
 
 def main():
-    system = CommunityServiceTracker()
+    system = open_tracker(os.environ.get("TRACKER_DATA", "tracker_data"))
     print("=== Community Service Tracker ===")
 
     while True:
@@ -80,6 +82,7 @@ def main():
         username = input("Username (or 'exit' to quit): ")
         if username.lower() == "exit":
             print("Goodbye!")
+            system.close()
             break
         password = input("Password: ")
 
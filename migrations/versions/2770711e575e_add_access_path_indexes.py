@@ -0,0 +1,37 @@
+"""add access path indexes
+
+Revision ID: 2770711e575e
+Revises: 25768bf7b619
+Create Date: 2026-10-19 04:13:57.434195
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2770711e575e'
+down_revision = '25768bf7b619'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY keeps Postgres taking writes while the indexes build, it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_accolade_student_id_milestone', 'accolade', ['student_id', 'milestone'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_student_confirmation_requested_id', 'student', ['confirmation_requested', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_student_total_hours'), 'student', ['total_hours'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index(op.f('ix_user_user_type'), 'user', ['user_type'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_user_user_type'), table_name='user', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_student_total_hours'), table_name='student', postgresql_concurrently=True)
+        op.drop_index('ix_student_confirmation_requested_id', table_name='student', postgresql_concurrently=True)
+        op.drop_index('ix_accolade_student_id_milestone', table_name='accolade', postgresql_concurrently=True)
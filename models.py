@@ -1,26 +1,41 @@
 from typing import List
 
+from werkzeug.security import check_password_hash, generate_password_hash
+
 class User:
-    def __init__(self, user_id: int, name: str, username: str, password: str):
+    __slots__ = ('id', 'name', 'username', 'password')
+
+    def __init__(self, user_id: int, name: str, username: str, password: str, hashed: bool = False):
         self.id = user_id
         self.name = name
         self.username = username
-        self.password = password  
+        # only the hash is kept, so snapshots and journals never hold a plaintext password
+        self.password = password if hashed else generate_password_hash(password)
 
     def login(self, password: str) -> bool:
-        return self.password == password #verify
+        return check_password_hash(self.password, password) #verify
 
 
 class Student(User):
-    def __init__(self, user_id: int, name: str, username: str, password: str):
-        super().__init__(user_id, name, username, password)#inherit from user
+    __slots__ = ('total_hours', 'accolades', 'confirmation_requested', 'listener')
+
+    def __init__(self, user_id: int, name: str, username: str, password: str, hashed: bool = False):
+        super().__init__(user_id, name, username, password, hashed)#inherit from user
         self.total_hours = 0
         self.accolades: List[int] = [] #for accolades
         self.confirmation_requested = False
+        self.listener = None #tracker told about changes, keeps its indexes current
 
     def add_hours(self, hours: int):
-        if hours <= 0:
-            raise ValueError("Hours must be positive.")
+        # bool is an int too, and fractional hours can't be journaled
+        if type(hours) is not int or hours <= 0:
+            raise ValueError("Hours must be a positive whole number.")
+        if self.listener is not None:
+            self.listener.add_hours(self, hours) #journals the change, then applies it
+        else:
+            self._apply_hours(hours)
+
+    def _apply_hours(self, hours: int):
         self.total_hours += hours
         self._check_accolades()
 
@@ -32,17 +47,26 @@ class Student(User):
 
     def request_confirmation(self):
         self.confirmation_requested = True
+        if self.listener is not None:
+            self.listener.confirmation_changed(self)
+
+    def clear_confirmation(self):
+        self.confirmation_requested = False
+        if self.listener is not None:
+            self.listener.confirmation_changed(self)
 
     def view_accolades(self) -> List[int]:
         return self.accolades
 
 
 class Staff(User):
+    __slots__ = ()
+
     def log_hours(self, student: Student, hours: int):
         student.add_hours(hours)
 
     def confirm_hours(self, student: Student):
         if student.confirmation_requested:
-            student.confirmation_requested = False
+            student.clear_confirmation()
             return True
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,333 @@
+# persistence.py
+
+"""Snapshot + append-only journal storage for CommunityServiceTracker.
+
+A data directory holds two files:
+
+    snapshot.bin  full state at some point, written to a temp file and renamed
+    journal.bin   every mutation since that snapshot, one binary record each
+
+Both carry a generation number. Taking a snapshot bumps the generation and
+starts an empty journal, so a crash between the two steps leaves an older
+journal that is ignored instead of being replayed twice. A record cut short
+by a crash is dropped on the next start.
+
+Records are flushed to the OS as they are written, which survives a crashed
+process. Pass fsync=True to also survive power loss, at the cost of a disk
+sync per mutation.
+"""
+
+import gc
+import mmap
+import os
+import struct
+from array import array
+
+from models import Student, Staff
+from system import CommunityServiceTracker
+
+SNAPSHOT_FILE = 'snapshot.bin'
+JOURNAL_FILE = 'journal.bin'
+
+# Snapshots are columnar: after the header come the student ids, hours and
+# confirmation flags as packed arrays, their names, usernames and password hashes as
+# one NUL separated UTF-8 blob, the same for staff (without hours and flags),
+# then the pending student ids. Loading casts the arrays straight out of the
+# mapped file and decodes each blob once.
+SNAPSHOT_HEADER = struct.Struct('<4sIIIIII')  # magic, version, generation, next id, #students, #staff, #pending
+SNAPSHOT_MAGIC = b'CSTS'
+SNAPSHOT_VERSION = 3
+
+JOURNAL_HEADER = struct.Struct('<4sI')  # magic, generation
+JOURNAL_RECORD = struct.Struct('<BI')  # op, user id
+JOURNAL_USER = struct.Struct('<HHH')  # string lengths for OP_ADD_*
+JOURNAL_HOURS = struct.Struct('<i')  # also the range of a snapshot's total hours
+JOURNAL_MAGIC = b'CSTJ'
+
+OP_ADD_STUDENT = 1
+OP_ADD_STAFF = 2
+OP_ADD_HOURS = 3
+OP_REQUEST_CONFIRMATION = 4
+OP_CLEAR_CONFIRMATION = 5
+
+
+def _encode_user(user):
+    return user.name.encode(), user.username.encode(), user.password.encode()
+
+
+def _read_strings(view, offset, lengths):
+    strings = []
+    for length in lengths:
+        strings.append(str(view[offset:offset + length], 'utf-8'))
+        offset += length
+    return strings, offset
+
+
+def _pack_strings(users):
+    strings = [u.name for u in users] + [u.username for u in users] + [u.password for u in users]
+    if any('\0' in string for string in strings):
+        raise ValueError("Names, usernames and password hashes cannot contain NUL characters.")
+    blob = '\0'.join(strings).encode()
+    return struct.pack('<I', len(blob)) + blob
+
+
+def _unpack_strings(view, offset, count):
+    length, = struct.unpack_from('<I', view, offset)
+    offset += 4
+    strings = str(view[offset:offset + length], 'utf-8').split('\0') if count else []
+    return strings[:count], strings[count:2 * count], strings[2 * count:], offset + length
+
+
+def _unpack_array(view, offset, fmt, count):
+    size = struct.calcsize(fmt) * count
+    return view[offset:offset + size].cast(fmt), offset + size
+
+
+def write_snapshot(path, tracker, generation):
+    """Atomically replace the snapshot at `path` with the tracker's state."""
+    students = tracker.students
+    staff = tracker.staff_members
+    pending = [s.id for s in tracker.get_pending_students()]
+    parts = [
+        SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, generation, tracker._next_user_id,
+                             len(students), len(staff), len(pending)),
+        array('I', [s.id for s in students]).tobytes(),
+        array('i', [s.total_hours for s in students]).tobytes(),
+        bytes(s.confirmation_requested for s in students),
+        _pack_strings(students),
+        array('I', [s.id for s in staff]).tobytes(),
+        _pack_strings(staff),
+        array('I', pending).tobytes(),
+    ]
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(b''.join(parts))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path))
+
+
+def read_snapshot(path, tracker):
+    """Load the snapshot at `path` into an empty tracker, returning its generation (0 if there is none)."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return 0
+    with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        arrays = []
+        try:
+            magic, version, generation, next_user_id, n_students, n_staff, n_pending = \
+                SNAPSHOT_HEADER.unpack_from(view)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} tracker snapshot")
+            offset = SNAPSHOT_HEADER.size
+            ids, offset = _unpack_array(view, offset, 'I', n_students)
+            hours, offset = _unpack_array(view, offset, 'i', n_students)
+            requested, offset = _unpack_array(view, offset, 'B', n_students)
+            arrays += [ids, hours, requested]
+            names, usernames, passwords, offset = _unpack_strings(view, offset, n_students)
+            students = []
+            for student_id, total_hours, flag, name, username, password in \
+                    zip(ids, hours, requested, names, usernames, passwords):
+                student = Student(student_id, name, username, password, hashed=True)
+                if total_hours:
+                    student.total_hours = total_hours
+                    student._check_accolades()
+                student.confirmation_requested = flag == 1
+                students.append(student)
+
+            staff_ids, offset = _unpack_array(view, offset, 'I', n_staff)
+            arrays.append(staff_ids)
+            names, usernames, passwords, offset = _unpack_strings(view, offset, n_staff)
+            staff = [Staff(*user, hashed=True) for user in zip(staff_ids, names, usernames, passwords)]
+            pending_ids, offset = _unpack_array(view, offset, 'I', n_pending)
+            arrays.append(pending_ids)
+            pending = list(pending_ids)
+        finally:
+            # the mapping cannot close while views of it are alive
+            for a in arrays:
+                a.release()
+            view.release()
+    tracker._restore(next_user_id, students, staff, pending)
+    return generation
+
+
+def replay_journal(path, tracker, generation):
+    """Apply the journal at `path` to the tracker if it belongs to `generation`.
+
+    Returns the offset just past the last complete record, or None when there
+    is no journal for this generation.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < JOURNAL_HEADER.size:
+        return None
+    magic, journal_generation = JOURNAL_HEADER.unpack_from(data)
+    if magic != JOURNAL_MAGIC:
+        raise ValueError(f"{path} is not a tracker journal")
+    if journal_generation != generation:
+        return None
+
+    view = memoryview(data)
+    offset = end = JOURNAL_HEADER.size
+    try:
+        while offset < len(data):
+            op, user_id = JOURNAL_RECORD.unpack_from(view, offset)
+            offset += JOURNAL_RECORD.size
+            if op in (OP_ADD_STUDENT, OP_ADD_STAFF):
+                lengths = JOURNAL_USER.unpack_from(view, offset)
+                offset += JOURNAL_USER.size
+                if offset + sum(lengths) > len(data):
+                    break
+                (name, username, password), offset = _read_strings(view, offset, lengths)
+                add = tracker.add_student if op == OP_ADD_STUDENT else tracker.add_staff
+                user = add(name, username, password, hashed=True)
+                if user.id != user_id:
+                    raise ValueError(f"{path}: journal assigns id {user_id} but tracker assigned {user.id}")
+            elif op == OP_ADD_HOURS:
+                hours, = JOURNAL_HOURS.unpack_from(view, offset)
+                offset += JOURNAL_HOURS.size
+                tracker.get_student(user_id).add_hours(hours)
+            elif op == OP_REQUEST_CONFIRMATION:
+                tracker.get_student(user_id).request_confirmation()
+            elif op == OP_CLEAR_CONFIRMATION:
+                tracker.get_student(user_id).clear_confirmation()
+            else:
+                raise ValueError(f"{path}: unknown journal op {op} at offset {end}")
+            end = offset
+    except struct.error:
+        pass  # record cut short by a crash
+    finally:
+        view.release()
+    return end
+
+
+def _fsync_dir(directory):
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class TrackerStore:
+    """Journal attached to a tracker; writes a snapshot every `snapshot_every` records."""
+
+    def __init__(self, directory, tracker, generation, journal_end=None, snapshot_every=100000, fsync=False):
+        self.directory = directory
+        self.tracker = tracker
+        self.generation = generation
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.records = 0
+        self._file = None
+        self._open_journal(journal_end)
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.directory, JOURNAL_FILE)
+
+    def _open_journal(self, end=None):
+        if end is None:
+            # a fresh journal for this generation replaces whatever was there
+            tmp = self.journal_path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.generation))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_path)
+            _fsync_dir(self.directory)
+        self._file = open(self.journal_path, 'r+b')
+        if end is not None:
+            self._file.truncate(end)  # drop a torn tail record
+        self._file.seek(0, os.SEEK_END)
+
+    def append(self, record):
+        self._file.write(record)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.records += 1
+        if self.snapshot_every and self.records >= self.snapshot_every:
+            self.snapshot()
+
+    def _user_added(self, op, user):
+        strings = _encode_user(user)
+        self.append(JOURNAL_RECORD.pack(op, user.id) + JOURNAL_USER.pack(*map(len, strings)) + b''.join(strings))
+
+    def student_added(self, student):
+        self._user_added(OP_ADD_STUDENT, student)
+
+    def staff_added(self, staff):
+        self._user_added(OP_ADD_STAFF, staff)
+
+    def hours_record(self, student, hours):
+        """Encode adding `hours` to a student, raising ValueError if the hours or the new total don't fit."""
+        try:
+            JOURNAL_HOURS.pack(student.total_hours + hours)
+            return JOURNAL_RECORD.pack(OP_ADD_HOURS, student.id) + JOURNAL_HOURS.pack(hours)
+        except struct.error:
+            raise ValueError(f"Total hours cannot exceed {2 ** 31 - 1}.") from None
+
+    def confirmation_changed(self, student):
+        op = OP_REQUEST_CONFIRMATION if student.confirmation_requested else OP_CLEAR_CONFIRMATION
+        self.append(JOURNAL_RECORD.pack(op, student.id))
+
+    def snapshot(self):
+        """Write the full state and start an empty journal.
+
+        If the snapshot fails the current journal is reopened, so later
+        mutations are still recorded.
+        """
+        end = self._file.tell()
+        self._file.close()
+        written = False
+        try:
+            write_snapshot(self.snapshot_path, self.tracker, self.generation + 1)
+            written = True
+        finally:
+            if written:
+                self.generation += 1
+                self._open_journal()
+                self.records = 0
+            else:
+                self._open_journal(end)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_tracker(directory, sample_data=True, snapshot_every=100000, fsync=False):
+    """Load a tracker from `directory` (latest snapshot plus journal tail) and keep journaling to it.
+
+    Sample data is only added when the directory holds no state yet.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tracker = CommunityServiceTracker(sample_data=False)
+    # loading creates millions of objects and none of them are garbage, so the
+    # cyclic collector would only rescan them over and over
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        generation = read_snapshot(os.path.join(directory, SNAPSHOT_FILE), tracker)
+        journal_end = replay_journal(os.path.join(directory, JOURNAL_FILE), tracker, generation)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    empty = generation == 0 and not tracker.students and not tracker.staff_members
+    tracker.journal = TrackerStore(directory, tracker, generation, journal_end, snapshot_every, fsync)
+    if empty and sample_data:
+        tracker._populate_sample_data()
+    return tracker
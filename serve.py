@@ -0,0 +1,11 @@
+"""
+Production WSGI entry point.
+
+Builds only what serving requests needs: no CLI commands, no pytest/click
+imports, and the admin UI is built lazily on the first /admin request.
+
+    gunicorn serve:app
+"""
+from App.main import create_app
+
+app = create_app({'LAZY_SUBSYSTEMS': True})
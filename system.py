@@ -1,59 +1,185 @@
 # system.py
 
+from bisect import bisect_left, insort
+from itertools import chain, islice
+
 from models import Student, Staff
 
-class CommunityServiceTracker:
-    """Main system class that manages students, staff, and authentication."""
 
-    def __init__(self):
-        self.students = []  # List of Student objects
-        self.staff_members = []  # List of Staff objects
-        self._next_user_id = 1  # Auto-incrementing ID for users
-        self._populate_sample_data()
+class _SortedKeys:
+    """Sorted keys kept in chunks of at most 2 * LOAD items.
 
-    def _populate_sample_data(self):
-        """Optional: Add some initial users for testing."""
-        s1 = Student(self._next_user_id, "Alice", "alice123", "pass1")
-        self._next_user_id += 1
-        s2 = Student(self._next_user_id, "Bob", "bob123", "pass2")
-        self._next_user_id += 1
+    A plain sorted list moves every later item on insert and delete, which is
+    slow at a million students. Here only one chunk moves, and the chunk is
+    found by bisecting the list of chunk maxima.
+    """
+    LOAD = 1000
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._chunks = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+        chunk = self._chunks[i]
+        insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * self.LOAD:
+            self._chunks.insert(i + 1, chunk[self.LOAD:])
+            del chunk[self.LOAD:]
+            self._maxes.insert(i, chunk[-1])
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise KeyError(key)
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, key)
+        if chunk[j] != key:
+            raise KeyError(key)
+        del chunk[j]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def first(self, limit=None):
+        keys = chain.from_iterable(self._chunks)
+        return list(keys if limit is None else islice(keys, limit))
 
-        st1 = Staff(self._next_user_id, "Mr. Smith", "smith", "admin1")
-        self._next_user_id += 1
 
-        self.students.extend([s1, s2])
-        self.staff_members.append(st1)
+class CommunityServiceTracker:
+    """Main system class that manages students, staff, and authentication.
+
+    Users are indexed by id and by username, so lookups and logins are O(1).
+    The leaderboard is a set of (-total_hours, id) keys kept sorted as hours
+    change, so reading it never sorts. Students report changes to the tracker
+    through their `listener`.
+
+    When a `journal` is attached (see persistence.py), every mutation is also
+    written to it.
+    """
+
+    def __init__(self, sample_data=True):
+        self._students_by_id = {}  # id -> Student
+        self._staff_by_id = {}  # id -> Staff
+        self._users_by_username = {}  # username -> Student or Staff
+        self._leaderboard = _SortedKeys()  # (-total_hours, id) keys
+        self._pending = {}  # ids of students awaiting confirmation, in request order
+        self._next_user_id = 1  # Auto-incrementing ID for users
+        self.journal = None
+        if sample_data:
+            self._populate_sample_data()
 
-    def add_student(self, name, username, password):
-        """Add a new student to the system."""
-        student = Student(self._next_user_id, name, username, password)
+    def _populate_sample_data(self):
+        """Optional: Add some initial users for testing."""
+        self.add_student("Alice", "alice123", "pass1")
+        self.add_student("Bob", "bob123", "pass2")
+        self.add_staff("Mr. Smith", "smith", "admin1")
+
+    @property
+    def students(self):
+        """All students, in the order they were added."""
+        return list(self._students_by_id.values())
+
+    @property
+    def staff_members(self):
+        """All staff members, in the order they were added."""
+        return list(self._staff_by_id.values())
+
+    def _register(self, user):
+        if user.username in self._users_by_username:
+            raise ValueError(f"Username '{user.username}' is already taken.")
+        self._users_by_username[user.username] = user
+
+    def add_student(self, name, username, password, hashed=False):
+        """Add a new student to the system. Pass hashed=True when `password` is already a hash."""
+        student = Student(self._next_user_id, name, username, password, hashed)
+        self._register(student)
         self._next_user_id += 1
-        self.students.append(student)
+        self._students_by_id[student.id] = student
+        self._leaderboard.add((-student.total_hours, student.id))
+        student.listener = self
+        if self.journal is not None:
+            self.journal.student_added(student)
         return student
 
-    def add_staff(self, name, username, password):
-        """Add a new staff member to the system."""
-        staff = Staff(self._next_user_id, name, username, password)
+    def add_staff(self, name, username, password, hashed=False):
+        """Add a new staff member to the system. Pass hashed=True when `password` is already a hash."""
+        staff = Staff(self._next_user_id, name, username, password, hashed)
+        self._register(staff)
         self._next_user_id += 1
-        self.staff_members.append(staff)
+        self._staff_by_id[staff.id] = staff
+        if self.journal is not None:
+            self.journal.staff_added(staff)
         return staff
 
+    def _restore(self, next_user_id, students, staff, pending):
+        """Load state read back from a snapshot into an empty tracker."""
+        for student in students:
+            self._students_by_id[student.id] = student
+            self._users_by_username[student.username] = student
+            student.listener = self
+        for member in staff:
+            self._staff_by_id[member.id] = member
+            self._users_by_username[member.username] = member
+        self._pending = dict.fromkeys(pending)
+        self._leaderboard = _SortedKeys((-s.total_hours, s.id) for s in students)
+        self._next_user_id = next_user_id
+
+    def add_hours(self, student, hours):
+        """Add hours to a student and move them to their new leaderboard position."""
+        # encoded first, so hours the journal can't record are never applied
+        record = self.journal.hours_record(student, hours) if self.journal is not None else None
+        old_hours = student.total_hours
+        student._apply_hours(hours)
+        self._leaderboard.remove((-old_hours, student.id))
+        self._leaderboard.add((-student.total_hours, student.id))
+        if record is not None:
+            self.journal.append(record)
+
+    def confirmation_changed(self, student):
+        if student.confirmation_requested:
+            self._pending[student.id] = None
+        else:
+            self._pending.pop(student.id, None)
+        if self.journal is not None:
+            self.journal.confirmation_changed(student)
+
+    def close(self):
+        """Flush and close the attached journal, if any."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
     def get_student(self, student_id):
         """Retrieve a student by ID."""
-        for student in self.students:
-            if student.id == student_id:
-                return student
-        return None
+        return self._students_by_id.get(student_id)
+
+    def get_staff(self, staff_id):
+        """Retrieve a staff member by ID."""
+        return self._staff_by_id.get(staff_id)
 
-    def view_leaderboard(self):
+    def get_pending_students(self):
+        """Students with a pending confirmation request, oldest request first."""
+        return [self._students_by_id[student_id] for student_id in self._pending]
+
+    def view_leaderboard(self, limit=None):
         """Return students sorted by total_hours in descending order."""
-        def get_hours(student):
-            return student.total_hours
-        return sorted(self.students, key=get_hours, reverse=True)
+        students = self._students_by_id
+        return [students[student_id] for _, student_id in self._leaderboard.first(limit)]
 
-    def display_leaderboard(self):
+    def display_leaderboard(self, limit=None):
         """Prints the leaderboard in a nice format."""
-        leaderboard = self.view_leaderboard()
+        leaderboard = self.view_leaderboard(limit)
 
         if not leaderboard:
             print("\n=== Community Service Leaderboard ===")
@@ -67,23 +193,23 @@ class CommunityServiceTracker:
 
     def authenticate_user(self, username, password):
         """Check if a username/password belongs to a student or staff."""
-        # Check students
-        for student in self.students:
-            if student.username == username and student.login(password):
-                return student
-
-        # Check staff
-        for staff in self.staff_members:
-            if staff.username == username and staff.login(password):
-                return staff
-
+        user = self._users_by_username.get(username)
+        if user is not None and user.login(password):
+            return user
         return None  # No match found
 
     def get_user_by_username(self, username):
-        for user in self.students + self.staff:
-            if user.name == username:
-                return user
-        return None
+        return self._users_by_username.get(username)
+
+    def get_student_by_name(self, username):
+        """Retrieve a student by username."""
+        user = self._users_by_username.get(username)
+        return user if isinstance(user, Student) else None
+
+    def get_staff_by_name(self, username):
+        """Retrieve a staff member by username."""
+        user = self._users_by_username.get(username)
+        return user if isinstance(user, Staff) else None
 
-    def get_leaderboard(self):
-        return [{"name": s.name, "hours": s.hours} for s in sorted(self.students, key=lambda x: x.hours, reverse=True)]
+    def get_leaderboard(self, limit=None):
+        return [{"name": s.name, "hours": s.total_hours} for s in self.view_leaderboard(limit)]
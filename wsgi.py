@@ -1,8 +1,8 @@
-import click, pytest, sys
+import click, os, sys, time
 from flask.cli import with_appcontext, AppGroup
 
 from App.database import db, get_migrate
-from App.models import User, Student, Staff
+from App.models import User, Student, Staff, mask_to_milestones
 from App.main import create_app
 from App.controllers import (
     create_user,
@@ -17,7 +17,16 @@ from App.controllers import (
     get_leaderboard,
     log_hours_for_student,
     confirm_student_hours,
-    get_pending_confirmations
+    get_pending_confirmations,
+    seed_database,
+    HOURS_DISTRIBUTIONS,
+    check_accolade_masks,
+    backfill_accolade_masks,
+    recompute_accolades,
+    get_stats,
+    rebuild_stats,
+    write_hours_report,
+    REPORT_FORMATS
 )
 
 # This commands file allows you to create convenient CLI commands for testing controllers
@@ -31,6 +40,27 @@ def init():
     initialize()
     print('Database initialized!')
 
+# This command bulk-inserts synthetic data for benchmarking and staging
+@app.cli.command("seed", help="Bulk-inserts synthetic staff, students and accolades")
+@click.option("--students", default=1000, show_default=True, help="Number of students to create")
+@click.option("--staff", default=10, show_default=True, help="Number of staff to create")
+@click.option("--hours-distribution", type=click.Choice(HOURS_DISTRIBUTIONS), default="exponential", show_default=True)
+@click.option("--mean-hours", default=18, show_default=True, help="Mean hours for the exponential distribution")
+@click.option("--max-hours", default=400, show_default=True)
+@click.option("--pending-ratio", default=0.05, show_default=True, help="Share of students with a confirmation request")
+@click.option("--password", default="password", show_default=True, help="Password shared by every synthetic account")
+@click.option("--batch-size", default=10000, show_default=True, help="Rows per transaction")
+@click.option("--seed", "rng_seed", type=int, default=None, help="Random seed for reproducible data")
+@click.option("--reset", is_flag=True, help="Drop and recreate the schema first")
+def seed_command(students, staff, hours_distribution, mean_hours, max_hours, pending_ratio, password, batch_size, rng_seed, reset):
+    started = time.perf_counter()
+    counts = seed_database(students, staff, hours_distribution, mean_hours, max_hours,
+                           pending_ratio, password, reset, rng_seed, batch_size)
+    elapsed = time.perf_counter() - started
+    rows = counts['staff'] * 2 + counts['students'] * 2 + counts['accolades']
+    print(f"Created {counts['staff']} staff, {counts['students']} students and {counts['accolades']} accolades "
+          f"({rows} rows) in {elapsed:.2f}s ({rows / elapsed * 60 if elapsed else 0:,.0f} rows/min)")
+
 # Student Commands
 student_cli = AppGroup('student', help='Student object commands')
 
@@ -58,6 +88,19 @@ def add_hours_command(student_id, hours):
     else:
         print('Student not found')
 
+@student_cli.command("export", help="Streams every student's hours, accolades and confirmation state to a file")
+@click.option("--output", "-o", type=click.File("wb"), default="-", show_default=True, help="File to write, - for stdout")
+@click.option("--format", "report_format", type=click.Choice(REPORT_FORMATS), default="csv", show_default=True,
+              help="parquet needs pyarrow (requirements-perf.txt)")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows fetched and written at a time")
+def export_students_command(output, report_format, chunk_size):
+    started = time.perf_counter()
+    try:
+        rows = write_hours_report(output, report_format, chunk_size)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Exported {rows} students in {time.perf_counter() - started:.2f}s", err=True)
+
 app.cli.add_command(student_cli)
 
 # Staff Commands
@@ -110,8 +153,144 @@ def leaderboard_command():
         print(f"{i}. {student['name']} - {student['total_hours']} hours (Accolades: {student['accolades']})")
     print()
 
+@system_cli.command("stats", help="Display totals from the maintained counters")
+def stats_command():
+    stats = get_stats()
+    print(f"Students: {stats['students']}")
+    print(f"Total hours: {stats['total_hours']}")
+    print(f"Pending confirmations: {stats['pending_confirmations']}")
+    print("Hours histogram:")
+    for bucket in stats['hours_histogram']:
+        label = f"{bucket['min']}+" if bucket['max'] is None else f"{bucket['min']}-{bucket['max']}"
+        print(f"  {label:>8}: {bucket['students']}")
+    print("Accolades:")
+    for milestone, count in stats['accolades'].items():
+        print(f"  {milestone:>5}h: {count}")
+
+@system_cli.command("rebuild-stats", help="Recomputes the counters behind `system stats` from the student table")
+def rebuild_stats_command():
+    started = time.perf_counter()
+    stats = rebuild_stats()
+    print(f"Rebuilt counters for {stats['students']} students in {time.perf_counter() - started:.2f}s")
+
+@system_cli.command("slow-queries", help="Reports logged slow queries grouped by statement fingerprint")
+@click.option("--log", "path", default=None, help="Slow query log, defaults to SLOW_QUERY_LOG")
+@click.option("--limit", default=20, show_default=True, help="Fingerprints to show")
+@click.option("--plans/--no-plans", default=True, show_default=True, help="Print each statement's EXPLAIN output")
+def slow_queries_command(path, limit, plans):
+    from App.slow_queries import read_slow_queries, summarize_slow_queries
+
+    path = path or app.config['SLOW_QUERY_LOG'] or os.path.join(app.instance_path, 'slow_queries.jsonl')
+    if not os.path.exists(path):
+        print(f"No slow queries logged yet ({path})")
+        return
+    groups = summarize_slow_queries(read_slow_queries(path))
+    print(f"{len(groups)} slow statements in {path}\n")
+    for group in groups[:limit]:
+        scan = '  FULL SCAN' if group['full_scan'] else ''
+        print(f"[{group['fingerprint']}] {group['count']} x, total {group['total_ms']:.0f} ms, "
+              f"mean {group['mean_ms']:.1f} ms, max {group['max_ms']:.1f} ms{scan}")
+        print(f"  {group['sql'][:300]}")
+        callers = sorted(group['callers'].items(), key=lambda item: item[1], reverse=True)
+        print(f"  callers: {', '.join(f'{caller} ({count})' for caller, count in callers)}")
+        if group['routes']:
+            routes = sorted(group['routes'].items(), key=lambda item: item[1], reverse=True)
+            print(f"  routes: {', '.join(f'{route} ({count})' for route, count in routes)}")
+        if plans and group['plan']:
+            for line in group['plan']:
+                print(f"    {line}")
+        print()
+
+@system_cli.command("snapshot", help="Publishes the shared read snapshot, once or every --watch seconds")
+@click.option("--path", default=None, help="Snapshot file, defaults to SNAPSHOT_PATH")
+@click.option("--watch", default=0.0, help="Keep publishing at this interval in seconds")
+def snapshot_command(path, watch):
+    from App.snapshot import SnapshotPublisher, read_snapshot
+
+    path = path or app.config['SNAPSHOT_PATH'] or os.path.join(app.instance_path, 'snapshot.bin')
+    publisher = SnapshotPublisher(app, path)
+    while True:
+        started = time.perf_counter()
+        version = publisher.publish()
+        snapshot = read_snapshot(path)
+        sizes = ', '.join(f"{name} {len(body)} B" for name, body in snapshot.sections.items())
+        print(f"Snapshot v{version} at {path} in {time.perf_counter() - started:.3f}s: {sizes}")
+        if not watch:
+            return
+        time.sleep(watch)
+
 app.cli.add_command(system_cli)
 
+# Accolade Commands
+accolade_cli = AppGroup('accolades', help='Accolade maintenance commands')
+
+@accolade_cli.command("check", help="Lists students whose accolade mask disagrees with their Accolade rows")
+def check_accolades_command():
+    mismatches = check_accolade_masks()
+    if not mismatches:
+        print('All accolade masks are consistent')
+        return
+    for student_id, stored, expected in mismatches:
+        print(f"ID: {student_id}, Stored: {mask_to_milestones(stored or 0)}, Expected: {mask_to_milestones(expected)}")
+    print(f'{len(mismatches)} inconsistent students')
+    sys.exit(1)
+
+@accolade_cli.command("backfill", help="Rebuilds every student's accolade mask from the Accolade rows")
+def backfill_accolades_command():
+    changed = backfill_accolade_masks()
+    print(f'Updated accolade mask for {changed} students')
+
+@accolade_cli.command("recompute", help="Awards every accolade students' hours earn under the current MILESTONES, in chunks")
+@click.option("--revoke", is_flag=True, help="Also delete accolades for unknown milestones or above a student's hours")
+@click.option("--chunk-size", default=5000, show_default=True, help="Students per transaction")
+@click.option("--start-after", default=0, show_default=True, help="Resume after this student id")
+def recompute_accolades_command(revoke, chunk_size, start_after):
+    started = time.perf_counter()
+
+    def progress(last_id, totals):
+        print(f"  up to student {last_id}: {totals['inserted']} inserted, {totals['revoked']} revoked, "
+              f"{totals['masks']} masks updated ({time.perf_counter() - started:.1f}s)")
+
+    totals = recompute_accolades(revoke, chunk_size, start_after, progress)
+    print(f"Checked {totals['students']} students: {totals['inserted']} accolades inserted, "
+          f"{totals['revoked']} revoked, {totals['masks']} masks updated in {time.perf_counter() - started:.2f}s")
+
+app.cli.add_command(accolade_cli)
+
+# This command profiles a route in-process, see App/profiling.py
+@app.cli.command("profile", help="Calls a route through the test client under cProfile and prints the hottest functions")
+@click.argument("method")
+@click.argument("path")
+@click.option("-n", "--runs", default=20, show_default=True, help="Profiled calls, after one unprofiled warm-up call")
+@click.option("--as", "username", default=None, help="Send a token for this user, e.g. a staff account")
+@click.option("--data", default=None, help="JSON request body")
+@click.option("--sort", type=click.Choice(['cumulative', 'tottime', 'ncalls']), default='cumulative', show_default=True)
+@click.option("--limit", default=25, show_default=True, help="Functions to print")
+@click.option("-o", "--output", default=None, help="Also write the raw stats here, for snakeviz or pstats")
+def profile_command(method, path, runs, username, data, sort, limit, output):
+    from flask_jwt_extended import create_access_token
+    from App.profiling import profile_route, category_times, format_stats
+
+    headers = {}
+    if username:
+        user = db.session.execute(db.select(User).filter_by(username=username)).scalar_one_or_none()
+        if user is None:
+            raise click.ClickException(f"No user named '{username}'")
+        headers['Authorization'] = f"Bearer {create_access_token(identity=str(user.id))}"
+    # a separate app so rate limits and load shedding from the environment stay out of the way
+    profile_app = create_app({'RATE_LIMIT_ENABLED': False, 'ADMISSION_MAX_IN_FLIGHT': 0,
+                              'ADMISSION_MAX_POOL_WAIT_MS': 0})
+    stats, statuses, elapsed = profile_route(profile_app, method, path, runs, headers, data)
+    print(f"{method.upper()} {path}: {runs} calls in {elapsed:.3f}s ({elapsed / runs * 1000:.2f} ms per call), "
+          f"status {', '.join(str(code) for code in sorted(set(statuses)))}")
+    print("Self time by category:")
+    total = sum(stats.stats[key][2] for key in stats.stats) or 1
+    for category, seconds in category_times(stats):
+        print(f"  {category:<14} {seconds / runs * 1000:8.2f} ms per call {seconds / total:6.1%}")
+    if output:
+        stats.dump_stats(output)
+    print(format_stats(stats, sort, limit))
+
 # User Commands (for general users, kept for compatibility)
 user_cli = AppGroup('user', help='User object commands')
 
@@ -133,11 +312,13 @@ def list_user_command(format):
 app.cli.add_command(user_cli)
 
 # Test Commands
+# pytest is imported inside each command so it never loads unless tests are run
 test = AppGroup('test', help='Testing commands')
 
 @test.command("user", help="Run User tests")
 @click.argument("type", default="all")
 def user_tests_command(type):
+    import pytest
     if type == "unit":
         sys.exit(pytest.main(["-k", "UserUnitTests"]))
     elif type == "int":
@@ -148,6 +329,7 @@ def user_tests_command(type):
 @test.command("student", help="Run Student tests")
 @click.argument("type", default="all")
 def student_tests_command(type):
+    import pytest
     if type == "unit":
         sys.exit(pytest.main(["-k", "StudentUnitTests"]))
     elif type == "int":
@@ -158,6 +340,7 @@ def student_tests_command(type):
 @test.command("staff", help="Run Staff tests")
 @click.argument("type", default="all")
 def staff_tests_command(type):
+    import pytest
     if type == "unit":
         sys.exit(pytest.main(["-k", "StaffUnitTests"]))
     elif type == "int":
@@ -167,6 +350,7 @@ def staff_tests_command(type):
 
 @test.command("all", help="Run all tests")
 def all_tests_command():
+    import pytest
     sys.exit(pytest.main(["-v"]))
 
 app.cli.add_command(test)